@@ -0,0 +1,57 @@
+# -*- coding: utf-8 -*-
+
+"""
+What the benchmarks share: importing it makes the modules of dxf2gcode
+importable, start() prepares the application for an import without the
+window, dxf_files() gives the drawings to run on.
+"""
+
+from __future__ import absolute_import
+from __future__ import print_function
+
+import glob
+import os
+import sys
+import tempfile
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), ".."))
+
+import globals.globals as g
+from globals.config import MyConfig
+
+import globals.constants as c
+if c.PYQT5notPYQT4:
+    from PyQt5.QtWidgets import QApplication, QMessageBox
+else:
+    from PyQt4.QtGui import QApplication, QMessageBox
+
+# The application, it must exist as long as the benchmark runs
+app = None
+
+
+def start():
+    """
+    Create the application and load the default configuration, not the one
+    of the user
+    """
+    global app
+    app = QApplication(sys.argv)
+
+    # Don't stop at the warnings of the import
+    QMessageBox.warning = staticmethod(lambda parent, title, text, *args: print(text, file=sys.stderr))
+
+    g.folder = tempfile.mkdtemp()
+    g.config = MyConfig()
+
+
+def dxf_files(files):
+    """
+    @param files: the files given on the command line
+    @return: those files, or if there are none the drawings in the dxf
+    directory
+    """
+    if files:
+        return files
+    dxf_dir = os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "..", "dxf")
+    return sorted(glob.glob(os.path.join(dxf_dir, "*.dxf")) +
+                  glob.glob(os.path.join(dxf_dir, "*.DXF")))
@@ -0,0 +1,140 @@
+#!/usr/bin/python3
+# -*- coding: utf-8 -*-
+
+"""
+Compares the grid based ReadDXF.Find_Common_Points with the sorted sweep it
+replaced. Both are run on the points of the drawings in the dxf directory
+(or the files given) and on a column of vertical lines, for which the sweep
+needs quadratic time since all the end points have the same x value. The
+common points found must be the same.
+
+Usage: python3 benchmarks/common_points.py [-n LINES] [file.dxf ...]
+"""
+
+from __future__ import absolute_import
+from __future__ import print_function
+
+import argparse
+import os
+import sys
+import time
+from copy import deepcopy
+
+import _setup
+from core.point import Point
+from dxfimport.classes import PointsClass
+from dxfimport.importer import ReadDXF
+import globals.globals as g
+
+
+def find_common_points_sweep(points, tol):
+    """
+    The former ReadDXF.Find_Common_Points: a sweep over the points sorted by
+    layer and x, restarting at the first point within the tolerance in x
+    """
+    p_list = []
+    for p in points:
+        p_list.append([p.Layer_Nr, p.be.x, p.be.y, p.point_nr, 0])
+        p_list.append([p.Layer_Nr, p.en.x, p.en.y, p.point_nr, 1])
+    p_list.sort()
+
+    anf = []
+    for l_nr in range(len(p_list)):
+        inter = []
+        if isinstance(anf, list):
+            c_nr = 0
+        else:
+            c_nr = anf
+        anf = []
+
+        while p_list[c_nr][0] < p_list[l_nr][0] or \
+              p_list[c_nr][1] <= (p_list[l_nr][1] + tol):
+            if isinstance(anf, list) and\
+               p_list[c_nr][0] == p_list[l_nr][0] and\
+               abs(p_list[c_nr][1] - p_list[l_nr][1]) <= tol:
+                anf = c_nr
+
+            if p_list[c_nr][0] == p_list[l_nr][0] and \
+               abs(p_list[c_nr][1] - p_list[l_nr][1]) <= tol and\
+               abs(p_list[c_nr][2] - p_list[l_nr][2]) <= tol and\
+               c_nr != l_nr:
+                inter.append(c_nr)
+            c_nr += 1
+
+            if c_nr == len(p_list):
+                break
+
+        for int_p in inter:
+            if p_list[l_nr][-1] == 0:
+                points[p_list[l_nr][-2]].be_cp.append(p_list[int_p][3:5])
+            else:
+                points[p_list[l_nr][-2]].en_cp.append(p_list[int_p][3:5])
+
+    return points
+
+
+def vertical_lines(count):
+    """
+    Points of a column of vertical lines, each line ending where the next one
+    starts
+    """
+    return [PointsClass(point_nr=nr, geo_nr=nr, Layer_Nr=0,
+                        be=Point(0, nr), en=Point(0, nr + 1), be_cp=[], en_cp=[])
+            for nr in range(count)]
+
+
+def compare(name, points):
+    """
+    Run both implementations on copies of the points and print their times
+    @return: True if they found the same common points
+    """
+    tol = g.config.point_tolerance
+
+    swept = deepcopy(points)
+    t = time.time()
+    find_common_points_sweep(swept, tol)
+    t_sweep = time.time() - t
+
+    gridded = deepcopy(points)
+    t = time.time()
+    ReadDXF.Find_Common_Points(gridded, tol)
+    t_grid = time.time() - t
+
+    same = [(p.be_cp, p.en_cp) for p in swept] == [(p.be_cp, p.en_cp) for p in gridded]
+    print("%-40s %8i %10.4f %10.4f %s" % (name[:40], len(points), t_sweep, t_grid,
+                                          "" if same else "DIFFERENT"))
+    return same
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark of Find_Common_Points")
+    parser.add_argument("-n", "--lines", type=int, default=2000,
+                        help="number of lines in the synthetic column of lines")
+    parser.add_argument("files", nargs="*",
+                        help="DXF files to read (default: the dxf directory)")
+    args = parser.parse_args()
+
+    files = _setup.dxf_files(args.files)
+    _setup.start()
+
+    print("%-40s %8s %10s %10s" % ("drawing", "points", "sweep [s]", "grid [s]"))
+    all_same = True
+    for filename in files:
+        reader = ReadDXF(filename)
+        entities = reader.blocks.Entities + [reader.entities]
+        points = []
+        for entity in entities:
+            points += reader.App_Cont_or_Calc_IntPts(entity.geo, [])
+        # Number the points as one list, App_Cont_or_Calc_IntPts numbers
+        # them per entity
+        for point_nr, point in enumerate(points):
+            point.point_nr = point_nr
+        all_same &= compare(os.path.basename(filename), points)
+
+    all_same &= compare("%i vertical lines" % args.lines, vertical_lines(args.lines))
+
+    sys.exit(0 if all_same else 1)
+
+
+if __name__ == "__main__":
+    main()
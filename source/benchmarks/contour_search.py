@@ -0,0 +1,83 @@
+#!/usr/bin/python3
+# -*- coding: utf-8 -*-
+
+"""
+Compares the graph based contour search (see the contour_search option)
+with the recursive one. The contours of the blocks and of the entities of
+the drawings in the dxf directory (or the files given) are searched with
+both. The contours found, and so the numbers of closed contours, must be
+the same.
+
+Usage: python3 benchmarks/contour_search.py [file.dxf ...]
+"""
+
+from __future__ import absolute_import
+from __future__ import print_function
+
+import argparse
+import os
+import sys
+import time
+
+import _setup
+from dxfimport.importer import ReadDXF
+import globals.globals as g
+
+
+def search(reader, geo, points, engine):
+    """
+    @return: the contours found by the engine and the time it took
+    """
+    g.config.vars.Import_Parameters['contour_search'] = engine
+    t = time.time()
+    found = reader.Find_Contours(geo, points)
+    return [(first, cont.closed, cont.order) for first, cont in found], time.time() - t
+
+
+def compare(name, reader, entities):
+    """
+    Search the contours of the entities with both engines and print the
+    numbers of closed contours and the times
+    @return: True if both found the same contours
+    """
+    points = reader.App_Cont_or_Calc_IntPts(entities.geo, [], False)
+    points = reader.Find_Common_Points(points, g.config.point_tolerance)
+
+    recursive, t_recursive = search(reader, entities.geo, points, 'recursive')
+    graph, t_graph = search(reader, entities.geo, points, 'graph')
+
+    closed_recursive = sum(1 for first, closed, order in recursive if closed)
+    closed_graph = sum(1 for first, closed, order in graph if closed)
+    differing = len(set(map(repr, recursive)) ^ set(map(repr, graph))) // 2
+    same = closed_recursive == closed_graph and not differing
+    print("%-40s %8i %10i %10i %8i %10.4f %10.4f %s" % (name[:40], len(points), closed_recursive,
+                                                        closed_graph, differing, t_recursive, t_graph,
+                                                        "" if same else "DIFFERENT"))
+    return same
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Comparison of the contour search engines")
+    parser.add_argument("files", nargs="*",
+                        help="DXF files to read (default: the dxf directory)")
+    args = parser.parse_args()
+
+    files = _setup.dxf_files(args.files)
+    _setup.start()
+
+    print("%-40s %8s %21s %8s %21s" % ("", "", "closed contours", "", "time [s]"))
+    print("%-40s %8s %10s %10s %8s %10s %10s" % ("drawing", "points", "recursive", "graph",
+                                                 "differ", "recursive", "graph"))
+    all_same = True
+    for filename in files:
+        reader = ReadDXF(filename)
+        name = os.path.basename(filename)
+        for block in reader.blocks.Entities:
+            all_same &= compare("%s block %s" % (name, block.Name), reader, block)
+        all_same &= compare(name, reader, reader.entities)
+
+    sys.exit(0 if all_same else 1)
+
+
+if __name__ == "__main__":
+    main()
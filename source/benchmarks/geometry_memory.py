@@ -0,0 +1,132 @@
+#!/usr/bin/python3
+# -*- coding: utf-8 -*-
+
+"""
+Measures the memory taken by the imported segments (LineGeo, ArcGeo). The
+slotted classes with their lazily calculated bounding boxes are compared
+with the former layout, where each segment and its BoundingBox had an
+instance dict and the bounding box was calculated at once. The former
+layout is rebuilt from the segments of the drawings in the dxf directory
+(or the files given) and of a synthetic polyline.
+
+Usage: python3 benchmarks/geometry_memory.py [-n SEGMENTS] [file.dxf ...]
+"""
+
+from __future__ import absolute_import
+from __future__ import print_function
+
+import argparse
+import os
+import tracemalloc
+from copy import deepcopy
+
+import _setup
+from core.arcgeo import ArcGeo
+from core.linegeo import LineGeo
+from core.point import Point
+from dxfimport.importer import ReadDXF
+
+
+class DictGeo(object):
+    """
+    A segment as it was stored before the classes got slots
+    """
+    pass
+
+
+class DictBoundingBox(object):
+    def __init__(self, BB):
+        self.Ps = deepcopy(BB.Ps)
+        self.Pe = deepcopy(BB.Pe)
+
+
+def dict_copy(geo):
+    """
+    Copy a segment into the former layout: the attributes in an instance
+    dict, the bounding box calculated at once
+    """
+    old = DictGeo()
+    for name in type(geo).__slots__:
+        if name != "_BB":
+            setattr(old, name, deepcopy(getattr(geo, name)))
+    old.BB = DictBoundingBox(geo.BB)
+    return old
+
+
+def slotted_copy(geo):
+    """
+    Copy a segment as it is right after the import, i.e. without bounding box
+    """
+    new = deepcopy(geo)
+    new._BB = None
+    return new
+
+
+def measure(make, geos):
+    """
+    @return: the number of bytes allocated for the copies made by make
+    """
+    tracemalloc.start()
+    start = tracemalloc.get_traced_memory()[0]
+    copies = [make(geo) for geo in geos]
+    size = tracemalloc.get_traced_memory()[0] - start
+    tracemalloc.stop()
+    del copies
+    return size
+
+
+def compare(name, geos):
+    if not geos:
+        return
+    before = measure(dict_copy, geos)
+    after = measure(slotted_copy, geos)
+    print("%-40s %8i %10.0f %10.0f %7.0f%%" % (name[:40], len(geos),
+                                              before / len(geos), after / len(geos),
+                                              100.0 * after / before))
+
+
+def polyline(count):
+    """
+    Segments of a zigzag polyline, every tenth segment an arc
+    """
+    geos = []
+    for nr in range(count):
+        Ps = Point(nr, nr % 2)
+        Pe = Point(nr + 1, (nr + 1) % 2)
+        if nr % 10:
+            geos.append(LineGeo(Ps, Pe))
+        else:
+            geos.append(ArcGeo(Ps=Ps, Pe=Pe, O=Point(nr + 0.5, 0.5), r=0.5 ** 0.5, direction=1))
+    return geos
+
+
+def segments(reader):
+    geos = []
+    for entity in reader.blocks.Entities + [reader.entities]:
+        for geoent in entity.geo:
+            # Only the segments, not e.g. the HoleGeo of a point
+            geos += [geo for geo in getattr(geoent, "geo", [])
+                     if isinstance(geo, (LineGeo, ArcGeo))]
+    return geos
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Memory taken by the imported segments")
+    parser.add_argument("-n", "--segments", type=int, default=100000,
+                        help="number of segments of the synthetic polyline")
+    parser.add_argument("files", nargs="*",
+                        help="DXF files to read (default: the dxf directory)")
+    args = parser.parse_args()
+
+    files = _setup.dxf_files(args.files)
+    _setup.start()
+
+    print("%-40s %8s %10s %10s %8s" % ("drawing", "segments", "before [B]", "after [B]", "ratio"))
+    for filename in files:
+        compare(os.path.basename(filename), segments(ReadDXF(filename)))
+
+    compare("polyline of %i segments" % args.segments, polyline(args.segments))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,97 @@
+#!/usr/bin/python3
+# -*- coding: utf-8 -*-
+
+"""
+Compares NURBSClass.NURBS_evaluate, called for one u after the other, with
+NURBSClass.NURBS_evaluate_many, which evaluates a vector of u's at once with
+NumPy. The splines are those of the drawings in the dxf directory (or the
+files given), each is evaluated at evenly spread u's. The points and tangents
+must be the same.
+
+Usage: python3 benchmarks/spline_evaluation.py [-n PARAMETERS] [file.dxf ...]
+"""
+
+from __future__ import absolute_import
+from __future__ import print_function
+
+import argparse
+import os
+import sys
+import time
+
+import _setup
+import dxfimport.geoent_spline
+from dxfimport.importer import ReadDXF
+from dxfimport.spline_convert import NURBSClass
+
+
+def read_splines(filename):
+    """
+    @return: the NURBS of the splines in the file
+    """
+    splines = []
+    Spline2Arcs = dxfimport.geoent_spline.Spline2Arcs
+
+    def record(degree, Knots, Weights, CPoints, **kwargs):
+        splines.append(NURBSClass(degree=degree, Knots=Knots, Weights=Weights, CPoints=CPoints))
+        return Spline2Arcs(degree=degree, Knots=Knots, Weights=Weights, CPoints=CPoints, **kwargs)
+
+    dxfimport.geoent_spline.Spline2Arcs = record
+    try:
+        ReadDXF(filename)
+    finally:
+        dxfimport.geoent_spline.Spline2Arcs = Spline2Arcs
+    return splines
+
+
+def compare(name, splines, count):
+    """
+    @return: True if both give the same points and tangents
+    """
+    if not splines:
+        return True
+
+    scalar_time = 0.0
+    vector_time = 0.0
+    same = True
+    for NURBS in splines:
+        u_beg, u_end = NURBS.Knots[0], NURBS.Knots[-1]
+        us = [u_beg + (u_end - u_beg) * nr / (count - 1) for nr in range(count - 1)] + [u_end]
+
+        start = time.time()
+        values = [NURBS.NURBS_evaluate(n=1, u=u) for u in us]
+        scalar_time += time.time() - start
+
+        start = time.time()
+        Points, tangents = NURBS.NURBS_evaluate_many(n=1, us=us)
+        vector_time += time.time() - start
+
+        same &= [(Pt.x, Pt.y, tangent) for Pt, tangent in values] == \
+                [(Pt.x, Pt.y, tangent) for Pt, tangent in zip(Points, tangents)]
+
+    print("%-40s %8i %10.3f %10.3f %s" % (name[:40], len(splines), scalar_time,
+                                          vector_time, "" if same else "DIFFERENT"))
+    return same
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark of NURBS_evaluate_many")
+    parser.add_argument("-n", "--parameters", type=int, default=200,
+                        help="number of u's at which each spline is evaluated")
+    parser.add_argument("files", nargs="*",
+                        help="DXF files to read (default: the dxf directory)")
+    args = parser.parse_args()
+
+    files = _setup.dxf_files(args.files)
+    _setup.start()
+
+    print("%-40s %8s %10s %10s" % ("drawing", "splines", "scalar [s]", "vector [s]"))
+    all_same = True
+    for filename in files:
+        all_same &= compare(os.path.basename(filename), read_splines(filename), args.parameters)
+
+    sys.exit(0 if all_same else 1)
+
+
+if __name__ == "__main__":
+    main()
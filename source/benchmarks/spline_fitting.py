@@ -0,0 +1,121 @@
+#!/usr/bin/python3
+# -*- coding: utf-8 -*-
+
+"""
+Compares the stepwise fitting of the arcs to the splines with the sampled
+one (see the spline_fitting option). The splines of the drawings in the dxf
+directory (or the files given) are converted with both, counting the points
+at which the NURBS are evaluated and the arcs and lines of the result.
+
+Usage: python3 benchmarks/spline_fitting.py [-t TOLERANCE] [file.dxf ...]
+"""
+
+from __future__ import absolute_import
+from __future__ import print_function
+
+import argparse
+import os
+import time
+
+import _setup
+import dxfimport.geoent_spline
+from dxfimport.importer import ReadDXF
+from dxfimport.spline_convert import NURBSClass, Spline2Arcs
+import globals.globals as g
+
+
+def read_splines(filename):
+    """
+    @return: the parameters of the splines in the file
+    """
+    splines = []
+
+    def record(**kwargs):
+        splines.append(kwargs)
+        return Spline2Arcs(**kwargs)
+
+    dxfimport.geoent_spline.Spline2Arcs = record
+    try:
+        ReadDXF(filename)
+    finally:
+        dxfimport.geoent_spline.Spline2Arcs = Spline2Arcs
+    return splines
+
+
+class Evaluations(object):
+    """
+    Counts the u's at which NURBSClass evaluates the NURBS
+    """
+    def __init__(self):
+        self.count = 0
+        self.many = False
+        self.NURBS_evaluate = NURBSClass.NURBS_evaluate
+        self.NURBS_evaluate_many = NURBSClass.NURBS_evaluate_many
+
+    def __enter__(self):
+        counter = self
+
+        def NURBS_evaluate(NURBS, n=0, u=0):
+            if not counter.many:
+                counter.count += 1
+            return counter.NURBS_evaluate(NURBS, n=n, u=u)
+
+        def NURBS_evaluate_many(NURBS, n=0, us=()):
+            # Few u's are passed on to NURBS_evaluate, count them only once
+            counter.count += len(us)
+            counter.many = True
+            try:
+                return counter.NURBS_evaluate_many(NURBS, n=n, us=us)
+            finally:
+                counter.many = False
+
+        NURBSClass.NURBS_evaluate = NURBS_evaluate
+        NURBSClass.NURBS_evaluate_many = NURBS_evaluate_many
+        return self
+
+    def __exit__(self, *args):
+        NURBSClass.NURBS_evaluate = self.NURBS_evaluate
+        NURBSClass.NURBS_evaluate_many = self.NURBS_evaluate_many
+
+
+def convert(splines, fitting, tol):
+    """
+    @return: the number of evaluations and of geometries and the time
+    """
+    geos = 0
+    with Evaluations() as evaluations:
+        start = time.time()
+        for spline in splines:
+            geos += len(Spline2Arcs(**dict(spline, tol=tol, fitting=fitting)).Curve)
+        duration = time.time() - start
+    return evaluations.count, geos, duration
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark of the spline fitting")
+    parser.add_argument("-t", "--tolerance", type=float, default=None,
+                        help="fitting tolerance (default: the one of the configuration)")
+    parser.add_argument("files", nargs="*",
+                        help="DXF files to read (default: the dxf directory)")
+    args = parser.parse_args()
+
+    files = _setup.dxf_files(args.files)
+    _setup.start()
+    tol = args.tolerance if args.tolerance is not None else g.config.fitting_tolerance
+
+    print("%-40s %8s %21s %17s %17s" % ("", "", "evaluations", "geometries", "time [s]"))
+    print("%-40s %8s %10s %10s %8s %8s %8s %8s" % ("drawing", "splines", "stepwise", "sampled",
+                                                   "stepwise", "sampled", "stepwise", "sampled"))
+    for filename in files:
+        splines = read_splines(filename)
+        if not splines:
+            continue
+        stepwise = convert(splines, 'stepwise', tol)
+        sampled = convert(splines, 'sampled', tol)
+        print("%-40s %8i %10i %10i %8i %8i %8.2f %8.2f" % (os.path.basename(filename)[:40], len(splines),
+                                                           stepwise[0], sampled[0], stepwise[1], sampled[1],
+                                                           stepwise[2], sampled[2]))
+
+
+if __name__ == "__main__":
+    main()
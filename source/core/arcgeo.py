@@ -55,6 +55,8 @@ class ArcGeo(object):
     Standard Geometry Item used for DXF Import of all geometries, plotting and
     G-Code export.
     """
+    __slots__ = ["Ps", "Pe", "O", "r", "s_ang", "e_ang", "drag", "ext", "length",
+                 "abs_geo", "_BB"]
 
     def __init__(self, Ps=None, Pe=None, O=None, r=1,
                  s_ang=None, e_ang=None, direction=1, drag=False):
@@ -117,7 +119,7 @@ class ArcGeo(object):
 
         self.length = self.r * abs(self.ext)
 
-        self.calc_bounding_box()
+        self._BB = None
 
         self.abs_geo = None
 
@@ -168,6 +170,15 @@ class ArcGeo(object):
 
         return (min_ang < angle) and (angle <= max_ang)
 
+    @property
+    def BB(self):
+        """
+        The BoundingBox of the geometry, calculated when it is first used
+        """
+        if self._BB is None:
+            self.calc_bounding_box()
+        return self._BB
+
     def calc_bounding_box(self):
         """
         Calculated the BoundingBox of the geometry and saves it into self.BB
@@ -201,7 +212,7 @@ class ArcGeo(object):
                 self.wrap(e_ang - 1.5 * pi, 1)):
             Ps.y = min(self.Ps.y, self.Pe.y)
 
-        self.BB = BoundingBox(Ps=Ps, Pe=Pe)
+        self._BB = BoundingBox(Ps=Ps, Pe=Pe)
 
     def dif_ang(self, Ps, Pe, direction):
         """
@@ -307,14 +318,31 @@ class ArcGeo(object):
         """
         return self.distance_a_p(xy) <= tol
 
-    def make_abs_geo(self, parent=None):
+    def get_points(self):
+        """
+        The points which are transformed by get_abs_geo
+        """
+        return self.Ps, self.Pe, self.O
+
+    def make_abs_geo(self, parent=None, points=None):
         """
         Generates the absolute geometry based on itself and the parent. This
         is done for rotating and scaling purposes
         """
-        Ps = self.Ps.rot_sca_abs(parent=parent)
-        Pe = self.Pe.rot_sca_abs(parent=parent)
-        O = self.O.rot_sca_abs(parent=parent)
+        self.abs_geo = self.get_abs_geo(parent, points)
+
+    def get_abs_geo(self, parent=None, points=None):
+        """
+        Make the absolute geometry, see make_abs_geo; it is only returned
+        @param points: iterator which gives the transformed get_points(), if
+        they were transformed together with those of other geometries
+        """
+        if points is None:
+            Ps = self.Ps.rot_sca_abs(parent=parent)
+            Pe = self.Pe.rot_sca_abs(parent=parent)
+            O = self.O.rot_sca_abs(parent=parent)
+        else:
+            Ps, Pe, O = next(points), next(points), next(points)
         r = self.scaled_r(self.r, parent)
 
         direction = 1 if self.ext > 0.0 else -1
@@ -322,7 +350,7 @@ class ArcGeo(object):
         if parent is not None and parent.sca[0] * parent.sca[1] < 0.0:
             direction *= -1
 
-        self.abs_geo = ArcGeo(Ps=Ps, Pe=Pe, O=O, r=r, direction=direction, drag=self.drag)
+        return ArcGeo(Ps=Ps, Pe=Pe, O=O, r=r, direction=direction, drag=self.drag)
 
     def make_path(self, caller, drawHorLine):
         segments = int(abs(degrees(self.ext)) // 3 + 1)
@@ -345,17 +373,14 @@ class ArcGeo(object):
 
     def scaled_r(self, r, parent):
         """
-        Scales the radius based on the scale given in its parents. This is done
-        recursively.
+        Scales the radius based on the scale given in its parents, see
+        EntityContent.get_radius_scale
         @param r: The radius which shall be scaled
         @param parent: The parent Entity (Instance: EntityContentClass)
         @return: The scaled radius
         """
-        # Rekursive Schleife falls mehrfach verschachtelt.
-        # Recursive loop if nested.
         if parent is not None:
-            r *= parent.sca[0]
-            r = self.scaled_r(r, parent.parent)
+            r *= parent.get_radius_scale()
 
         return r
 
@@ -390,6 +415,7 @@ class ArcGeo(object):
             self.ext = self.dif_ang(self.Ps, self.Pe, prv_dir)
 
         self.length = self.r * abs(self.ext)
+        self._BB = None
 
     def wrap(self, angle, isend=0):
         """
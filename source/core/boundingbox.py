@@ -37,11 +37,13 @@ logger = logging.getLogger("core.boundingbox")
 
 eps=-1e-12
 
-class BoundingBox:
+class BoundingBox(object):
     """ 
     Bounding Box Class. This is the standard class which provides all std. 
     Bounding Box methods.
     """
+    __slots__ = ["Ps", "Pe"]
+
     def __init__(self, Ps=Point(0, 0), Pe=Point(0, 0), hdl=[]):
         """ 
         Standard method to initialize the class
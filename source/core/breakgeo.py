@@ -34,6 +34,8 @@ class BreakGeo(LineGeo):
     """
     BreakGeo interrupts another geometry item by changing the Z-Position.
     """
+    __slots__ = ["height", "xyfeed", "zfeed"]
+
     def __init__(self, Ps, Pe, height, xyfeed, zfeed):
         LineGeo.__init__(self, Ps, Pe)
 
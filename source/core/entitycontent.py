@@ -24,6 +24,13 @@
 #
 ############################################################################
 
+from __future__ import absolute_import
+from __future__ import division
+
+from math import sin, cos
+
+from core.point import Point
+
 
 class EntityContent(object):
     def __init__(self, nr, name, parent, p0, pb, sca, rot):
@@ -43,6 +50,10 @@ class EntityContent(object):
         self.sca = sca
         self.rot = rot
 
+        # The transformation to absolute coordinates, see get_transform
+        self._transform = None
+        self._radius_scale = None
+
     def __str__(self):
         return "\nEntityContent" +\
                "\nnr :      %i" % self.nr +\
@@ -55,3 +66,66 @@ class EntityContent(object):
 
     def append(self, child):
         self.children.append(child)
+
+    def invalidate_transform(self):
+        """
+        Drop the cached transformation of this entity and of the entities
+        inserted within it; to be called when p0, pb, sca or rot changed
+        """
+        self._transform = None
+        self._radius_scale = None
+        for child in self.children:
+            if isinstance(child, EntityContent):
+                child.invalidate_transform()
+
+    def get_transform(self):
+        """
+        The transformation of the points of this entity to absolute
+        coordinates, composed of its own (rotate and scale around pb, move to
+        p0) and those of its parents. It is calculated once and cached.
+        @return: the affine matrix as (a, b, c, d, e, f), a point (x, y) is
+        transformed to (a * x + b * y + c, d * x + e * y + f)
+        """
+        if self._transform is None:
+            rot_cos = cos(self.rot)
+            rot_sin = sin(self.rot)
+            a = rot_cos * self.sca[0]
+            b = -rot_sin * self.sca[0]
+            d = rot_sin * self.sca[1]
+            e = rot_cos * self.sca[1]
+            c = self.p0.x - a * self.pb.x - b * self.pb.y
+            f = self.p0.y - d * self.pb.x - e * self.pb.y
+
+            if self.parent is not None:
+                pa, pb, pc, pd, pe, pf = self.parent.get_transform()
+                a, b, c, d, e, f = (pa * a + pb * d, pa * b + pb * e, pa * c + pb * f + pc,
+                                    pd * a + pe * d, pd * b + pe * e, pd * c + pe * f + pf)
+
+            self._transform = (a, b, c, d, e, f)
+        return self._transform
+
+    def get_radius_scale(self):
+        """
+        The factor by which the radii of arcs are scaled, see ArcGeo.scaled_r
+        """
+        if self._radius_scale is None:
+            self._radius_scale = self.sca[0]
+            if self.parent is not None:
+                self._radius_scale *= self.parent.get_radius_scale()
+        return self._radius_scale
+
+    def transform_point(self, point):
+        """
+        @return: a new Point with the absolute position of point
+        """
+        a, b, c, d, e, f = self.get_transform()
+        return Point(a * point.x + b * point.y + c, d * point.x + e * point.y + f)
+
+    def transform_points(self, points):
+        """
+        Same as transform_point for many points at once
+        @return: list of new Points
+        """
+        a, b, c, d, e, f = self.get_transform()
+        return [Point(a * point.x + b * point.y + c, d * point.x + e * point.y + f)
+                for point in points]
@@ -0,0 +1,257 @@
+# -*- coding: utf-8 -*-
+
+############################################################################
+#
+#   Copyright (C) 2008-2015
+#    Christian Kohlöffel
+#    Vinzenz Schulz
+#    Jean-Paul Schouwstra
+#
+#   This file is part of DXF2GCODE.
+#
+#   DXF2GCODE is free software: you can redistribute it and/or modify
+#   it under the terms of the GNU General Public License as published by
+#   the Free Software Foundation, either version 3 of the License, or
+#   (at your option) any later version.
+#
+#   DXF2GCODE is distributed in the hope that it will be useful,
+#   but WITHOUT ANY WARRANTY; without even the implied warranty of
+#   MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+#   GNU General Public License for more details.
+#
+#   You should have received a copy of the GNU General Public License
+#   along with DXF2GCODE.  If not, see <http://www.gnu.org/licenses/>.
+#
+############################################################################
+
+
+from __future__ import absolute_import
+from __future__ import division
+
+from math import pi
+
+from core.point import Point
+from core.linegeo import LineGeo
+from core.arcgeo import ArcGeo
+from core.boundingbox import BoundingBox
+
+try:
+    import numpy as np
+except ImportError:
+    np = None
+
+# Shapes with fewer geometries than this are not worth passing through NumPy
+MIN_ARRAY_GEOS = 32
+
+# Type tags of the geometries
+LINE = 0
+ARC = 1
+
+eps = 1e-12
+
+
+def make_geo_arrays(geos):
+    """
+    Make the GeoArrays of the given geometries (a Geos list)
+    @return: GeoArrays, or None if NumPy is missing, there are only few
+    geometries or some of them are neither plain lines nor arcs (e.g. holes)
+    """
+    if np is None or len(geos) < MIN_ARRAY_GEOS:
+        return None
+    abs_geos = list(geos.abs_iter())
+    if any(type(geo) is not LineGeo and type(geo) is not ArcGeo for geo in abs_geos):
+        return None
+    return GeoArrays(abs_geos)
+
+
+class GeoArrays(object):
+    """
+    The absolute geometries of a shape as structure of arrays: one array per
+    attribute (start and end point, centre, radius, angles) with a row per
+    geometry and a type tag telling lines from arcs. The algorithms of the
+    shape which look at all of its geometries are done on these arrays at
+    once. The attributes of the lines are 0 in the columns of the arcs.
+
+    The LineGeo and ArcGeo the arrays were made of are kept; indexing and
+    iterating the GeoArrays gives them, so other callers see the same
+    objects as before.
+    """
+    def __init__(self, geos):
+        self.geos = geos
+
+        rows = [(ARC, geo.Ps.x, geo.Ps.y, geo.Pe.x, geo.Pe.y,
+                 geo.O.x, geo.O.y, geo.r, geo.s_ang, geo.e_ang, geo.ext)
+                if type(geo) is ArcGeo else
+                (LINE, geo.Ps.x, geo.Ps.y, geo.Pe.x, geo.Pe.y, 0, 0, 0, 0, 0, 0)
+                for geo in geos]
+        values = np.array(rows, dtype=float).reshape(-1, 11)
+
+        self.kind = values[:, 0].astype(np.int8)
+        (self.psx, self.psy, self.pex, self.pey,
+         self.ox, self.oy, self.r, self.s_ang, self.e_ang, self.ext) = values[:, 1:].T.copy()
+
+        self.lines = np.flatnonzero(self.kind == LINE)
+        self.arcs = np.flatnonzero(self.kind == ARC)
+
+    def __len__(self):
+        return len(self.geos)
+
+    def __getitem__(self, nr):
+        return self.geos[nr]
+
+    def __iter__(self):
+        return iter(self.geos)
+
+    def bounding_box(self):
+        """
+        The BoundingBox of all geometries, as the joined boxes of each
+        geometry (see LineGeo.calc_bounding_box and ArcGeo.calc_bounding_box)
+        """
+        xmin = np.minimum(self.psx, self.pex)
+        xmax = np.maximum(self.psx, self.pex)
+        ymin = np.minimum(self.psy, self.pey)
+        ymax = np.maximum(self.psy, self.pey)
+
+        arcs = self.arcs
+        if len(arcs):
+            ox, oy, r = self.ox[arcs], self.oy[arcs], self.r[arcs]
+            ext = self.ext[arcs]
+            s_ang = np.where(ext >= 0, self.s_ang[arcs], self.e_ang[arcs])
+            e_ang = np.where(ext >= 0, self.e_ang[arcs], self.s_ang[arcs])
+
+            # The box of the full circle, limited to the end points where an
+            # axis is not crossed
+            for axis, shift in ((0, 0), (1, pi / 2), (2, pi), (3, 1.5 * pi)):
+                not_crossed = ~(self.wrap(s_ang - shift, False) >= self.wrap(e_ang - shift, True))
+                if axis == 0:
+                    xmax[arcs] = np.where(not_crossed, xmax[arcs], ox + r)
+                elif axis == 1:
+                    ymax[arcs] = np.where(not_crossed, ymax[arcs], oy + r)
+                elif axis == 2:
+                    xmin[arcs] = np.where(not_crossed, xmin[arcs], ox - r)
+                else:
+                    ymin[arcs] = np.where(not_crossed, ymin[arcs], oy - r)
+
+        return BoundingBox(Ps=Point(float(xmin.min()), float(ymin.min())),
+                           Pe=Point(float(xmax.max()), float(ymax.max())))
+
+    @staticmethod
+    def wrap(angle, isend):
+        """
+        Same as ArcGeo.wrap for arrays of angles
+        """
+        wrap_angle = np.mod(angle, 2 * pi)
+        if isend:
+            return np.where(wrap_angle == 0.0, 2 * pi,
+                            np.where(wrap_angle == 2 * pi, 0.0, wrap_angle))
+        return np.where(wrap_angle == 2 * pi, 0.0, wrap_angle)
+
+    def distances(self, xy):
+        """
+        The distance of the point xy to each geometry, see
+        LineGeo.distance_l_p and ArcGeo.distance_a_p
+        """
+        dist_ps = np.hypot(self.psx - xy.x, self.psy - xy.y)
+        dist_pe = np.hypot(self.pex - xy.x, self.pey - xy.y)
+        # Nearest end point; for lines that is the point behind or ahead
+        distances = np.minimum(dist_ps, dist_pe)
+
+        lines = self.lines
+        if len(lines):
+            dx = self.pex[lines] - self.psx[lines]
+            dy = self.pey[lines] - self.psy[lines]
+            vx = xy.x - self.psx[lines]
+            vy = xy.y - self.psy[lines]
+            t = dx * vx + dy * vy
+            dd = dx * dx + dy * dy
+            inside = (t > 0) & (t < dd)
+            with np.errstate(divide='ignore', invalid='ignore'):
+                perp = vx * vx + vy * vy - (t * t) / dd
+            perp = np.where(perp < eps, 0.0, np.sqrt(np.maximum(perp, 0.0)))
+            line_distances = np.where(t <= 0, dist_ps[lines], dist_pe[lines])
+            distances[lines] = np.where(inside, perp, line_distances)
+
+        arcs = self.arcs
+        if len(arcs):
+            ox, oy, r = self.ox[arcs], self.oy[arcs], self.r[arcs]
+            ext = self.ext[arcs]
+            ang = np.arctan2(xy.y - oy, xy.x - ox)
+            dist_o = np.hypot(xy.x - ox, xy.y - oy)
+
+            # ArcGeo.PointAng_withinArc
+            dif_ang = np.mod(ang - np.arctan2(self.psy[arcs] - oy, self.psx[arcs] - ox), -2 * pi)
+            dif_ang = np.where(ext > 0, dif_ang + 2 * pi, np.where(dif_ang == 0, -2 * pi, dif_ang))
+            with np.errstate(divide='ignore', invalid='ignore'):
+                v = dif_ang / ext
+            within = (ext != 0.0) & (v >= 0.0) & (v <= 1.0)
+
+            outside = np.hypot(ox + np.cos(ang) * r - xy.x, oy + np.sin(ang) * r - xy.y)
+            inside = np.minimum(distances[arcs], np.abs(r - dist_o))
+            distances[arcs] = np.where(within, np.where(dist_o > r, outside, inside), distances[arcs])
+
+        return distances
+
+    def is_hit(self, xy, tol):
+        """
+        Check whether one of the geometries is hit, see Shape.isHit
+        """
+        return bool((self.distances(xy) <= tol).any())
+
+    def shoelace_sum(self, closed, segments=10):
+        """
+        The sum of the shoelace formula which Shape.isDirectionOfGeosCCW
+        uses; the arcs are replaced by the given number of segments
+        """
+        count = len(self.geos)
+        xs = np.zeros((count, segments))
+        ys = np.zeros((count, segments))
+        used = np.zeros((count, segments), dtype=bool)
+
+        lines = self.lines
+        xs[lines, 0] = self.pex[lines]
+        ys[lines, 0] = self.pey[lines]
+        used[lines, 0] = True
+
+        arcs = self.arcs
+        if len(arcs):
+            # ArcGeo.get_point_from_start
+            steps = np.arange(1, segments + 1)
+            ang = self.s_ang[arcs, None] + steps * self.ext[arcs, None] / segments
+            xs[arcs] = self.ox[arcs, None] + np.cos(ang) * self.r[arcs, None]
+            ys[arcs] = self.oy[arcs, None] + np.sin(ang) * self.r[arcs, None]
+            used[arcs] = True
+
+        start = [(self.psx[0], self.psy[0])]
+        points = np.concatenate((start, np.column_stack((xs[used], ys[used]))) +
+                                ((start,) if not closed else ()))
+        terms = (points[:-1, 0] + points[1:, 0]) * (points[1:, 1] - points[:-1, 1])
+
+        # Summed up in order, so the result is the same as for a loop
+        summe = 0.0
+        for term in terms.tolist():
+            summe += term
+        return summe
+
+    def line_intersections(self, Ps, Pe):
+        """
+        The points where the line from Ps to Pe crosses the lines within
+        these geometries, in their order. The points are calculated as by
+        QLineF.intersect, which is used for single lines.
+        """
+        lines = self.lines
+        ax, ay = Pe.x - Ps.x, Pe.y - Ps.y
+        bx = self.psx[lines] - self.pex[lines]
+        by = self.psy[lines] - self.pey[lines]
+        cx = Ps.x - self.psx[lines]
+        cy = Ps.y - self.psy[lines]
+
+        denominator = ay * bx - ax * by
+        with np.errstate(divide='ignore', invalid='ignore'):
+            reciprocal = 1 / denominator
+            na = (by * cx - bx * cy) * reciprocal
+            nb = (ax * cy - ay * cx) * reciprocal
+        bounded = (denominator != 0) & np.isfinite(denominator) & \
+            (na >= 0) & (na <= 1) & (nb >= 0) & (nb <= 1)
+
+        na = na[bounded]
+        return [Point(x, y) for x, y in zip((Ps.x + ax * na).tolist(), (Ps.y + ay * na).tolist())]
@@ -38,6 +38,7 @@ class HoleGeo(object):
     """
     HoleGeo represents drilling holes.
     """
+    __slots__ = ["Ps", "length", "abs_geo", "BB"]
 
     def __init__(self, Ps):
         """
@@ -78,14 +79,31 @@ class HoleGeo(object):
         """
         pass
 
-    def make_abs_geo(self, parent=None):
+    def get_points(self):
+        """
+        The points which are transformed by get_abs_geo
+        """
+        return self.Ps,
+
+    def make_abs_geo(self, parent=None, points=None):
         """
         Generates the absolute geometry based on itself and the parent. This
         is done for rotating and scaling purposes
         """
-        Ps = self.Ps.rot_sca_abs(parent=parent)
+        self.abs_geo = self.get_abs_geo(parent, points)
+
+    def get_abs_geo(self, parent=None, points=None):
+        """
+        Make the absolute geometry, see make_abs_geo; it is only returned
+        @param points: iterator which gives the transformed get_points(), if
+        they were transformed together with those of other geometries
+        """
+        if points is None:
+            Ps = self.Ps.rot_sca_abs(parent=parent)
+        else:
+            Ps = next(points)
 
-        self.abs_geo = HoleGeo(Ps)
+        return HoleGeo(Ps)
 
     def get_start_end_points(self, start_point, angles=None):
         if angles is None:
@@ -45,6 +45,7 @@ class LineGeo(object):
     Standard Geometry Item used for DXF Import of all geometries, plotting and
     G-Code export.
     """
+    __slots__ = ["Ps", "Pe", "length", "abs_geo", "_BB"]
 
     def __init__(self, Ps, Pe):
         """
@@ -56,7 +57,7 @@ class LineGeo(object):
         self.Pe = Pe
         self.length = self.Ps.distance(self.Pe)
 
-        self.calc_bounding_box()
+        self._BB = None
 
         self.abs_geo = None
 
@@ -78,6 +79,15 @@ class LineGeo(object):
                "\nPe:     %s" % self.Pe.save_v1() +\
                "\nlength: %0.5f" % self.length
 
+    @property
+    def BB(self):
+        """
+        The BoundingBox of the geometry, calculated when it is first used
+        """
+        if self._BB is None:
+            self.calc_bounding_box()
+        return self._BB
+
     def calc_bounding_box(self):
         """
         Calculated the BoundingBox of the geometry and saves it into self.BB
@@ -85,7 +95,7 @@ class LineGeo(object):
         Ps = Point(x=min(self.Ps.x, self.Pe.x), y=min(self.Ps.y, self.Pe.y))
         Pe = Point(x=max(self.Ps.x, self.Pe.x), y=max(self.Ps.y, self.Pe.y))
 
-        self.BB = BoundingBox(Ps=Ps, Pe=Pe)
+        self._BB = BoundingBox(Ps=Ps, Pe=Pe)
 
     def get_start_end_points(self, start_point, angles=None):
         if start_point:
@@ -145,15 +155,32 @@ class LineGeo(object):
         """
         return self.distance_l_p(xy) <= tol
 
-    def make_abs_geo(self, parent=None):
+    def get_points(self):
+        """
+        The points which are transformed by get_abs_geo
+        """
+        return self.Ps, self.Pe
+
+    def make_abs_geo(self, parent=None, points=None):
         """
         Generates the absolute geometry based on itself and the parent. This
         is done for rotating and scaling purposes
         """
-        Ps = self.Ps.rot_sca_abs(parent=parent)
-        Pe = self.Pe.rot_sca_abs(parent=parent)
+        self.abs_geo = self.get_abs_geo(parent, points)
+
+    def get_abs_geo(self, parent=None, points=None):
+        """
+        Make the absolute geometry, see make_abs_geo; it is only returned
+        @param points: iterator which gives the transformed get_points(), if
+        they were transformed together with those of other geometries
+        """
+        if points is None:
+            Ps = self.Ps.rot_sca_abs(parent=parent)
+            Pe = self.Pe.rot_sca_abs(parent=parent)
+        else:
+            Ps, Pe = next(points), next(points)
 
-        self.abs_geo = LineGeo(Ps=Ps, Pe=Pe)
+        return LineGeo(Ps=Ps, Pe=Pe)
 
     def make_path(self, caller, drawHorLine):
         drawHorLine(caller, self.Ps, self.Pe)
@@ -176,6 +203,7 @@ class LineGeo(object):
         else:
             self.Pe = value
         new_ang = self.Ps.norm_angle(self.Pe)
+        self._BB = None
 
         if 2 * abs(((prv_ang - new_ang) + pi) % (2 * pi) - pi) >= pi:
             # seems very unlikely that this is what you want - the direction
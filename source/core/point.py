@@ -318,19 +318,9 @@ class Point(object):
         @return: A new Point which is absolute position
         """
         if sca is None and parent is not None:
-            p0 = parent.p0
-            pb = parent.pb
-            sca = parent.sca
-            rot = parent.rot
-
-            pc = self - pb
-            rotx = (pc.x * cos(rot) + pc.y * -sin(rot)) * sca[0]
-            roty = (pc.x * sin(rot) + pc.y * cos(rot)) * sca[1]
-            p1 = Point(rotx, roty) + p0
-
-            # Recursive loop if the point self is  introduced
-            if parent.parent is not None:
-                p1 = p1.rot_sca_abs(parent=parent.parent)
+            # The transformations of the parent and its parents are composed
+            # and cached by the parent
+            p1 = parent.transform_point(self)
 
         elif parent is None and sca is None:
             p0 = Point()
@@ -232,7 +232,9 @@ d2g.layers = ''' + str(layers)
         self.parent.plot()
 
     def reload(self, compleet=True):
-        if self.parent.filename:
+        # Nothing to make the shapes of while a file is imported
+        if self.parent.filename and self.parent.valuesDXF is not None and \
+           self.parent.import_thread is None:
             self.parent.setCursor(QtCore.Qt.WaitCursor)
             self.parent.canvas.resetAll()
             self.parent.app.processEvents()
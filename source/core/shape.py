@@ -28,7 +28,7 @@ from __future__ import absolute_import
 from __future__ import division
 
 from math import radians, pi
-from copy import deepcopy
+from copy import copy, deepcopy
 import logging
 
 import globals.globals as g
@@ -36,6 +36,7 @@ from core.point import Point
 from core.linegeo import LineGeo
 from core.arcgeo import ArcGeo
 from core.holegeo import HoleGeo
+from core.geoarrays import make_geo_arrays
 
 from globals.six import text_type
 import globals.constants as c
@@ -102,6 +103,26 @@ class Shape(object):
                "\nclosed:      %s" % self.closed +\
                "\ngeos:        %s" % self.geos
 
+    @property
+    def geos(self):
+        return self._geos
+
+    @geos.setter
+    def geos(self, geos):
+        self._geos = geos
+        self._geo_arrays = None
+
+    def get_geo_arrays(self):
+        """
+        The geometries as GeoArrays, made when they are first needed and
+        again if geometries were added since
+        @return: GeoArrays, or None if the shape is not worth it (see
+        make_geo_arrays)
+        """
+        if self._geo_arrays is None or self._geo_arrays[0] != len(self._geos):
+            self._geo_arrays = (len(self._geos), make_geo_arrays(self._geos))
+        return self._geo_arrays[1]
+
     def tr(self, string_to_translate):
         """
         Translate a string using the QCoreApplication translation framework
@@ -131,23 +152,15 @@ class Shape(object):
 
     def isDirectionOfGeosCCW(self, geos):
         # By calculating the area of the shape
-        start = geos.abs_el(0).get_start_end_points(True)
-        summe = 0.0
-        for geo in geos.abs_iter():
-            if isinstance(geo, LineGeo):
-                end = geo.get_start_end_points(False)
-                summe += (start.x + end.x) * (end.y - start.y)
-                start = end
-            elif isinstance(geo, ArcGeo):
-                segments = 10
-                for i in range(1, segments + 1):
-                    end = geo.get_point_from_start(i, segments)
-                    summe += (end.x + start.x) * (end.y - start.y)
-                    start = end
-        if not self.closed:
-            # if shape is not closed... simply treat it as closed
-            end = geos.abs_el(0).get_start_end_points(True)
-            summe += (end.x + start.x) * (end.y - start.y)
+        summe = None
+        if isinstance(geos, InstanceGeos):
+            summe = geos.shoelace_sum(self.closed)
+        if summe is None:
+            geo_arrays = self.get_geo_arrays() if geos is self.geos else None
+            if geo_arrays is not None:
+                summe = geo_arrays.shoelace_sum(self.closed)
+            else:
+                summe = shoelace_sum(geos.abs_iter(), self.closed)
 
         if summe == 0:  # inconclusive
             logger.debug(
@@ -187,12 +200,11 @@ class Shape(object):
             start = self.get_start_end_points(True)
             logger.debug(self.tr("Old Start Point: %s" % start))
 
-            min_geo_nr, _ = min(enumerate(self.geos.abs_iter()),
-                                key=lambda geo:
-                                geo[1].get_start_end_points(True).distance(stPoint))
+            min_geo_nr, _ = min(enumerate(self.geos.abs_start_points()),
+                                key=lambda start: start[1].distance(stPoint))
 
             # Overwrite the geometries in changed order.
-            self.geos = Geos(self.geos[min_geo_nr:] + self.geos[:min_geo_nr])
+            self.geos = self.geos.shifted(min_geo_nr)
 
             start = self.get_start_end_points(True)
             logger.debug(self.tr("New Start Point: %s" % start))
@@ -200,9 +212,14 @@ class Shape(object):
     def reverse(self, geos=None):
         if not geos:
             geos = self.geos
-        geos.reverse()
-        for geo in geos:
-            geo.reverse()
+        if geos is self.geos:
+            self._geo_arrays = None
+        if isinstance(geos, InstanceGeos):
+            geos.reverse_geos()
+        else:
+            geos.reverse()
+            for geo in geos:
+                geo.reverse()
         self.cw = not self.cw
 
     def switch_cut_cor(self):
@@ -217,10 +234,30 @@ class Shape(object):
         elif self.cut_cor == 42:
             self.cut_cor = 41
 
-    def append(self, geo):
-        geo.make_abs_geo(self.parentEntity)
+    def append(self, geo, make_abs_geo=True):
+        """
+        Append a geometry; its absolute geometry is made at once, unless
+        make_abs_geo is False, then make_abs_geos needs to be called later
+        """
+        if make_abs_geo:
+            geo.make_abs_geo(self.parentEntity)
         self.geos.append(geo)
 
+    def make_abs_geos(self):
+        """
+        Make the absolute geometries of all geometries, the points of all of
+        them are transformed in one go
+        """
+        if self.parentEntity is None:
+            for geo in self.geos:
+                geo.make_abs_geo()
+        else:
+            points = [point for geo in self.geos for point in geo.get_points()]
+            abs_points = iter(self.parentEntity.transform_points(points))
+            for geo in self.geos:
+                geo.make_abs_geo(self.parentEntity, abs_points)
+        self._geo_arrays = None
+
     def get_start_end_points_physical(self, start_point=None, angles=None):
         """
         With multiple slices end point could be start point.
@@ -275,6 +312,16 @@ class Shape(object):
         """
         Calculated the BoundingBox of the geometry and saves it into self.BB
         """
+        if isinstance(self.geos, InstanceGeos):
+            # Not kept, the absolute geometries of inserts are only made
+            # when they are needed
+            geo_arrays = make_geo_arrays(self.geos)
+        else:
+            geo_arrays = self.get_geo_arrays()
+        if geo_arrays is not None:
+            self.BB = geo_arrays.bounding_box()
+            return
+
         self.BB = self.geos.abs_el(0).BB
         for geo in self.geos.abs_iter():
             self.BB = self.BB.joinBB(geo.BB)
@@ -299,6 +346,9 @@ class Shape(object):
     def isHit(self, xy, tol):
         if self.BB.Ps.x - tol <= xy.x <= self.BB.Pe.x + tol\
                 and self.BB.Ps.y - tol <= xy.y <= self.BB.Pe.y + tol:
+            geo_arrays = self.get_geo_arrays()
+            if geo_arrays is not None:
+                return geo_arrays.is_hit(xy, tol)
             for geo in self.geos.abs_iter():
                 if geo.isHit(self, xy, tol):
                     return True
@@ -597,11 +647,48 @@ class Shape(object):
         self.geos = new_geos
 
 
+def shoelace_sum(geos, closed):
+    """
+    The sum of the shoelace formula for the given geometries, which is
+    positive if they run counterclockwise; arcs are replaced by 10 segments
+    and open shapes are treated as closed
+    """
+    first = None
+    summe = 0.0
+    for geo in geos:
+        if first is None:
+            first = start = geo.get_start_end_points(True)
+        if isinstance(geo, LineGeo):
+            end = geo.get_start_end_points(False)
+            summe += (start.x + end.x) * (end.y - start.y)
+            start = end
+        elif isinstance(geo, ArcGeo):
+            segments = 10
+            for i in range(1, segments + 1):
+                end = geo.get_point_from_start(i, segments)
+                summe += (end.x + start.x) * (end.y - start.y)
+                start = end
+    if not closed and first is not None:
+        # if shape is not closed... simply treat it as closed
+        end = first
+        summe += (end.x + start.x) * (end.y - start.y)
+    return summe
+
+
 class Geos(list):
 
     def __init__(self, *args):
         list.__init__(self, *args)
 
+    def shifted(self, nr):
+        """
+        @return: the geometries in changed order, starting with number nr
+        """
+        return Geos(self[nr:] + self[:nr])
+
+    def abs_start_points(self):
+        return [geo.get_start_end_points(True) for geo in self.abs_iter()]
+
     def abs_iter(self):
         for geo in list.__iter__(self):
             yield geo.abs_geo if geo.abs_geo else geo
@@ -610,3 +697,94 @@ class Geos(list):
 
     def abs_el(self, element):
         return self[element].abs_geo if self[element].abs_geo else self[element]
+
+
+class BlockGeos(object):
+    """
+    The geometries of a contour within a block, in the order and direction
+    of the contour. They are shared by the shapes of all inserts of the block
+    (see InstanceGeos) and must not be changed; their reversed geometries
+    are made once and shared as well.
+    """
+    def __init__(self, geos):
+        self.geos = tuple(geos)
+
+        # Shapes with holes are not shared, see HoleGeo.make_path
+        self.holes = any(isinstance(geo, HoleGeo) for geo in self.geos)
+
+        # Reversed geometry of each geometry and the other way round, by id
+        self.reversed = None
+
+        # The shoelace sum of the geometries, for closed and open shapes
+        self.sums = {}
+
+    def reversed_geo(self, geo):
+        if self.reversed is None:
+            self.reversed = {}
+            for block_geo in self.geos:
+                reversed_geo = copy(block_geo)
+                reversed_geo.reverse()
+                self.reversed[id(block_geo)] = reversed_geo
+                self.reversed[id(reversed_geo)] = block_geo
+        return self.reversed[id(geo)]
+
+    def shoelace_sum(self, closed):
+        if closed not in self.sums:
+            self.sums[closed] = shoelace_sum(self.geos, closed)
+        return self.sums[closed]
+
+
+class InstanceGeos(Geos):
+    """
+    The geometries of a shape made of a block: the shared geometries of the
+    BlockGeos (or their reversed ones), placed by the transformation of the
+    insert (parent). The absolute geometries are made whenever they are
+    needed and not kept, so an insert only holds the references.
+    """
+    def __init__(self, geos, block_geos, parent, is_reversed=False):
+        Geos.__init__(self, geos)
+        self.block_geos = block_geos
+        self.parent = parent
+        self.is_reversed = is_reversed
+
+    def abs_iter(self):
+        points = [point for geo in self for point in geo.get_points()]
+        abs_points = iter(self.parent.transform_points(points))
+        return iter([geo.get_abs_geo(self.parent, abs_points) for geo in self])
+
+    def abs_el(self, element):
+        return self[element].get_abs_geo(self.parent)
+
+    def abs_start_points(self):
+        return self.parent.transform_points([geo.get_start_end_points(True) for geo in self])
+
+    def shifted(self, nr):
+        return InstanceGeos(self[nr:] + self[:nr], self.block_geos, self.parent, self.is_reversed)
+
+    def reverse_geos(self):
+        """
+        Reverse the order and the direction of the geometries, the shared
+        geometries are replaced by their reversed ones
+        """
+        self[:] = [self.block_geos.reversed_geo(geo) for geo in reversed(self)]
+        self.is_reversed = not self.is_reversed
+
+    def shoelace_sum(self, closed):
+        """
+        The shoelace sum of the block geometries turned into the one of the
+        absolute geometries. Turning and scaling keep its sign, while
+        mirroring the arcs is not done the same way (see ArcGeo.make_abs_geo),
+        so it is not used then.
+        @return: a sum of the same sign as Shape.isDirectionOfGeosCCW would
+        get, or None if it is 0 or the insert is mirrored
+        """
+        entity = self.parent
+        while entity is not None:
+            if entity.sca[0] * entity.sca[1] < 0.0:
+                return None
+            entity = entity.parent
+
+        summe = self.block_geos.shoelace_sum(closed)
+        if summe == 0:
+            return None
+        return -summe if self.is_reversed else summe
@@ -34,6 +34,7 @@ from math import degrees, radians
 from copy import copy, deepcopy
 import logging
 import argparse
+import multiprocessing
 import subprocess
 import tempfile
 
@@ -43,6 +44,7 @@ from core.entitycontent import EntityContent
 from core.customgcode import CustomGCode
 from core.linegeo import LineGeo
 from core.holegeo import HoleGeo
+from core.shape import BlockGeos, InstanceGeos
 from core.project import Project
 from globals.config import MyConfig
 import globals.globals as g
@@ -52,8 +54,9 @@ from gui.configwindow import ConfigWindow
 from gui.treehandling import TreeHandler
 from gui.popupdialog import PopUpDialog
 from gui.aboutdialog import AboutDialog
+from gui.importthread import ImportThread
 
-from dxfimport.importer import ReadDXF
+from dxfimport.layerfilter import LayerFilter
 
 from postpro.postprocessor import MyPostProcessor
 from postpro.tspoptimisation import TspOptimization
@@ -63,13 +66,13 @@ from globals.helperfunctions import str_encode, str_decode, qstr_encode
 from globals.six import text_type
 import globals.constants as c
 if c.PYQT5notPYQT4:
-    from PyQt5.QtWidgets import QMainWindow, QGraphicsView, QFileDialog, QApplication, QMessageBox
+    from PyQt5.QtWidgets import QMainWindow, QGraphicsView, QFileDialog, QApplication, QMessageBox, QProgressDialog, QMenu
     from PyQt5.QtGui import QSurfaceFormat
     from PyQt5 import QtCore
     getOpenFileName = QFileDialog.getOpenFileName
     getSaveFileName = QFileDialog.getSaveFileName
 else:
-    from PyQt4.QtGui import QMainWindow, QGraphicsView, QFileDialog, QApplication, QMessageBox
+    from PyQt4.QtGui import QMainWindow, QGraphicsView, QFileDialog, QApplication, QMessageBox, QProgressDialog, QMenu
     from PyQt4 import QtCore
     getOpenFileName = QFileDialog.getOpenFileNameAndFilter
     getSaveFileName = QFileDialog.getSaveFileNameAndFilter
@@ -134,11 +137,15 @@ class MainWindow(QMainWindow):
         self.connectToolbarToConfig()
 
         self.filename = ""
+        self.layer_filter = None
 
         self.valuesDXF = None
+        self.import_thread = None
+        self.import_dialog = None
         self.shapes = Shapes([])
         self.entityRoot = None
         self.layerContents = Layers([])
+        self.layerContentsByNr = {}
         self.newNumber = 1
 
         self.cont_dx = 0.0
@@ -619,6 +626,7 @@ class MainWindow(QMainWindow):
 
         self.cont_scale = float(ScaEntDialog.result[0])
         self.entityRoot.sca = self.cont_scale
+        self.entityRoot.invalidate_transform()
 
         self.d2g.small_reload()
 
@@ -634,6 +642,7 @@ class MainWindow(QMainWindow):
 
         self.cont_rotate = radians(float(RotEntDialog.result[0]))
         self.entityRoot.rot = self.cont_rotate
+        self.entityRoot.invalidate_transform()
 
         self.d2g.small_reload()
 
@@ -668,6 +677,7 @@ class MainWindow(QMainWindow):
         if self.entityRoot.p0.x != self.cont_dx or self.entityRoot.p0.y != self.cont_dy:
             self.entityRoot.p0.x = self.cont_dx
             self.entityRoot.p0.y = self.cont_dy
+            self.entityRoot.invalidate_transform()
 
             self.d2g.small_reload()
         else:
@@ -714,6 +724,8 @@ class MainWindow(QMainWindow):
         It creates the file selection dialog and calls the load function to
         load the selected file.
         """
+        if self.import_thread is not None:
+            return
 
         self.OpenFileDialog(self.tr("Open file"))
 
@@ -748,6 +760,10 @@ class MainWindow(QMainWindow):
         make the plot.
         @param plot: if it should plot
         """
+        if self.import_thread is not None:
+            # Still importing the previous file
+            return False
+
         if not QtCore.QFile.exists(self.filename):
             logger.info(self.tr("Cannot locate file: %s") % self.filename)
             self.OpenFileDialog(self.tr("Manually open file: %s") % self.filename)
@@ -756,7 +772,6 @@ class MainWindow(QMainWindow):
 
         self.setCursor(QtCore.Qt.WaitCursor)
         self.setWindowTitle("DXF2GCODE - [%s]" % self.filename)
-        self.canvas.resetAll()
         self.app.processEvents()
 
         (name, ext) = os.path.splitext(self.filename)
@@ -841,15 +856,36 @@ class MainWindow(QMainWindow):
 
         logger.info(self.tr('Loading file: %s') % self.filename)
 
-        self.valuesDXF = ReadDXF(self.filename)
+        # When the same file is loaded again, whatever did not change is
+        # taken over from its previous import, which stays as it is
+        previous = self.valuesDXF
+        if previous is not None and previous.filename != self.filename:
+            previous = None
+        try:
+            valuesDXF = self.readDXF(previous)
+        except Exception:
+            self.valuesDXF = None
+            self.clearShapes()
+            self.unsetCursor()
+            raise
+        if valuesDXF is None:
+            logger.info(self.tr('Loading of %s cancelled') % self.filename)
+            # A cancelled reload leaves the drawing as it was
+            if previous is None:
+                self.valuesDXF = None
+                self.clearShapes()
+            self.unsetCursor()
+            return False
+        self.valuesDXF = valuesDXF
 
         # Output the information in the text window
         logger.info(self.tr('Loaded layers: %s') % len(self.valuesDXF.layers))
         logger.info(self.tr('Loaded blocks: %s') % len(self.valuesDXF.blocks.Entities))
         for i in range(len(self.valuesDXF.blocks.Entities)):
             layers = self.valuesDXF.blocks.Entities[i].get_used_layers()
-            logger.info(self.tr('Block %i includes %i Geometries, reduced to %i Contours, used layers: %s')
-                        % (i, len(self.valuesDXF.blocks.Entities[i].geo), len(self.valuesDXF.blocks.Entities[i].cont), layers))
+            # The contours of the blocks are only searched when they are used
+            logger.info(self.tr('Block %i includes %i Geometries, used layers: %s')
+                        % (i, len(self.valuesDXF.blocks.Entities[i].geo), layers))
         layers = self.valuesDXF.entities.get_used_layers()
         insert_nr = self.valuesDXF.entities.get_insert_nr()
         logger.info(self.tr('Loaded %i entity geometries; reduced to %i contours; used layers: %s; number of inserts %i')
@@ -871,11 +907,102 @@ class MainWindow(QMainWindow):
         self.ui.unitLabel_8.setText(speed)
         self.ui.unitLabel_9.setText(speed)
 
+        # Only the import is incremental on a reload. The shapes, the scene
+        # and the trees are made anew, also for the contours which were taken
+        # over: a shape takes its settings (depths, feed rates, tool of its
+        # layer) from the configuration when it is made, and a reload is
+        # what applies changes of these; any changes made to the shapes in
+        # the window are dropped as well.
+        self.canvas.resetAll()
         self.makeShapes()
         if plot:
             self.plot()
         return True
 
+    def readDXF(self, previous=None):
+        """
+        Import the DXF file self.filename within a thread, while the window
+        stays responsive and shows the progress. The import may be
+        cancelled. Returns once the import is finished.
+        @param previous: the former import of the file, see ReadDXF
+        @return: the ReadDXF of the file, or None if cancelled
+        """
+        self.import_thread = ImportThread(self.filename, self.layer_filter, previous)
+        self.import_thread.progress.connect(self.importProgress)
+        self.import_thread.warning.connect(self.importWarning)
+
+        self.import_dialog = QProgressDialog(self.tr("Loading file: %s") % os.path.basename(self.filename),
+                                             self.tr("Cancel"), 0, 0, self)
+        self.import_dialog.setWindowTitle("DXF2GCODE")
+        self.import_dialog.setWindowModality(QtCore.Qt.WindowModal)
+        self.import_dialog.setMinimumDuration(500)
+        self.import_dialog.setAutoReset(False)
+        self.import_dialog.setAutoClose(False)
+        self.import_dialog.canceled.connect(self.import_thread.cancel)
+
+        # The window is not used until the import is finished, so the shapes
+        # and the settings stay as they are while the thread reads the file;
+        # if it is cancelled, they are still the ones of the drawing. The
+        # progress dialog only blocks the window once it is shown.
+        actions = [action for menu in self.ui.menubar.findChildren(QMenu)
+                   for action in menu.actions() if action.isEnabled()]
+        for action in actions:
+            action.setEnabled(False)
+        self.ui.centralwidget.setEnabled(False)
+        self.config_window.setEnabled(False)
+
+        loop = QtCore.QEventLoop()
+        self.import_thread.finished.connect(loop.quit)
+        self.import_thread.start()
+        loop.exec_()
+
+        try:
+            return self.import_thread.get_result()
+        finally:
+            self.import_dialog.close()
+            self.import_dialog = None
+            self.import_thread = None
+            for action in actions:
+                action.setEnabled(True)
+            self.ui.centralwidget.setEnabled(True)
+            self.config_window.setEnabled(True)
+
+    def importProgress(self, phase, value, maximum):
+        """
+        Show the progress of the import, see ImportThread
+        """
+        if self.import_dialog is None or self.import_dialog.wasCanceled():
+            return
+        self.import_dialog.setLabelText(phase)
+        self.import_dialog.setMaximum(maximum)
+        self.import_dialog.setValue(min(value, maximum))
+
+    def importWarning(self, title, message):
+        QMessageBox.warning(self, title, message)
+
+    def clearShapes(self):
+        """
+        Remove the shapes of the former file, e.g. when loading a file was
+        cancelled
+        """
+        self.entityRoot = None
+        self.layerContents = Layers([])
+        self.layerContentsByNr = {}
+        self.shapes = Shapes([])
+
+        self.TreeHandler.buildEntitiesTree([])
+        self.TreeHandler.buildLayerTree(self.layerContents)
+        self.canvas.resetAll()
+        if not g.config.mode3d:
+            self.canvas_scene = MyGraphicsScene()
+            self.canvas.setScene(self.canvas_scene)
+        else:
+            self.canvas.update()
+
+        self.enableToolbarButtons(False)
+        # The file may still be loaded again
+        self.ui.actionReload.setEnabled(True)
+
     def plot(self):
         # Populate the treeViews
         self.TreeHandler.buildEntitiesTree(self.entityRoot)
@@ -917,9 +1044,15 @@ class MainWindow(QMainWindow):
                                         p0=Point(self.cont_dx, self.cont_dy), pb=Point(),
                                         sca=[self.cont_scale, self.cont_scale, self.cont_scale], rot=self.cont_rotate)
         self.layerContents = Layers([])
+        self.layerContentsByNr = {}
         self.shapes = Shapes([])
 
+        # The geometries of the contours of the blocks, by block name and
+        # contour number; shared by all inserts of a block
+        self.blockGeos = {}
+
         self.makeEntityShapes(self.entityRoot)
+        self.blockGeos = {}
 
         for layerContent in self.layerContents:
             layerContent.overrideDefaults()
@@ -944,7 +1077,7 @@ class MainWindow(QMainWindow):
         ent_geos = entities.geo
 
         # Loop for the number of contours
-        for cont in entities.cont:
+        for cont_nr, cont in enumerate(entities.cont):
             # Query if it is in the contour of an insert or of a block
             if ent_geos[cont.order[0][0]].Typ == "Insert":
                 ent_geo = ent_geos[cont.order[0][0]]
@@ -978,19 +1111,34 @@ class MainWindow(QMainWindow):
                                   (True if cont.closed else False),
                                   parent)
 
-                for ent_geo_nr in range(len(cont.order)):
-                    ent_geo = ent_geos[cont.order[ent_geo_nr][0]]
-                    if cont.order[ent_geo_nr][1]:
-                        ent_geo.geo.reverse()
-                        for geo in ent_geo.geo:
-                            geo = copy(geo)
-                            geo.reverse()
-                            self.append_geo_to_shape(tmp_shape, geo)
-                        ent_geo.geo.reverse()
+                block_geos = None
+                if parent.name != "Entities":
+                    key = (parent.name, cont_nr)
+                    if key not in self.blockGeos:
+                        self.blockGeos[key] = BlockGeos(self.makeContourGeos(cont, ent_geos))
+                    block_geos = self.blockGeos[key]
+
+                if block_geos is not None and not block_geos.holes:
+                    # The shapes of all inserts of a block share its geometries
+                    tmp_shape.geos = InstanceGeos(block_geos.geos, block_geos, parent)
+                else:
+                    # Holes keep their absolute geometry, see HoleGeo.make_path
+                    if block_geos is None:
+                        geos = self.makeContourGeos(cont, ent_geos)
                     else:
-                        for geo in ent_geo.geo:
-                            self.append_geo_to_shape(tmp_shape, copy(geo))
-
+                        geos = [copy(geo) for geo in block_geos.geos]
+                    for geo in geos:
+                        tmp_shape.append(geo, False)
+                    tmp_shape.make_abs_geos()
+
+                if any(isinstance(geo, HoleGeo) for geo in tmp_shape.geos):
+                    tmp_shape.type = 'Hole'
+                    tmp_shape.closed = True  # TODO adjust import for holes?
+                    if g.config.machine_type == 'drag_knife':
+                        tmp_shape.disabled = True
+                        tmp_shape.allowedToChange = False
+
+                ent_geo = ent_geos[cont.order[-1][0]]
                 if len(tmp_shape.geos) > 0:
                     # All shapes have to be CW direction.
                     tmp_shape.AnalyseAndOptimize()
@@ -1008,7 +1156,27 @@ class MainWindow(QMainWindow):
                         tmp_shape.setSelectionChangedCallback(self.TreeHandler.updateShapeSelection)
                         tmp_shape.setEnableDisableCallback(self.TreeHandler.updateShapeEnabling)
 
-    def append_geo_to_shape(self, shape, geo):
+    def makeContourGeos(self, cont, ent_geos):
+        """
+        Copy the geometries of a contour, in its order and direction
+        @return: list of geometries
+        """
+        geos = []
+        for ent_geo_nr in range(len(cont.order)):
+            ent_geo = ent_geos[cont.order[ent_geo_nr][0]]
+            if cont.order[ent_geo_nr][1]:
+                ent_geo.geo.reverse()
+                for geo in ent_geo.geo:
+                    geo = copy(geo)
+                    geo.reverse()
+                    self.append_geo(geos, geo)
+                ent_geo.geo.reverse()
+            else:
+                for geo in ent_geo.geo:
+                    self.append_geo(geos, copy(geo))
+        return geos
+
+    def append_geo(self, geos, geo):
         if -1e-5 <= geo.length < 1e-5:  # TODO adjust import for this
             return
 
@@ -1019,31 +1187,25 @@ class MainWindow(QMainWindow):
                 geo_a = deepcopy(geo)
                 geo_b.Pe -= diff
                 geo_a.Ps += diff
-                shape.append(geo_b)
-                shape.append(geo_a)
+                geos.append(geo_b)
+                geos.append(geo_a)
             else:
-                shape.append(geo)
+                geos.append(geo)
         else:
-            shape.append(geo)
-
-        if isinstance(geo, HoleGeo):
-            shape.type = 'Hole'
-            shape.closed = True  # TODO adjust import for holes?
-            if g.config.machine_type == 'drag_knife':
-                shape.disabled = True
-                shape.allowedToChange = False
+            geos.append(geo)
 
     def addtoLayerContents(self, shape, lay_nr):
         # Check if the layer already exists and add shape if it is.
-        for LayCon in self.layerContents:
-            if LayCon.nr == lay_nr:
-                LayCon.shapes.append(shape)
-                shape.parentLayer = LayCon
-                return
+        LayCon = self.layerContentsByNr.get(lay_nr)
+        if LayCon is not None:
+            LayCon.shapes.append(shape)
+            shape.parentLayer = LayCon
+            return
 
         # If the Layer does not exist create a new one.
         LayerName = self.valuesDXF.layers[lay_nr].name
         self.layerContents.append(LayerContent(lay_nr, LayerName, [shape]))
+        self.layerContentsByNr[lay_nr] = self.layerContents[-1]
         shape.parentLayer = self.layerContents[-1]
 
     def updateConfiguration(self, result):
@@ -1106,6 +1268,8 @@ class MainWindow(QMainWindow):
 
     def closeEvent(self, e):
         logger.debug(self.tr("Closing"))
+        if self.import_thread is not None:
+            self.import_thread.cancel()
         # self.writeSettings()
         e.accept()
 
@@ -1128,6 +1292,9 @@ if __name__ == "__main__":
     """
     The main function which is executed after program start.
     """
+    # Needed by the processes of the parallel import within frozen executables
+    multiprocessing.freeze_support()
+
     Log = LoggerClass(logger)
 
     g.config = MyConfig()
@@ -1181,6 +1348,12 @@ if __name__ == "__main__":
 #                        help = "read data from FILENAME")
     parser.add_argument("-e", "--export", dest="export_filename",
                         help="export data to FILENAME")
+    parser.add_argument("-l", "--layers", dest="include_layers", action="append",
+                        metavar="PATTERN", help="import only the layers matching PATTERN (may be given several times)")
+    parser.add_argument("-x", "--exclude-layers", dest="exclude_layers", action="append",
+                        metavar="PATTERN", help="don't import the layers matching PATTERN (may be given several times)")
+    parser.add_argument("--layer-regex", action="store_true", dest="layer_regex",
+                        help="layer patterns are regular expressions instead of globs")
     parser.add_argument("-q", "--quiet", action="store_true",
                         dest="quiet", help="no GUI")
 #    parser.add_option("-v", "--verbose",
@@ -1193,6 +1366,10 @@ if __name__ == "__main__":
     if not options.quiet:
         window.show()
 
+    if options.include_layers or options.exclude_layers:
+        window.layer_filter = LayerFilter(options.include_layers, options.exclude_layers,
+                                          options.layer_regex)
+
     if options.filename is not None:
         window.filename = str_decode(options.filename)
         window.load()
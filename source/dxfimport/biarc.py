@@ -26,11 +26,19 @@
 from __future__ import absolute_import
 from __future__ import division
 
-from math import sin, cos, pi, ceil
+from math import sin, cos, pi, ceil, atan2, hypot
 from core.linegeo import LineGeo
 from core.arcgeo import ArcGeo
 from core.point import Point
 
+try:
+    import numpy as np
+except ImportError:
+    np = None
+
+# Fewer points than this are not worth passing through NumPy
+MIN_NUMPY_POINTS = 8
+
 
 class BiarcClass(object):
     """
@@ -219,3 +227,51 @@ class BiarcClass(object):
         else:
             diff = self.geos[1].O.distance(Pt) - abs(self.geos[1].r)
         return abs(diff)
+
+    def get_max_biarc_fitting_error(self, xs, ys):
+        """
+        get_max_biarc_fitting_error() - The largest get_biarc_fitting_error()
+        of many points. Many points are checked at once with NumPy (if it is
+        installed). The error of a LineGeo shaped biarc is the distance of
+        the point to the line.
+        @param xs: the x values of the points
+        @param ys: the y values of the points
+        """
+        if not len(xs):
+            return 0.0
+
+        if np is None or len(xs) < MIN_NUMPY_POINTS:
+            if self.shape == "LineGeo":
+                return max(self.geos[0].distance_l_p(Point(x, y)) for x, y in zip(xs, ys))
+
+            # Same as get_biarc_fitting_error, without making Points
+            arc0, arc1 = self.geos
+            min_ang = min(arc0.s_ang, arc0.e_ang)
+            max_ang = max(arc0.s_ang, arc0.e_ang)
+            fit_error = 0.0
+            for x, y in zip(xs, ys):
+                if min_ang <= atan2(y - arc0.O.y, x - arc0.O.x) <= max_ang:
+                    diff = hypot(x - arc0.O.x, y - arc0.O.y) - abs(arc0.r)
+                else:
+                    diff = hypot(x - arc1.O.x, y - arc1.O.y) - abs(arc1.r)
+                fit_error = max(fit_error, abs(diff))
+            return fit_error
+
+        xs = np.asarray(xs, dtype=float)
+        ys = np.asarray(ys, dtype=float)
+
+        if self.shape == "LineGeo":
+            # Same as LineGeo.distance_l_p
+            Ps = self.geos[0].Ps
+            dx = self.geos[0].Pe.x - Ps.x
+            dy = self.geos[0].Pe.y - Ps.y
+            t = np.clip(((xs - Ps.x) * dx + (ys - Ps.y) * dy) / (dx * dx + dy * dy), 0.0, 1.0)
+            return float(np.hypot(xs - Ps.x - t * dx, ys - Ps.y - t * dy).max())
+
+        arc0, arc1 = self.geos
+        w1 = np.arctan2(ys - arc0.O.y, xs - arc0.O.x)
+        on_arc0 = (w1 >= min(arc0.s_ang, arc0.e_ang)) & (w1 <= max(arc0.s_ang, arc0.e_ang))
+        diff = np.where(on_arc0,
+                        np.hypot(xs - arc0.O.x, ys - arc0.O.y) - abs(arc0.r),
+                        np.hypot(xs - arc1.O.x, ys - arc1.O.y) - abs(arc1.r))
+        return float(np.abs(diff).max())
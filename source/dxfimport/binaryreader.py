@@ -0,0 +1,194 @@
+# -*- coding: utf-8 -*-
+from __future__ import absolute_import
+
+############################################################################
+#
+#   Copyright (C) 2008-2015
+#    Christian Kohlöffel
+#    Jean-Paul Schouwstra
+#
+#   This file is part of DXF2GCODE.
+#
+#   DXF2GCODE is free software: you can redistribute it and/or modify
+#   it under the terms of the GNU General Public License as published by
+#   the Free Software Foundation, either version 3 of the License, or
+#   (at your option) any later version.
+#
+#   DXF2GCODE is distributed in the hope that it will be useful,
+#   but WITHOUT ANY WARRANTY; without even the implied warranty of
+#   MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+#   GNU General Public License for more details.
+#
+#   You should have received a copy of the GNU General Public License
+#   along with DXF2GCODE.  If not, see <http://www.gnu.org/licenses/>.
+#
+############################################################################
+
+from binascii import hexlify
+import logging
+import struct
+
+from dxfimport.tokenizer import DxfStructure, ENCODINGS, NON_ASCII
+
+logger = logging.getLogger("DxfImport.BinaryReader")
+
+# First bytes of every binary DXF file
+SENTINEL = b'AutoCAD Binary DXF\r\n\x1a\x00'
+
+# Types of the values, depending on the group code
+STRING, DOUBLE, INT16, INT32, INT64, BOOL, CHUNK = range(7)
+
+VALUE_TYPES = bytearray(65536)
+for _first, _last, _type in ((10, 59, DOUBLE), (60, 79, INT16), (90, 99, INT32),
+                             (110, 149, DOUBLE), (160, 169, INT64), (170, 179, INT16),
+                             (210, 239, DOUBLE), (270, 289, INT16), (290, 299, BOOL),
+                             (310, 319, CHUNK), (370, 389, INT16), (400, 409, INT16),
+                             (420, 429, INT32), (440, 459, INT32), (460, 469, DOUBLE),
+                             (1004, 1004, CHUNK), (1010, 1059, DOUBLE), (1060, 1070, INT16),
+                             (1071, 1071, INT32)):
+    VALUE_TYPES[_first:_last + 1] = bytes(bytearray([_type])) * (_last - _first + 1)
+
+# Struct format of the numbers
+FORMATS = {DOUBLE: struct.Struct('<d'), INT16: struct.Struct('<h'), INT32: struct.Struct('<i'),
+           INT64: struct.Struct('<q'), BOOL: struct.Struct('<B')}
+
+
+def is_binary_dxf(filename):
+    """
+    Check whether the file is a binary DXF file
+    """
+    with open(filename, 'rb') as file_:
+        return file_.read(len(SENTINEL)) == SENTINEL
+
+
+def is_double(code):
+    """
+    Check whether the values of a group code are stored as double
+    """
+    return 0 <= code < len(VALUE_TYPES) and VALUE_TYPES[code] == DOUBLE
+
+
+class DxfBinaryReader(object):
+    """
+    Reader for binary DXF files, it offers the same interface as the
+    DxfTokenizer. Doubles are passed on as the 8 bytes of the file, all other
+    numbers are converted to the text they would have in an ASCII file, and
+    binary chunks to their hex notation.
+
+    Up to R12 the group codes take one byte (255 announces a two byte code),
+    since R13 they always take two bytes.
+
+    The content of the sections named in skip_sections is dropped; only
+    their SECTION, name and ENDSEC pairs are passed on.
+    """
+    def __init__(self, filename, skip_sections=()):
+        self.filename = filename
+        self.skip_sections = set(name.encode('ascii') for name in skip_sections)
+        self.encoding = ENCODINGS[0]
+
+        # Byte position and group code where the file is broken
+        self.line_nr = 0
+        self.bad_code = None
+
+        # Sections, tables, layers and blocks found while reading
+        self.structure = None
+
+        self._enc_nr = 0
+
+    def raw_pairs(self):
+        """
+        Yield the (code, value) pairs of the file; the values are bytes, see
+        the class description. A ValueError is raised if the file is broken;
+        self.line_nr and self.bad_code then describe where.
+        """
+        structure = self.structure = DxfStructure()
+
+        with open(self.filename, 'rb') as file_:
+            data = bytearray(file_.read())
+
+        size = len(data)
+        pos = len(SENTINEL)
+        short_codes = data[pos:pos + 3] != b'\x00\x00S'
+        unpack_code = struct.Struct('<H').unpack_from
+        value_types = VALUE_TYPES
+        formats = FORMATS
+        skip_sections = self.skip_sections
+
+        pair_nr = 0
+        code = None
+        skipping = False
+        try:
+            while pos < size:
+                self.line_nr = pos
+                if short_codes:
+                    code = data[pos]
+                    pos += 1
+                    if code == 255:
+                        code = unpack_code(data, pos)[0]
+                        pos += 2
+                else:
+                    code = unpack_code(data, pos)[0]
+                    pos += 2
+
+                value_type = value_types[code]
+                if value_type == STRING:
+                    end = data.index(b'\x00', pos)
+                    # Stripped as in ASCII files, so names match either way
+                    value = data[pos:end].strip()
+                    pos = end + 1
+                    if NON_ASCII.search(value) is not None:
+                        self._check_encoding(value)
+                elif value_type == DOUBLE:
+                    value = data[pos:pos + 8]
+                    pos += 8
+                elif value_type == CHUNK:
+                    end = pos + 1 + data[pos]
+                    value = hexlify(data[pos + 1:end]).upper()
+                    pos = end
+                else:
+                    number = formats[value_type]
+                    value = str(number.unpack_from(data, pos)[0]).encode('ascii')
+                    pos += number.size
+
+                if pos > size:
+                    raise ValueError('Unexpected end of file')
+
+                if skipping:
+                    if code != 0 or (value != b'ENDSEC' and value != b'EOF'):
+                        continue
+                    skipping = False
+
+                # Collect the structure of the file on the fly
+                if code == 0:
+                    structure.record(pair_nr, value)
+                elif code == 2 and structure.pending is not None:
+                    skipping = structure.naming_section() and bytes(value) in skip_sections
+                    structure.name(pair_nr, value)
+
+                yield code, value
+                pair_nr += 1
+
+                if code == 0 and value == b'EOF':
+                    break
+
+        except (ValueError, IndexError, struct.error):
+            self.bad_code = code
+            structure.finish(pair_nr)
+            raise ValueError('Binary DXF file is broken at byte %i' % self.line_nr)
+
+        structure.finish(pair_nr)
+
+    def _check_encoding(self, value):
+        """
+        Switch over to the next encoding if the string can't be decoded
+        """
+        while True:
+            try:
+                value.decode(self.encoding)
+                return
+            except UnicodeDecodeError as ex:
+                logger.debug("raw_pairs: UnicodeDecodeError: {0}".format(ex))
+                if self._enc_nr + 1 == len(ENCODINGS):
+                    raise
+                self._enc_nr += 1
+                self.encoding = ENCODINGS[self._enc_nr]
@@ -25,6 +25,8 @@
 
 
 class PointsClass(object):
+    __slots__ = ["point_nr", "geo_nr", "Layer_Nr", "be", "en", "be_cp", "en_cp"]
+
     # Initialisieren der Klasse
     # Initialise the class
     def __init__(self, point_nr=0, geo_nr=0, Layer_Nr=None, be=[], en=[], be_cp=[], en_cp=[]):
@@ -44,7 +46,9 @@ class PointsClass(object):
                "\nbe ->" + str(self.be) + "\nen ->" + str(self.en) +\
                "\nbe_cp ->" + str(self.be_cp) + "\nen_cp ->" + str(self.en_cp)
 
-class ContourClass:
+class ContourClass(object):
+    __slots__ = ["cont_nr", "closed", "order", "length", "visited"]
+
     # Initialisieren der Klasse
     # Initialise the class
     def __init__(self, cont_nr=0, closed=0, order=[], length=0):
@@ -52,6 +56,29 @@ class ContourClass:
         self.closed = closed
         self.order = order
         self.length = length
+        self.update_visited()
+
+    def update_visited(self):
+        """
+        update_visited() - Collect the point numbers of the order except the
+        last one; needs to be called when the order is changed other than by
+        append() or replace_last()
+        """
+        self.visited = set(entry[0] for entry in self.order[:-1])
+
+    def append(self, entry):
+        """
+        append() - Add an entry [point_nr, dir] at the end of the order
+        """
+        if self.order:
+            self.visited.add(self.order[-1][0])
+        self.order.append(entry)
+
+    def replace_last(self, entry):
+        """
+        replace_last() - Replace the last entry of the order
+        """
+        self.order[-1] = entry
 
     def reverse(self):
         """
@@ -63,35 +90,35 @@ class ContourClass:
                 self.order[i][1] = 1
             else:
                 self.order[i][1] = 0
+        self.update_visited()
         return
 
     def is_contour_closed(self):
         """
         is_contour_closed()
-        Return 1 if the contour is closed
+        Return 1 if the contour is closed (the last point is the first one),
+        2 if the last point is another one of the contour
         """
-
-        # Check as this is new...
-        for j in range(len(self.order) - 1):
-            if self.order[-1][0] == self.order[j][0]:
-                if j == 0:
-                    self.closed = 1
-                    return self.closed
-                else:
-                    self.closed = 2
-                    return self.closed
+        if len(self.order) > 1 and self.order[-1][0] in self.visited:
+            if self.order[0][0] == self.order[-1][0]:
+                self.closed = 1
+            else:
+                self.closed = 2
         return self.closed
 
     def remove_other_closed_contour(self):
         """
-        remove_other_closed_contour()
+        remove_other_closed_contour() - Cut off the order before the first
+        point which occurs again later
         """
+        last = {}
+        for i in range(len(self.order)):
+            last[self.order[i][0]] = i
         for i in range(len(self.order)):
-            for j in range(i + 1, len(self.order)):
-                # print '\ni: '+str(i)+'j: '+str(j)
-                if self.order[i][0] == self.order[j][0]:
-                    self.order = self.order[0:i]
-                    break
+            if last[self.order[i][0]] > i:
+                self.order = self.order[0:i]
+                break
+        self.update_visited()
         return
 
     def calc_length(self, geos=None):
@@ -102,6 +129,7 @@ class ContourClass:
         if self.closed == 1 and len(self.order) > 1:
             if self.order[0] == self.order[-1]:
                 del(self.order[-1])
+                self.update_visited()
 
         self.length = 0
         for i in range(len(self.order)):
@@ -111,6 +139,7 @@ class ContourClass:
     # New starting point, set to the beginning
     def set_new_startpoint(self, st_p):
         self.order = self.order[st_p:len(self.order)] + self.order[0:st_p]
+        self.update_visited()
 
     # Wie die Klasse ausgegeben wird.
     def __str__(self):
@@ -0,0 +1,54 @@
+# -*- coding: utf-8 -*-
+from __future__ import absolute_import
+
+############################################################################
+#
+#   Copyright (C) 2008-2015
+#    Christian Kohlöffel
+#    Jean-Paul Schouwstra
+#
+#   This file is part of DXF2GCODE.
+#
+#   DXF2GCODE is free software: you can redistribute it and/or modify
+#   it under the terms of the GNU General Public License as published by
+#   the Free Software Foundation, either version 3 of the License, or
+#   (at your option) any later version.
+#
+#   DXF2GCODE is distributed in the hope that it will be useful,
+#   but WITHOUT ANY WARRANTY; without even the implied warranty of
+#   MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+#   GNU General Public License for more details.
+#
+#   You should have received a copy of the GNU General Public License
+#   along with DXF2GCODE.  If not, see <http://www.gnu.org/licenses/>.
+#
+############################################################################
+
+import logging
+
+from dxfimport.importcache import LRUCache
+
+logger = logging.getLogger("DxfImport.ContourCache")
+
+# Number of blocks (or entity sections) whose contours are kept
+MAX_ENTRIES = 500
+
+
+class ContourCache(LRUCache):
+    """
+    Keeps the contours found for the geometries of blocks and of the entity
+    section, so they are not searched again when the same content is read
+    once more: on a reload of the drawing, or in another drawing which shares
+    a block library. The key is made by ReadDXF.Contour_Key of the content of
+    the line pairs and the settings the contours depend on. The least
+    recently used entries are dropped once there are more than max_entries.
+
+    The contours refer to the geometries by their number only, so copies of
+    them fit any geometries read from the same content.
+    """
+    def __init__(self, max_entries=MAX_ENTRIES):
+        LRUCache.__init__(self, max_entries)
+
+
+# One cache for all drawings read by this process
+contour_cache = ContourCache()
@@ -0,0 +1,250 @@
+# -*- coding: utf-8 -*-
+from __future__ import absolute_import
+
+############################################################################
+#
+#   Copyright (C) 2008-2015
+#    Christian Kohlöffel
+#    Jean-Paul Schouwstra
+#
+#   This file is part of DXF2GCODE.
+#
+#   DXF2GCODE is free software: you can redistribute it and/or modify
+#   it under the terms of the GNU General Public License as published by
+#   the Free Software Foundation, either version 3 of the License, or
+#   (at your option) any later version.
+#
+#   DXF2GCODE is distributed in the hope that it will be useful,
+#   but WITHOUT ANY WARRANTY; without even the implied warranty of
+#   MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+#   GNU General Public License for more details.
+#
+#   You should have received a copy of the GNU General Public License
+#   along with DXF2GCODE.  If not, see <http://www.gnu.org/licenses/>.
+#
+############################################################################
+
+import logging
+
+from dxfimport.classes import ContourClass
+
+logger = logging.getLogger("DxfImport.ContourGraph")
+
+
+class ContourGraph(object):
+    """
+    Finds the contours of the points made by ReadDXF.Find_Common_Points,
+    as ContourSearch.Find_Contours does, but without copying the points and
+    without recursion. The contours found are the same.
+
+    The points are the nodes of a graph, their common points (be_cp, en_cp)
+    its edges. The connected components of the graph are found by
+    union-find; the contours of each component are searched on their own.
+    As in Find_Contours the first unused point of a component is taken
+    and the paths which start there are followed. The number of paths
+    made for one contour is limited by max_paths, so drawings with many
+    branches (T-junctions) don't take forever; beyond it only the first
+    branch at each point is followed.
+
+    An order entry [point_nr, 1] means that the search continues at the
+    common points of the start of that point, [point_nr, 0] at those of its
+    end; see Search_Paths.
+    """
+    def __init__(self, geo, points, max_paths=1000):
+        self.geo = geo
+        self.points = points
+        self.max_paths = max_paths
+
+        # Position of each point within points
+        self.point_pos = dict((point.point_nr, pos) for pos, point in enumerate(points))
+
+        # Point numbers which are already part of a contour
+        self.used = set()
+
+        # Number of searches which reached max_paths, and whether the
+        # current one did
+        self.cut_searches = 0
+        self.cut = False
+
+    def components(self):
+        """
+        Group the points into connected components using union-find
+        @return: list of components, each a list of positions within points;
+        sorted by their first position
+        """
+        parent = list(range(len(self.points)))
+
+        def find(pos):
+            while parent[pos] != pos:
+                parent[pos] = parent[parent[pos]]
+                pos = parent[pos]
+            return pos
+
+        point_pos = self.point_pos
+        for pos, point in enumerate(self.points):
+            for point_nr, end in point.be_cp + point.en_cp:
+                other = point_pos.get(point_nr)
+                if other is None:
+                    continue
+                root, other_root = find(pos), find(other)
+                if root != other_root:
+                    parent[max(root, other_root)] = min(root, other_root)
+
+        components = {}
+        for pos in range(len(self.points)):
+            try:
+                components[find(pos)].append(pos)
+            except KeyError:
+                components[find(pos)] = [pos]
+        return [components[root] for root in sorted(components)]
+
+    def search(self):
+        """
+        Search the contours of all components
+        @return: list of (number of the first point, ContourClass), ordered
+        as by ContourSearch.Find_Contours
+        """
+        found = []
+        for component in self.components():
+            found += self.search_component(component)
+
+        # Same order as if the points had been searched in one go, i.e. by
+        # the first point of each contour
+        found.sort(key=lambda seed_cont: seed_cont[0])
+
+        if self.cut_searches:
+            logger.info("Contour search took only the first branches after %i paths in %i cases"
+                        % (self.max_paths, self.cut_searches))
+
+        return [(self.points[pos].point_nr, cont) for pos, cont in found]
+
+    def search_component(self, component):
+        """
+        Search the contours of one connected component
+        @param component: positions of its points within points, ascending
+        @return: list of (position of the first point, ContourClass)
+        """
+        found = []
+        for pos in component:
+            point = self.points[pos]
+            if point.point_nr in self.used:
+                continue
+
+            be_cp = self.unused(point.be_cp)
+            en_cp = self.unused(point.en_cp)
+            if not be_cp and not en_cp:
+                cont = ContourClass(0, 0, [[point.point_nr, 0]], 0)
+            elif not be_cp:
+                cont = self.best_contour(self.search_paths(ContourClass(0, 0, [[point.point_nr, 0]])))
+            elif not en_cp:
+                cont = self.best_contour(self.search_paths(ContourClass(0, 0, [[point.point_nr, 1]])))
+            else:
+                found_pos = self.search_paths(ContourClass(0, 0, [[point.point_nr, 1]]))
+                cont = self.best_contour(found_pos)
+                # If it isn't closed, extend it beyond the other end; the
+                # paths of the first search stay candidates
+                if cont.closed == 0:
+                    cont.reverse()
+                    cont = self.best_contour(self.search_paths(cont) + found_pos)
+
+            self.used.update(point_nr for point_nr, end in cont.order)
+            found.append((pos, cont))
+        return found
+
+    def unused(self, common_points):
+        return [cp for cp in common_points if cp[0] not in self.used]
+
+    def next_points(self, point_nr, end):
+        """
+        The unused common points at which a contour continues, see Search_Paths
+        """
+        if point_nr in self.used:
+            return []
+        point = self.points[self.point_pos[point_nr]]
+        return self.unused(point.be_cp if end else point.en_cp)
+
+    def search_paths(self, cont):
+        """
+        Follow the paths which continue the contour, as Search_Paths does:
+        the first branch at a point continues the contour, the others
+        continue copies of it which are added to the list of paths. When a
+        path has been followed to its end, the next branch continues the
+        path which is at its position counted from the end of the list.
+        A branch which closes the contour drops the others at its point.
+        The paths are followed by a loop instead of recursively, and no more
+        than max_paths are made.
+        @param cont: the start of the contour, is continued in place
+        @return: list of the paths, cont first
+        """
+        self.cut = False
+        paths = [cont]
+        # For each path being followed: its position, the number of the
+        # branches at its end and the number of those already followed
+        stack = [[0, self.branch(paths, 0), 0]]
+        while stack:
+            frame = stack[-1]
+            c_nr, branches, done = frame
+            if done == branches:
+                stack.pop()
+                continue
+
+            frame[2] += 1
+            new_c_nr = c_nr if done == 0 else len(paths) - branches + done
+            if new_c_nr < 0:
+                # There are fewer paths than branches, since the first one
+                # closed the contour or max_paths was reached
+                continue
+            if not paths[new_c_nr].is_contour_closed():
+                stack.append([new_c_nr, self.branch(paths, new_c_nr), 0])
+
+        if self.cut:
+            self.cut_searches += 1
+        return paths
+
+    def branch(self, paths, c_nr):
+        """
+        Continue the path by the first branch at its end, and copies of it
+        by the other branches as long as there are less than max_paths
+        @return: the number of branches taken
+        """
+        cont = paths[c_nr]
+        point_nr, end = cont.order[-1]
+        branches = self.next_points(point_nr, end)
+        if not branches or cont.is_contour_closed():
+            return len(branches)
+
+        cont.append(list(branches[0]))
+        if cont.is_contour_closed():
+            return len(branches)
+
+        for taken, entry in enumerate(branches[1:]):
+            if len(paths) >= self.max_paths:
+                self.cut = True
+                return taken + 1
+            other = ContourClass(0, 0, [list(entry) for entry in cont.order])
+            other.replace_last(list(entry))
+            paths.append(other)
+        return len(branches)
+
+    def best_contour(self, paths):
+        """
+        The best of the paths as chosen by Get_Best_Contour: the longest
+        closed contour, or the longest open one if none is closed
+        @return: ContourClass
+        """
+        best = None
+        best_open = None
+        for cont in paths:
+            # A path which ran into itself is cut before that point
+            if cont.closed == 2:
+                cont.remove_other_closed_contour()
+                cont.closed = 0
+
+            cont.calc_length(self.geo)
+            if cont.closed == 1:
+                if best is None or best.length < cont.length:
+                    best = cont
+            elif best_open is None or best_open.length < cont.length:
+                best_open = cont
+
+        return best if best is not None else best_open
@@ -0,0 +1,137 @@
+# -*- coding: utf-8 -*-
+from __future__ import absolute_import
+
+############################################################################
+#
+#   Copyright (C) 2008-2015
+#    Christian Kohlöffel
+#    Jean-Paul Schouwstra
+#
+#   This file is part of DXF2GCODE.
+#
+#   DXF2GCODE is free software: you can redistribute it and/or modify
+#   it under the terms of the GNU General Public License as published by
+#   the Free Software Foundation, either version 3 of the License, or
+#   (at your option) any later version.
+#
+#   DXF2GCODE is distributed in the hope that it will be useful,
+#   but WITHOUT ANY WARRANTY; without even the implied warranty of
+#   MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+#   GNU General Public License for more details.
+#
+#   You should have received a copy of the GNU General Public License
+#   along with DXF2GCODE.  If not, see <http://www.gnu.org/licenses/>.
+#
+############################################################################
+
+import hashlib
+import logging
+import pickle
+
+from dxfimport.importcache import LRUCache, source_version, write_pickle
+
+import globals.constants as c
+
+logger = logging.getLogger("DxfImport.FitCache")
+
+# Number of fitted splines and ellipses which are kept
+MAX_ENTRIES = 10000
+
+# Changed whenever the stored data changes, so older files are not used
+CACHE_FORMAT = 2
+
+# The modules which make the fits, relative to the folder of the program; a
+# file of fits made by other versions of them is not used
+FITTING_MODULES = ('dxfimport/spline_convert.py', 'dxfimport/biarc.py',
+                   'dxfimport/geoent_spline.py', 'dxfimport/geoent_ellipse.py',
+                   'core/arcgeo.py', 'core/linegeo.py')
+
+# Name of the file in which the fits are kept, see FitCache.use_file
+FIT_CACHE_FILE = 'fits.cache'
+
+
+class FitCache(LRUCache):
+    """
+    Keeps the lines and arcs fitted to the splines (Spline2Arcs) and to the
+    ellipses (GeoentEllipse.Ellipse_2_Arcs), so an identical curve is not
+    fitted again: in the same drawing, on a reload of the drawing, or in
+    another drawing. The key is made by make_key of everything the fitting
+    depends on. The least recently used entries are dropped once there are
+    more than max_entries.
+
+    The entries may also be kept in a file (see use_file and save), so they
+    are still there after a restart of the program. The file is only used by
+    the same version of the fitting code, see FITTING_MODULES.
+    """
+    def __init__(self, max_entries=MAX_ENTRIES):
+        LRUCache.__init__(self, max_entries)
+        self.path = None
+        self.version = None
+        self.changed = False
+
+    @staticmethod
+    def make_key(*values):
+        """
+        @param values: the curve and the settings of the fitting, whose repr
+        is hashed
+        @return: the key of the fit, a hex string
+        """
+        return hashlib.sha1(repr((CACHE_FORMAT, values)).encode('utf-8')).hexdigest()
+
+    def put(self, key, fit):
+        LRUCache.put(self, key, fit)
+        self.changed = True
+
+    def clear(self):
+        LRUCache.clear(self)
+        self.changed = True
+
+    def use_file(self, path):
+        """
+        Keep the fits in the file at path too, None for the memory only. The
+        fits stored in the file are added to those in memory.
+        """
+        if path == self.path:
+            return
+        self.path = path
+        if path is None:
+            return
+        if self.version is None:
+            self.version = (CACHE_FORMAT, c.VERSION, source_version(FITTING_MODULES))
+
+        try:
+            with open(path, 'rb') as file_:
+                version, fits = pickle.load(file_)
+        except (IOError, OSError):
+            return
+        except Exception as ex:
+            logger.warning("Ignoring the unreadable fit cache %s: %s" % (path, ex))
+            return
+        # Made by another version of the fitting, or of Python
+        if version != self.version:
+            logger.debug("Ignoring the fit cache %s of another version" % path)
+            return
+
+        # Those in memory are used more recently
+        fits.update(self.entries)
+        self.entries = fits
+        self.trim()
+
+    def save(self):
+        """
+        Write the fits into the file given to use_file, if they changed
+        """
+        if self.path is None or not self.changed:
+            return
+
+        try:
+            write_pickle(self.path, (self.version, self.entries))
+        except Exception as ex:
+            logger.warning("Could not store the fit cache: %s" % ex)
+            return
+
+        self.changed = False
+
+
+# One cache for all drawings read by this process
+fit_cache = FitCache()
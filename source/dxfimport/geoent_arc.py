@@ -43,6 +43,8 @@ logger = logging.getLogger("DXFImport.GeoentArc")
 
 
 class GeoentArc(object):
+    __slots__ = ["Typ", "Nr", "Layer_Nr", "length", "geo", "pair_nr"]
+
     def __init__(self, Nr=0, caller=None):
         self.Typ = 'Arc'
         self.Nr = Nr
@@ -44,6 +44,8 @@ logger = logging.getLogger("DXFImport.GeoentCircle")
 
 
 class GeoentCircle(object):
+    __slots__ = ["Typ", "Nr", "Layer_Nr", "length", "geo", "pair_nr"]
+
     def __init__(self, Nr=0, caller=None):
         self.Typ = 'Circle'
         self.Nr = Nr
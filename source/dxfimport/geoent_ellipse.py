@@ -31,6 +31,7 @@ from math import sqrt, sin, cos, atan2, degrees, pi
 from core.point import Point
 from dxfimport.biarc import BiarcClass
 from dxfimport.classes import PointsClass, ContourClass
+from dxfimport.fitcache import fit_cache
 
 import globals.globals as g
 
@@ -39,6 +40,9 @@ class GeoentEllipse(object):
     """
     GeoentEllipse()
     """
+    __slots__ = ["Typ", "Nr", "Layer_Nr", "center", "vector", "ratio", "AngS", "AngE",
+                 "length", "Points", "geo", "PtsVec", "rotation", "a", "b", "ext", "pair_nr"]
+
     def __init__(self, Nr=0, caller=None):
         self.Typ = 'Ellipse'
         self.Nr = Nr
@@ -69,7 +73,16 @@ class GeoentEllipse(object):
 
         # Errechnen der Ellipse / Calculate the ellipse
         self.Ellipse_Grundwerte()
-        self.Ellipse_2_Arcs(tol)
+
+        # Identical ellipses are only fitted once
+        key = fit_cache.make_key('ELLIPSE', (self.center.x, self.center.y),
+                                 (self.vector.x, self.vector.y), self.ratio, self.AngS, self.AngE, tol)
+        fit = fit_cache.get(key)
+        if fit is None:
+            self.Ellipse_2_Arcs(tol)
+            fit_cache.put(key, (self.geo, self.PtsVec))
+        else:
+            self.geo, self.PtsVec = fit
 
     def __str__(self):
         # how to print the object
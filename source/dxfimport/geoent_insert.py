@@ -31,6 +31,9 @@ from core.point import Point
 from dxfimport.classes import ContourClass
 
 class GeoentInsert(object):
+    __slots__ = ["Typ", "Nr", "Layer_Nr", "BlockName", "Point", "Scale", "rot", "length",
+                 "pair_nr"]
+
     def __init__(self, Nr=0, caller=None):
         self.Typ = 'Insert'
         self.Nr = Nr
@@ -42,6 +42,8 @@ logger = logging.getLogger("DXFImport.GeoentLine")
 
 
 class GeoentLine(object):
+    __slots__ = ["Typ", "Nr", "Layer_Nr", "geo", "length", "pair_nr"]
+
     def __init__(self, Nr=0, caller=None):
         self.Typ = 'Line'
         self.Nr = Nr
@@ -33,8 +33,18 @@ from core.arcgeo import ArcGeo
 from core.linegeo import LineGeo
 from dxfimport.classes import PointsClass, ContourClass
 
+try:
+    import numpy as np
+except ImportError:
+    np = None
+
+# Polylines with fewer arcs than this are not worth passing through NumPy
+MIN_NUMPY_ARCS = 32
+
 
 class GeoentLwPolyline(object):
+    __slots__ = ["Typ", "Nr", "Layer_Nr", "length", "geo", "pair_nr"]
+
     def __init__(self, Nr=0, caller=None):
         self.Typ = 'LWPolyline'
         self.Nr = Nr
@@ -116,8 +126,6 @@ class GeoentLwPolyline(object):
         """
         Read()
         """
-        Old_Point = Point(0, 0)
-
         # Assign short name
         lp = caller.line_pairs
         e = lp.index_code(0, caller.start + 1)
@@ -126,9 +134,6 @@ class GeoentLwPolyline(object):
         s = lp.index_code(8, caller.start + 1)
         self.Layer_Nr = caller.Get_Layer_Nr(lp.line_pair[s].value)
 
-        # Ps=None for the first point
-        Ps = None
-
         # Number of vertices
         s = lp.index_code(90, s + 1, e)
         NoOfVert = int(lp.line_pair[s].value)
@@ -136,70 +141,94 @@ class GeoentLwPolyline(object):
         # Polyline flag (bit-coded); default is 0; 1 = Closed; 128 = Plinegen
         s = lp.index_code(70, s + 1, e)
         LWPLClosed = int(lp.line_pair[s].value)
-        # print LWPLClosed
-
-        s = lp.index_code(10, s + 1, e)
-        while 1:
-            # X Value
-            if s is None:
-                break
-            x = float(lp.line_pair[s].value)
-
-            # Y Value
-            s = lp.index_code(20, s + 1, e)
-            y = float(lp.line_pair[s].value)
-            Pe = Point(x=x, y=y)
-
-            # Bulge
-            bulge = 0
-
-            s_nxt_x = lp.index_code(10, s + 1, e)
-            e_nxt_b = s_nxt_x
-
-            # Wenn am Ende dann Suche bis zum Ende
-            # If in the end the search until the end ???
-            if e_nxt_b is None:
-                e_nxt_b = e
-
-            s_bulge = lp.index_code(42, s + 1, e_nxt_b)
-
-            # print('stemp: %s, e: %s, next 10: %s' %(s_temp,e,lp.index_code(10,s+1,e)))
-            if s_bulge is not None:
-                bulge = float(lp.line_pair[s_bulge].value)
-                s_nxt_x = s_nxt_x
-
-            # Take the next X value as the starting value
-            s = s_nxt_x
-
-            # Assign the geometries for the Polyline
-            if Ps is not None:
-                if next_bulge == 0:
-                    self.geo.append(LineGeo(Ps=Ps, Pe=Pe))
-                else:
-                    # self.geo.append(LineGeo(Ps=Ps,Pe=Pe))
-                    # print bulge
-                    self.geo.append(self.bulge2arc(Ps, Pe, next_bulge))
-
-                # L�nge drauf rechnen wenns eine Geometrie ist
-                # Wenns Ldnge count on it is a geometry ???
-                self.length += self.geo[-1].length
-
-            # The bulge is always given for the next point
-            next_bulge = bulge
-            Ps = Pe
-
-        if LWPLClosed == 1 or LWPLClosed == 129:
-            # print("sollten �bereinstimmen: %s, %s" %(Ps,Pe))
-            if next_bulge:
-                self.geo.append(self.bulge2arc(Ps, self.geo[0].Ps, next_bulge))
-            else:
-                self.geo.append(LineGeo(Ps=Ps, Pe=self.geo[0].Ps))
 
-            self.length += self.geo[-1].length
+        points, bulges = self.Read_Vertices(lp, s + 1, e)
+
+        # The bulge is always given for the next point
+        segments = [(points[i - 1], points[i], bulges[i - 1]) for i in range(1, len(points))]
+        if (LWPLClosed == 1 or LWPLClosed == 129) and segments:
+            segments.append((points[-1], points[0], bulges[-1]))
+
+        self.geo = self.segments2geos(segments)
+        for geo in self.geo:
+            self.length += geo.length
 
         # New starting value for the next geometry
         caller.start = e
 
+    def Read_Vertices(self, lp, start, stop):
+        """
+        Read_Vertices() - Collect the vertices of the polyline in one sweep
+        over the line pairs, instead of searching for each of its values.
+        The bulge of a vertex is the first one behind its Y value.
+        @return: the points and the bulges of the vertices
+        """
+        codes = lp.codes
+        value = lp.value
+        xs = []
+        ys = []
+        bulges = []
+
+        x = None
+        bulge_open = False
+        for nr in range(start, stop):
+            code = codes[nr]
+            if code == 10:
+                x = value(nr)
+                bulge_open = False
+            elif code == 20:
+                if x is not None:
+                    xs.append(x)
+                    ys.append(value(nr))
+                    bulges.append(0)
+                    x = None
+                    bulge_open = True
+            elif code == 42 and bulge_open:
+                bulges[-1] = float(value(nr))
+                bulge_open = False
+
+        points = [Point(x=float(x), y=float(y)) for x, y in zip(xs, ys)]
+        return points, bulges
+
+    def segments2geos(self, segments):
+        """
+        segments2geos() - Make the lines and arcs between the vertices. The
+        arcs are made in one batch, see bulges2arcs().
+        @param segments: list of (Ps, Pe, bulge)
+        """
+        arc_segments = [segment for segment in segments if segment[2] != 0]
+        arcs = iter(self.bulges2arcs(arc_segments))
+        return [next(arcs) if bulge != 0 else LineGeo(Ps=Ps, Pe=Pe)
+                for Ps, Pe, bulge in segments]
+
+    def bulges2arcs(self, segments):
+        """
+        bulges2arcs() - Same as bulge2arc() for many segments at once. For
+        long polylines the centre points and radii are computed with NumPy
+        (if it is installed), which gives the same values.
+        @param segments: list of (Ps, Pe, bulge), the bulges being non zero
+        """
+        if np is None or len(segments) < MIN_NUMPY_ARCS:
+            return [self.bulge2arc(Ps, Pe, bulge) for Ps, Pe, bulge in segments]
+
+        values = np.array([(Ps.x, Ps.y, Pe.x, Pe.y, bulge) for Ps, Pe, bulge in segments])
+        psx, psy, pex, pey, bulge = values.T
+
+        c = (1 / bulge - bulge) / 2
+        ox = (psx + pex - (pey - psy) * c) / 2
+        oy = (psy + pey + (pex - psx) * c) / 2
+        r = np.sqrt((ox - psx) ** 2 + (oy - psy) ** 2)
+
+        arcs = []
+        for (Ps, Pe, bulge), x, y, radius in zip(segments, ox.tolist(), oy.tolist(), r.tolist()):
+            if bulge > 0:
+                arcs.append(ArcGeo(Ps=Ps, Pe=Pe, O=Point(x, y), r=radius))
+            else:
+                arc = ArcGeo(Ps=Pe, Pe=Ps, O=Point(x, y), r=radius)
+                arc.reverse()
+                arcs.append(arc)
+        return arcs
+
     def get_start_end_points(self, direction=0):
         if not direction:
             punkt, angle = self.geo[0].get_start_end_points(direction)
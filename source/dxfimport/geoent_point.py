@@ -29,7 +29,9 @@ from core.point import Point
 from dxfimport.classes import ContourClass
 
 
-class GeoentPoint:
+class GeoentPoint(object):
+    __slots__ = ["Typ", "Nr", "Layer_Nr", "geo", "length", "pair_nr"]
+
     def __init__(self, Nr=0, caller=None):
         self.Typ = 'Point'
         self.Nr = Nr
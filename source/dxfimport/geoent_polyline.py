@@ -35,7 +35,9 @@ from dxfimport.classes import PointsClass, ContourClass
 
 
 
-class GeoentPolyline:
+class GeoentPolyline(object):
+    __slots__ = ["Typ", "Nr", "Layer_Nr", "geo", "length", "pair_nr"]
+
     def __init__(self, Nr=0, caller=None):
         self.Typ = 'Polyline'
         self.Nr = Nr
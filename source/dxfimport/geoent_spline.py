@@ -27,12 +27,16 @@ from __future__ import absolute_import
 
 from core.point import Point
 from dxfimport.spline_convert import Spline2Arcs
+from dxfimport.fitcache import fit_cache
 from dxfimport.classes import PointsClass, ContourClass
 
 import globals.globals as g
 
 
-class GeoentSpline:
+class GeoentSpline(object):
+    __slots__ = ["Typ", "Nr", "Layer_Nr", "Spline_flag", "degree", "Knots", "Weights",
+                 "CPoints", "geo", "length", "pair_nr"]
+
     def __init__(self, Nr=0, caller=None):
         self.Typ = 'Spline'
         self.Nr = Nr
@@ -56,13 +60,20 @@ class GeoentSpline:
         # Assign the fitting tolerance
         tol = g.config.fitting_tolerance
         check = g.config.vars.Import_Parameters['spline_check']
-
-        # Umwandeln zu einem ArcSpline
-        # Convert to a ArcSpline
-        Spline2ArcsClass = Spline2Arcs(degree=self.degree, Knots=self.Knots,
-                                       Weights=self.Weights, CPoints=self.CPoints, tol=tol, check=check)
-
-        self.geo = Spline2ArcsClass.Curve
+        fitting = g.config.vars.Import_Parameters['spline_fitting']
+
+        # Umwandeln zu einem ArcSpline, identische Splines nur einmal
+        # Convert to a ArcSpline, identical splines only once
+        key = fit_cache.make_key('SPLINE', self.degree, self.Knots, self.Weights,
+                                 [(Pt.x, Pt.y) for Pt in self.CPoints], tol, check, fitting)
+        self.geo = fit_cache.get(key)
+        if self.geo is None:
+            Spline2ArcsClass = Spline2Arcs(degree=self.degree, Knots=self.Knots,
+                                           Weights=self.Weights, CPoints=self.CPoints, tol=tol, check=check,
+                                           fitting=fitting)
+
+            self.geo = Spline2ArcsClass.Curve
+            fit_cache.put(key, self.geo)
 
         for geo in self.geo:
             self.length += geo.length
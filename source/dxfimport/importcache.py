@@ -0,0 +1,252 @@
+# -*- coding: utf-8 -*-
+from __future__ import absolute_import
+
+############################################################################
+#
+#   Copyright (C) 2008-2015
+#    Christian Kohlöffel
+#    Jean-Paul Schouwstra
+#
+#   This file is part of DXF2GCODE.
+#
+#   DXF2GCODE is free software: you can redistribute it and/or modify
+#   it under the terms of the GNU General Public License as published by
+#   the Free Software Foundation, either version 3 of the License, or
+#   (at your option) any later version.
+#
+#   DXF2GCODE is distributed in the hope that it will be useful,
+#   but WITHOUT ANY WARRANTY; without even the implied warranty of
+#   MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+#   GNU General Public License for more details.
+#
+#   You should have received a copy of the GNU General Public License
+#   along with DXF2GCODE.  If not, see <http://www.gnu.org/licenses/>.
+#
+############################################################################
+
+from collections import OrderedDict
+from copy import deepcopy
+import glob
+import hashlib
+import logging
+import os
+import pickle
+import sys
+import tempfile
+
+logger = logging.getLogger("DxfImport.ImportCache")
+
+# Changed whenever the stored data changes, so older entries are not used
+CACHE_FORMAT = 2
+
+# Extension of the files of the cache
+SUFFIX = '.pickle'
+
+# The packages whose code makes the result of an import, relative to the
+# folder of the program; see source_version
+IMPORT_SOURCES = ('dxfimport', 'core')
+
+# The versions computed by source_version, by their names
+source_versions = {}
+
+try:
+    replace_file = os.replace
+except AttributeError:
+    # Python 2 can't replace a file in one step on every platform
+    def replace_file(source, target):
+        if os.path.exists(target):
+            os.remove(target)
+        os.rename(source, target)
+
+
+def source_version(names):
+    """
+    @param names: modules and packages (all their modules), relative to the
+    folder of the program
+    @return: a hash of their source, or of the size and time of the
+    executable if there is no source (frozen executables)
+    """
+    names = tuple(names)
+    if names in source_versions:
+        return source_versions[names]
+
+    folder = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+    paths = []
+    for name in names:
+        path = os.path.join(folder, name)
+        if os.path.isdir(path):
+            paths += sorted(glob.glob(os.path.join(path, '*.py')))
+        else:
+            paths.append(path)
+
+    sha = hashlib.sha1()
+    try:
+        if not paths:
+            raise IOError("No source in %s" % folder)
+        for path in paths:
+            with open(path, 'rb') as file_:
+                sha.update(file_.read())
+    except (IOError, OSError):
+        stat = os.stat(sys.executable)
+        sha = hashlib.sha1(repr((sys.executable, stat.st_size, stat.st_mtime)).encode('utf-8'))
+
+    source_versions[names] = sha.hexdigest()
+    return source_versions[names]
+
+
+def write_pickle(path, data):
+    """
+    Pickle the data into the file at path. It is written to a temporary file
+    first, so no other instance of the program ever reads a half written
+    file. Errors are raised, the temporary file is removed then.
+    """
+    directory = os.path.dirname(path)
+    if not os.path.isdir(directory):
+        os.makedirs(directory)
+    handle, temp_path = tempfile.mkstemp(suffix='.tmp', dir=directory)
+    try:
+        with os.fdopen(handle, 'wb') as file_:
+            pickle.dump(data, file_, pickle.HIGHEST_PROTOCOL)
+        replace_file(temp_path, path)
+    except Exception:
+        ImportCache.remove(temp_path)
+        raise
+
+
+class LRUCache(object):
+    """
+    Keeps values by their keys in memory. The least recently used entries
+    are dropped once there are more than max_entries. Copies of the values
+    are stored and returned, so later changes of them do not reach the cache.
+    """
+    def __init__(self, max_entries):
+        self.max_entries = max_entries
+        self.entries = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+
+    def get(self, key):
+        """
+        @return: a copy of the value stored for key, or None
+        """
+        try:
+            value = self.entries.pop(key)
+        except KeyError:
+            self.misses += 1
+            return None
+
+        # Most recently used ones at the end
+        self.entries[key] = value
+        self.hits += 1
+        return deepcopy(value)
+
+    def put(self, key, value):
+        """
+        Store a copy of the value for key
+        """
+        self.entries.pop(key, None)
+        self.entries[key] = deepcopy(value)
+        self.trim()
+
+    def trim(self):
+        while len(self.entries) > self.max_entries:
+            self.entries.popitem(last=False)
+
+    def clear(self):
+        self.entries.clear()
+
+
+class ImportCache(object):
+    """
+    Stores the results of DXF imports in a directory, one pickle file per
+    import. A file is named by the hash of the content of the DXF file and
+    of the settings the import depends on, so a changed file or changed
+    settings never hit an old entry. Whenever the directory gets larger than
+    max_size bytes, the least recently used files are removed; a file is
+    used when it is stored or loaded (its modification time is updated).
+    """
+    def __init__(self, directory, max_size):
+        self.directory = directory
+        self.max_size = max_size
+
+    @staticmethod
+    def make_key(filename, settings):
+        """
+        @param filename: the DXF file
+        @param settings: the settings of the import, whose repr is hashed
+        @return: the key of the import, a hex string
+        """
+        sha = hashlib.sha1(repr((CACHE_FORMAT, settings)).encode('utf-8'))
+        with open(filename, 'rb') as file_:
+            for chunk in iter(lambda: file_.read(1 << 20), b''):
+                sha.update(chunk)
+        return sha.hexdigest()
+
+    def path(self, key):
+        return os.path.join(self.directory, key + SUFFIX)
+
+    def load(self, key):
+        """
+        @return: the data stored for key, or None if there is none
+        """
+        path = self.path(key)
+        try:
+            with open(path, 'rb') as file_:
+                data = pickle.load(file_)
+        except (IOError, OSError):
+            return None
+        except Exception as ex:
+            # Broken, or made by another version of the program
+            logger.warning("Removing unreadable entry %s of the import cache: %s" % (key, ex))
+            self.remove(path)
+            return None
+
+        try:
+            os.utime(path, None)
+        except OSError:
+            pass
+        return data
+
+    def store(self, key, data):
+        """
+        Store the data for key and make room for it by removing the least
+        recently used entries
+        """
+        try:
+            write_pickle(self.path(key), data)
+        except Exception as ex:
+            logger.warning("Could not store the import in the cache: %s" % ex)
+            return
+
+        self.evict()
+
+    def evict(self):
+        """
+        Remove the least recently used entries until the cache fits into
+        max_size
+        """
+        entries = []
+        for name in os.listdir(self.directory):
+            if not name.endswith(SUFFIX):
+                continue
+            path = os.path.join(self.directory, name)
+            try:
+                stat = os.stat(path)
+            except OSError:
+                continue
+            entries.append((stat.st_mtime, stat.st_size, path))
+
+        size = sum(entry[1] for entry in entries)
+        for mtime, entry_size, path in sorted(entries):
+            if size <= self.max_size:
+                break
+            logger.debug("Removing %s from the import cache" % os.path.basename(path))
+            self.remove(path)
+            size -= entry_size
+
+    @staticmethod
+    def remove(path):
+        try:
+            os.remove(path)
+        except OSError:
+            pass
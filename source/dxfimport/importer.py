@@ -27,11 +27,23 @@ from __future__ import division
 
 from __future__ import absolute_import
 
+from array import array
+from bisect import bisect_left
+from collections import OrderedDict, deque
+import mmap
+import os
+import struct
+from math import floor
 from copy import deepcopy, copy
+import hashlib
 import logging
 
 from core.point import Point
+from dxfimport.binaryreader import DxfBinaryReader, is_binary_dxf, is_double
 from dxfimport.classes import ContourClass
+from dxfimport.contourcache import contour_cache
+from dxfimport.contourgraph import ContourGraph
+from dxfimport.fitcache import FIT_CACHE_FILE, fit_cache
 from dxfimport.geoent_arc import GeoentArc
 from dxfimport.geoent_circle import GeoentCircle
 from dxfimport.geoent_insert import GeoentInsert
@@ -41,6 +53,9 @@ from dxfimport.geoent_spline import GeoentSpline
 from dxfimport.geoent_ellipse import GeoentEllipse
 from dxfimport.geoent_lwpolyline import GeoentLwPolyline
 from dxfimport.geoent_point import GeoentPoint
+from dxfimport.importcache import IMPORT_SOURCES, ImportCache, source_version
+from dxfimport.parallel import ParallelReader
+from dxfimport.tokenizer import DxfTokenizer
 
 import globals.globals as g
 
@@ -55,47 +70,595 @@ else:
 
 logger = logging.getLogger("DxfImport.Import")
 
+# While the file is tokenized, the progress is reported after this many
+# line pairs
+PROGRESS_PAIRS = 100000
 
-class ReadDXF(QtCore.QObject):
+
+class ImportCancelled(Exception):
+    """
+    Raised by the progress callback of ReadDXF to stop the import
+    """
+
+
+class GeoReader(object):
+    """
+    Reads the geometries (entities) out of the line pairs. It is the base of
+    ReadDXF and is also used on its own by the processes of a parallel import.
+    """
+    def __init__(self, line_pairs=None, skip_entities=(), layer_filter=None):
+        self.line_pairs = line_pairs
+        self.layers = []
+        self.layer_nrs = {}
+
+        # Entities which are not read and the number of skipped ones per type
+        self.skip_entities = set(skip_entities)
+        self.skipped = {}
+
+        # Entities on layers which are not accepted by the filter are not read,
+        # as long as filter_layers is set (see Get_Geo)
+        self.layer_filter = layer_filter
+        self.filter_layers = True
+        self.filtered = 0
+
+        # Called with the phase of the import, a value and its maximum (0 if
+        # unknown), see Report_Progress
+        self.progress = None
+        self.phase = ''
+
+    def Report_Progress(self, phase=None, value=0, maximum=0):
+        """
+        Report_Progress() - Pass the progress on to the progress callback, if
+        there is one. The callback raises ImportCancelled to stop the import.
+        @param phase: description of the phase, None keeps the current one
+        """
+        if phase is not None:
+            self.phase = phase
+        if self.progress is not None:
+            self.progress(self.phase, value, maximum)
+
+    def Get_Geo(self, begin, end, filter_layers=True):
+        """
+        Get_Geo() - Read the geometries of Blocks and Entities
+        @param filter_layers: False to read the entities on all layers, e.g.
+        the content of blocks, which follows the layer of their inserts
+        """
+        geos = []
+        self.filter_layers = filter_layers
+        self.start = self.line_pairs.index_code(0, begin, end)
+        # old_start = self.start
+
+        while self.start is not None:
+            if self.progress is not None:
+                self.Report_Progress(None, self.start, self.line_pairs.nrs)
+
+            # Load the currently found geometry
+            name = self.line_pairs.line_pair[self.start].value
+            pair_nr = self.start
+            entitie_geo = self.get_geo_entitie(len(geos), name)
+
+            # Append only if something was found
+            if entitie_geo is not None:
+                # Where its record starts, see ReadDXF.Get_Changed_Geos
+                entitie_geo.pair_nr = pair_nr
+                geos.append(entitie_geo)
+
+            # Start the next search after one just found
+            self.start = self.line_pairs.index_code(0, self.start, end)
+
+            # Show debugging information if desired
+            # if self.start is not None:
+            #     g.logger.logger.info("Found %s at Linepair %0.0f (Line %0.0f till %0.0f)" \
+            #                          % (name, old_start, old_start * 2 + 4, end * 2 + 4), 1)
+            # else:
+            #     g.logger.logger.info("Found %s at Linepair %0.0f (Line %0.0f till %0.0f)" \
+            #                          % (name, old_start, old_start * 2 + 4, self.start * 2 + 4), 1)
+
+            # if len(geos) > 0:
+            #     g.logger.logger.info(str(geos[-1]), 2)
+
+            # old_start = self.start
+
+        del self.start
+        return geos
+
+    # Verteiler f�r die Geo-Instanzen
+    # wird in def Get_Geo aufgerufen
+    # f�r einen Release kann der ganze Code gerne wieder in einer Datei landen.
+    # Distributor for Geo instances ???
+    # is called in def Get_Geo
+    # For a release of the entire code can be happy again end up in a file. ???
+    def get_geo_entitie(self, geo_nr, name):
+        """
+        get_geo_entitie()
+        """
+        # Entities:
+        # 3DFACE, 3DSOLID, ACAD_PROXY_ENTITY, ARC, ATTDEF, ATTRIB, BODY
+        # CIRCLE, DIMENSTION, ELLIPSE, HATCH, IMAGE, INSERT, LEADER, LINE,
+        # LWPOLYLINE, MLINE, MTEXT, OLEFRAME, OLE2FRAME, POINT, POLYLINE,
+        # RAY, REGION, SEQEND, SHAPE, SOLID, SPLINE, XT, TOLERANCE, TRACE,
+        # VERTEX, VIEWPOINT, XLINE
+
+        # Instanz des neuen Objekts anlegen und gleichzeitig laden
+        # Create a new instance of the object and at the same load ???
+        if name in self.skip_entities:
+            geo = None
+        elif self.layer_filter is not None and self.filter_layers and not self.Layer_Accepted():
+            self.filtered += 1
+            self.Skip_Entity(name)
+            return None
+        elif name == "POLYLINE":
+            geo = GeoentPolyline(geo_nr, self)
+        elif name == "SPLINE":
+            geo = GeoentSpline(geo_nr, self)
+        elif name == "ARC":
+            geo = GeoentArc(geo_nr, self)
+        elif name == "CIRCLE":
+            geo = GeoentCircle(geo_nr, self)
+        elif name == "LINE":
+            geo = GeoentLine(geo_nr, self)
+        elif name == "INSERT":
+            geo = GeoentInsert(geo_nr, self)
+        elif name == "ELLIPSE":
+            geo = GeoentEllipse(geo_nr, self)
+        elif name == "LWPOLYLINE":
+            geo = GeoentLwPolyline(geo_nr, self)
+        elif name == "POINT":
+            geo = GeoentPoint(geo_nr, self)
+        else:
+            geo = None
+
+        if geo is None:
+            # Reported once per type, see Report_Skipped
+            self.skipped[name] = self.skipped.get(name, 0) + 1
+            self.Skip_Entity(name)
+            return None
+
+        return geo
+
+    def Layer_Accepted(self):
+        """
+        Layer_Accepted() - Check the layer of the entity at self.start against
+        the layer filter; the layer is searched as the entity readers do
+        """
+        lp = self.line_pairs
+        s = lp.index_code(8, self.start + 1)
+        if s is None:
+            return True
+        return self.layer_filter.accepts(lp.line_pair[s].value)
+
+    def Skip_Entity(self, name):
+        """
+        Skip_Entity() - Continue behind the entity at self.start without reading
+        it; a POLYLINE is skipped together with its vertices
+        """
+        if name == "POLYLINE":
+            s = self.line_pairs.index_both(0, "SEQEND", self.start + 1)
+            if s is not None:
+                self.start = s
+        self.start += 1  # Eins hochz�hlen sonst gibts ne dauer Schleife
+
+    def Get_Layer_Nr(self, Layer_Name):
+        """
+        Get_Layer_Nr() - Find the number of geometry layers
+        """
+        layer_nr = self.layer_nrs.get(Layer_Name)
+        if layer_nr is not None:
+            return layer_nr
+        layer_nr = len(self.layers)
+        self.layers.append(LayerClass(layer_nr))
+        self.layers[-1].name = Layer_Name
+        self.layer_nrs[Layer_Name] = layer_nr
+        return layer_nr
+
+
+class ContourSearch(object):
+    """
+    Joins the geometries to contours. It is a base of ReadDXF and is also
+    used on its own by the processes of a parallel import.
+    """
+    def Find_Contours(self, geo = None, all_points = None):
+        """
+        Find_Contours() - Find the best continuous contours
+        @return: list of (number of the point the search started at, contour);
+        the contours still refer to the points, see Contours_Points2Geo()
+        """
+
+        params = g.config.vars.Import_Parameters
+        if params['contour_search'] == 'graph':
+            return ContourGraph(geo, all_points, params['max_contour_paths']).search()
+
+        found_contours = []
+        found_first = []
+
+        # The points which are not yet part of a contour, by their number
+        points = OrderedDict((point.point_nr, point) for point in deepcopy(all_points))
+        referrers = self.Get_Referrers(points)
+
+        while len(points) > 0:
+            first = next(iter(points.values()))
+            # print '\n Neue Suche'
+            # Wenn nichts gefunden wird dann einfach die Kontur hochz�hlen
+            # If nothing found then count up the contour
+            if len(first.be_cp) == 0 and len(first.en_cp) == 0:
+                # print '\nGibt Nix'
+                found_contours.append(ContourClass(len(found_contours), 0, [[first.point_nr, 0]], 0))
+            elif len(first.be_cp) == 0 and len(first.en_cp) > 0:
+                # print '\nGibt was R�ckw�rts (Anfang in neg dir)'
+                new_cont_pos = self.Search_Paths(0, [], first.point_nr, 0, points)
+                found_contours.append(self.Get_Best_Contour(len(found_contours), new_cont_pos, geo, points))
+            elif len(first.be_cp) > 0 and len(first.en_cp) == 0:
+                # print '\nGibt was Vorw�rt (Ende in pos dir)'
+                new_cont_neg = self.Search_Paths(0, [], first.point_nr, 1, points)
+                found_contours.append(self.Get_Best_Contour(len(found_contours), new_cont_neg, geo, points))
+            elif len(first.be_cp) > 0 and len(first.en_cp) > 0:
+                # print '\nGibt was in beiden Richtungen'
+                # Suchen der m�glichen Pfade
+                # Search the possible paths
+                new_cont_pos = self.Search_Paths(0, [], first.point_nr, 1, points)
+                # Bestimmen des besten Pfades und �bergabe in cont
+                # Determine the best path and Xbergabe in cont ???
+                found_contours.append(self.Get_Best_Contour(len(found_contours), new_cont_pos, geo, points))
+                # points = self.Remove_Used_Points(cont[-1], points)
+
+                # Falls der Pfad nicht durch den ersten Punkt geschlossen ist
+                # If the path is not closed by the first point
+                if found_contours[-1].closed == 0:
+                    # print '\nPfad nicht durch den ersten Punkt geschlossen'
+                    found_contours[-1].reverse()
+                    # print ("Neue Kontur umgedrejt %s" % cont[-1])
+                    new_cont_neg = self.Search_Paths(0, [found_contours[-1]], first.point_nr, 0, points)
+                    found_contours[-1] = self.Get_Best_Contour(len(found_contours) - 1, new_cont_neg + new_cont_pos, geo, points)
+
+            else:
+                print('FEHLER !!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!')
+
+            points = self.Remove_Used_Points(found_contours[-1], points, referrers)
+            found_first.append(first.point_nr)
+
+        return list(zip(found_first, found_contours))
+
+    def Search_Paths(self, c_nr=None, c=None, p_nr=None, dir=None, points=None):
+        """
+        Search_Paths() - Search the paths through the Contour
+        """
+
+        # Define the direction of the search (1 = positive, 0 = neg or reverse)
+
+        # If it is the first call a new contour is to be created
+        if len(c) == 0:
+            c.append(ContourClass(cont_nr=0, order=[[p_nr, dir]]))
+
+        # Next point depending on the direction; a point which is already
+        # part of another contour leads nowhere
+        point = points.get(p_nr)
+        if point is None:
+            weiter = []
+        elif dir == 0:
+            weiter = point.en_cp
+        elif dir == 1:
+            weiter = point.be_cp
+
+        # Schleife f�r die Anzahl der Abzweig M�glichkeiten
+        # Loop for the number of the branch can write ???
+        for i in range(len(weiter)):
+            # Wenn es die erste M�glichkeit ist Hinzuf�gen zur aktuellen Kontur
+            # If it is the first possibility to add to the current contour
+            if i == 0:
+                if not(c[c_nr].is_contour_closed()):
+                    c[c_nr].append(weiter[0])
+
+            # There is a branch.  It is copied to the current contour and the
+            # other branches follow
+            elif i > 0:
+                if not(c[c_nr].is_contour_closed()):
+                    # print 'Abzweig ist m�glich'
+                    c.append(deepcopy(c[c_nr]))
+                    c[-1].replace_last(weiter[i])
+
+        for i in range(len(weiter)):
+            # print 'I ist: ' +str(i)
+            if i == 0:
+                new_c_nr = c_nr
+            else:
+                new_c_nr = len(c) - len(weiter) + i
+
+            new_p_nr = c[new_c_nr].order[-1][0]
+            new_dir = c[new_c_nr].order[-1][1]
+            if not(c[new_c_nr].is_contour_closed()):
+                c = self.Search_Paths(copy(new_c_nr), c, copy(new_p_nr), copy(new_dir), points)
+        return c
+
+    def Get_Best_Contour(self, c_nr, c=None, geo=None, points=None):
+        """
+        Get_Best_Contour() - Seek for the best (in my opinion) countour
+        """
+
+        # Shortlist of the new contour
+        best = None
+        best_open = None
+        # print ("Es wurden %0.0f Konturen gefunden" %len(c))
+        for i in range(len(c)):
+            # if len(c)>1:
+            #     print ("Kontur Nr %0.0f" %i)
+            #     print c[i]
+
+            # Korrigieren der Kontur falls sie nicht in sich selbst geschlossen ist
+            # The correct contour if it is not closed in on itself
+            if c[i].closed == 2:
+                c[i].remove_other_closed_contour()
+                c[i].closed = 0
+                c[i].calc_length(geo)
+
+            # Search for the best geometry
+            if c[i].closed == 1:
+                c[i].calc_length(geo)
+                if best is None:
+                    best = i
+                else:
+                    if c[best].length < c[i].length:
+                        best = i
+            elif c[i].closed == 0:
+                c[i].calc_length(geo)
+                if best_open is None:
+                    best_open = i
+                else:
+                    if c[best_open].length < c[i].length:
+                        best_open = i
+
+            # Falls keine Geschschlossene dabei ist Beste = Offene
+            # If no Geschschlossene is best = Open ???
+        if best is None:
+            best = best_open
+
+        best_c = c[best]
+        best_c.cont_nr = c_nr
+
+        # print "Beste Kontur Nr:%s" %best_c
+
+        return best_c
+
+    def Get_Referrers(self, points=None):
+        """
+        Get_Referrers() - Find for each point the points which have it among
+        their common points
+        @param points: dict of the points by their number
+        @return: dict of sets of point numbers
+        """
+        referrers = {}
+        for point in points.values():
+            for cp in point.be_cp + point.en_cp:
+                try:
+                    referrers[cp[0]].add(point.point_nr)
+                except KeyError:
+                    referrers[cp[0]] = set([point.point_nr])
+        return referrers
+
+    # All the points in the path from Point Clear to accelerate nights Search ???
+    def Remove_Used_Points(self, cont=None, points=None, referrers=None):
+        """
+        Remove_Used_Points() - Remove the points of the contour and drop them
+        from the common points of the remaining ones
+        @param points: dict of the points by their number
+        @param referrers: see Get_Referrers()
+        """
+        for p_nr in cont.order:
+            points.pop(p_nr[0], None)
+
+            for referrer in referrers.get(p_nr[0], ()):
+                Point = points.get(referrer)
+                if Point is None:
+                    continue
+
+                for be_cp in Point.be_cp:
+                    if p_nr[0] == be_cp[0]:
+                        del Point.be_cp[Point.be_cp.index(be_cp)]
+                        break
+
+                for en_cp in Point.en_cp:
+                    if p_nr[0] == en_cp[0]:
+                        del Point.en_cp[Point.en_cp.index(en_cp)]
+                        break
+
+        # Return to the contour ???
+        return points
+
+    # All the points in the path from Point Clear to accelerate nights Search ???
+    def Contours_Points2Geo(self, cont=None, points=None):
+        """
+        Contours_Points2Geo()
+        """
+        # print cont.order
+        for c_nr in range(len(cont.order)):
+            cont.order[c_nr][0] = points[cont.order[c_nr][0]].geo_nr
+        return cont
+
+
+class ReadDXF(QtCore.QObject, GeoReader, ContourSearch):
     # Initialise the class
-    def __init__(self, filename=None):
+    def __init__(self, filename=None, layer_filter=None, previous=None,
+                 progress=None, warning=None):
+        """
+        @param filename: the DXF file to import
+        @param layer_filter: a LayerFilter; only the entities on the layers it
+        accepts are imported. The content of the blocks is not filtered, it
+        is taken with the inserts which are imported.
+        @param previous: the ReadDXF of a former import of the file, e.g. when
+        it is reloaded. The geometries and contours of the records which did
+        not change are taken over from it. They are copied before they are
+        changed, so it stays as it is in case this import is cancelled.
+        @param progress: called as progress(phase, value, maximum) while
+        reading; it may raise ImportCancelled to stop the import
+        @param warning: called as warning(title, message) instead of showing
+        the warnings in a message box, e.g. when importing in a thread
+        """
         QtCore.QObject.__init__(self)
 
         # Setting up logger
         # logger = g.logger.logger
 
-        str_ = self.Read_File(filename)
-        g.config.metric = self.Get_Unit(str_)
-
-        self.update_tool_values()
+        self.filename = filename
+        self.skip_entities = set(g.config.vars.Import_Parameters['skip_entities'])
+        self.skipped = {}
+        self.layer_filter = layer_filter
+        self.filter_layers = True
+        self.filtered = 0
+        self.parallel = None
+        self.progress = progress
+        self.phase = ''
+        self.warning = warning
+        self.settings = self.Cache_Settings()
+
+        # Nothing can be taken over if the settings changed since
+        self.previous = previous
+        if previous is not None and previous.settings != self.settings:
+            self.previous = None
+        # Numbers of the entity geometries taken over from the previous
+        # import, by their new number
+        self.reused_geos = {}
+        self.previous_contours = None
+        # Hashes of the line pairs of the entity records, see Store_Digests
+        self.geo_digests = None
+
+        # A file which was imported before with the same settings is taken
+        # from the import cache
+        params = g.config.vars.Import_Parameters
+        cache = None
+        if params['import_cache']:
+            cache = ImportCache(os.path.join(g.folder, 'cache'),
+                                params['import_cache_size'] * 1024 * 1024)
+            cache_key = cache.make_key(filename, self.settings)
+            cached = cache.load(cache_key)
+            if cached is not None:
+                logger.info(self.tr("Taking the import from the cache"))
+                self.Restore_Import(cached)
+                self.previous = None
+                return
+
+        # The arcs fitted to splines and ellipses by earlier runs of the
+        # program are taken from the cache folder
+        fit_cache.use_file(os.path.join(g.folder, 'cache', FIT_CACHE_FILE)
+                           if params['fit_cache'] else None)
 
         # Load the contour and store the values in the classes
-        self.line_pairs = self.Get_Line_Pairs(str_)
+        self.read_failed = False
+        self.Report_Progress(self.tr("Reading line pairs"))
+        self.line_pairs = self.Get_Line_Pairs(filename)
 
-        # Debug Informationen
-        # logger.info(("\n\nFile has   %0.0f Lines" % len(str_)), 1)
-        # logger.info(("\nFile has   %0.0f Linepairs" % self.line_pairs.nrs), 1)
+        try:
+            g.config.metric = self.Get_Unit()
+
+            self.update_tool_values()
+
+            # Debug Informationen
+            # logger.info(("\nFile has   %0.0f Linepairs" % self.line_pairs.nrs), 1)
+
+            logger.info(self.tr("Reading DXF Structure"))
+            self.Report_Progress(self.tr("Reading DXF Structure"))
+            sections_pos = self.Get_Sections_pos()
+            self.layers = self.Read_Layers(sections_pos)
+            self.layer_nrs = {}
+            for layer_nr, layer in enumerate(self.layers):
+                self.layer_nrs.setdefault(layer.name, layer_nr)
+
+            blocks_pos = self.Get_Blocks_pos(sections_pos)
+
+            # Large files may be read, and their contours searched, using
+            # several processes
+            if g.config.vars.Import_Parameters['parallel_import']:
+                self.parallel = ParallelReader(self.line_pairs,
+                                               g.config.vars.Import_Parameters['import_processes'],
+                                               self.layer_filter)
+            self.blocks = self.Read_Blocks(blocks_pos)
+            self.entities = self.Read_Entities(sections_pos)
+
+            self.block_nrs = {}
+            for block_nr, block in enumerate(self.blocks.Entities):
+                self.block_nrs.setdefault(block.Name, block_nr)
+
+            self.Report_Skipped(sections_pos)
+
+            # The contours of a block are only searched once the block is
+            # used, i.e. when its cont is first accessed
+            for block in self.blocks.Entities:
+                block.make_cont = self.Get_Block_Contour
+
+            logger.info(self.tr("Creating Contours of Entities"))
+            self.Report_Progress(self.tr("Creating Contours of Entities"))
+            self.entities.cont = self.Get_Cached_Contour(self.entities)
+
+            # A later import compares its content with these
+            self.Store_Digests()
+        finally:
+            if self.parallel is not None:
+                self.parallel.shutdown()
+                self.parallel = None
+            self.previous = None
+            self.previous_contours = None
+            # The file may change once it is imported, a later import must not
+            # read it through the mapping of this one. The stored digests are
+            # all it needs of the line pairs.
+            self.line_pairs.close()
+            self.line_pairs = None
+
+        # Files which could not be read completely are read again each time,
+        # so the warning is not lost
+        if cache is not None and not self.read_failed:
+            cache.store(cache_key, self.Cached_Import())
+        fit_cache.save()
+
+    def Cache_Settings(self):
+        """
+        Cache_Settings() - The settings which change the result of an
+        import; they are part of the key of the import cache. So is the
+        version of the code which makes the result, see IMPORT_SOURCES.
+        """
+        params = g.config.vars.Import_Parameters
+        return (g.config.point_tolerance,
+                g.config.fitting_tolerance,
+                params['spline_check'],
+                params['spline_fitting'],
+                tuple(params['skip_sections']),
+                tuple(sorted(self.skip_entities)),
+                params['contour_search'],
+                params['max_contour_paths'],
+                self.layer_filter.key() if self.layer_filter is not None else None,
+                c.VERSION,
+                source_version(IMPORT_SOURCES))
+
+    def Cached_Import(self):
+        """
+        Cached_Import() - The result of the import as it is stored in the
+        import cache. The contours of the blocks which were not used yet are
+        left out, they are found once the block is used after loading.
+        """
+        return {'metric': g.config.metric,
+                'layers': self.layers,
+                'blocks': self.blocks,
+                'entities': self.entities}
 
-        logger.info(self.tr("Reading DXF Structure"))
-        sections_pos = self.Get_Sections_pos()
-        self.layers = self.Read_Layers(sections_pos)
+    def Restore_Import(self, cached):
+        """
+        Restore_Import() - Take over an import stored by Cached_Import
+        """
+        self.line_pairs = None
+
+        g.config.metric = cached['metric']
+        self.update_tool_values()
 
-        blocks_pos = self.Get_Blocks_pos(sections_pos)
-        self.blocks = self.Read_Blocks(blocks_pos)
-        self.entities = self.Read_Entities(sections_pos)
+        self.layers = cached['layers']
+        self.layer_nrs = {}
+        for layer_nr, layer in enumerate(self.layers):
+            self.layer_nrs.setdefault(layer.name, layer_nr)
 
-        # Aufruf der Klasse um die Konturen zur suchen
-        # Schleife f�r die Anzahl der Bl�cke und den Layern
-        # Call the class to define the contours of search
-        # Loop for the number of blocks and the layer
-        for i in range(len(self.blocks.Entities)):
-            # '\n'
-            # print self.blocks.Entities[i]
-            logger.info(self.tr("Creating Contours of Block Nr: %i") %i)
-            self.blocks.Entities[i].cont = self.Get_Contour(self.blocks.Entities[i])
+        self.blocks = cached['blocks']
+        self.entities = cached['entities']
 
-        logger.info(self.tr("Creating Contours of Entities"))
-        self.entities.cont = self.Get_Contour(self.entities)
+        self.block_nrs = {}
+        for block_nr, block in enumerate(self.blocks.Entities):
+            self.block_nrs.setdefault(block.Name, block_nr)
+            if block.cont is None:
+                block.make_cont = self.Get_Block_Contour
 
     def tr(self, string_to_translate):
         """
@@ -106,30 +669,7 @@ class ReadDXF(QtCore.QObject):
         return text_type(QtCore.QCoreApplication.translate('ReadDXF',
                                                            string_to_translate))
 
-    def Read_File(self, filename):
-        """
-        Read_File() - Load the selected DXF files
-        @param: filename: name of the file to load
-        @return: file contents as a list of strings
-        """
-        encodings = ['utf-8', 'cp1252', 'cp850']
-        last_exception = None
-
-        for e in encodings:
-            try:
-                file_ = open(filename, 'r', encoding=e)
-                str_ = file_.readlines()
-                file_.close()
-                return str_
-            except UnicodeDecodeError as ex:
-                last_exception = ex
-                logger.debug("Read_File: UnicodeDecodeError: {0}".format(ex))
-                pass
-
-        # If that happens, please consider to extend the list of supported encodings.
-        raise last_exception
-
-    def Get_Unit(self, str):
+    def Get_Unit(self):
         """
         Get_Unit() - Get unit of measure English (Imperial) or Metric from DXF file
         """
@@ -139,10 +679,10 @@ class ReadDXF(QtCore.QObject):
 
         metric = 1  # default: metric
 
-        for line in range(len(str) - 2):
-            if str[line].startswith("$MEASUREMENT"):
-                metric = int(str[line + 2].strip())
-                break
+        lp = self.line_pairs
+        s = lp.index_both(9, "$MEASUREMENT")
+        if s is not None and s + 1 < lp.nrs:
+            metric = int(lp.line_pair[s + 1].value)
 
         # Default drawing units for AutoCAD DesignCenter blocks:
         # 0 = Unitless; 1 = Inches; 2 = Feet; 3 = Miles; 4 = Millimeters;
@@ -152,13 +692,12 @@ class ReadDXF(QtCore.QObject):
         # 16 = Hectometers; 17 = Gigameters; 18 = Astronomical units;
         # 19 = Light years; 20 = Parsecs
 
-        for line in range(len(str) - 2):
-            if str[line].startswith("$INSUNITS"):
-                if int(str[line + 2].strip()) == 1:
-                    metric = 0
-                elif int(str[line + 2].strip()) == 4:
-                    metric = 1
-                break
+        s = lp.index_both(9, "$INSUNITS")
+        if s is not None and s + 1 < lp.nrs:
+            if int(lp.line_pair[s + 1].value) == 1:
+                metric = 0
+            elif int(lp.line_pair[s + 1].value) == 4:
+                metric = 1
 
         return metric
 
@@ -178,31 +717,78 @@ class ReadDXF(QtCore.QObject):
             g.config.tool_units_metric = g.config.metric
 
     # Convert the uploaded file into line pairs (code & Value).
-    def Get_Line_Pairs(self, string):
-        line = 0
-        line_pairs = dxflinepairsClass([])
-
-        # Start at the first SECTION
-        while not string[line].startswith("SECTION"):
-            line += 1
-        line -= 1
+    def Get_Line_Pairs(self, filename):
+        """
+        Get_Line_Pairs() - Load the selected DXF file into line pairs
+        @param: filename: name of the file to load
+        @return: the line pairs of the file
+        """
+        skip_sections = g.config.vars.Import_Parameters['skip_sections']
+        binary = is_binary_dxf(filename)
+        mapped = None
+        if binary:
+            line_pairs = dxfbinarypairsClass()
+            tokenizer = DxfBinaryReader(filename, skip_sections=skip_sections)
+        else:
+            tokenizer = DxfTokenizer(filename, skip_sections=skip_sections)
+            if g.config.vars.Import_Parameters['memory_map']:
+                mapped = tokenizer.map_file()
+            if mapped is not None:
+                line_pairs = dxfmappedpairsClass(mapped=mapped, filename=filename)
+            else:
+                line_pairs = dxflinepairsClass()
 
         # Continue to the end if no error occurs. Otherwise abort with error
         try:
-            while line + 1 < len(string):
-                line_pairs.line_pair.append(dxflinepairClass(int(string[line].strip()), string[line + 1].strip()))
-                line += 2
+            if mapped is not None:
+                pairs = tokenizer.mapped_pairs(mapped)
+            else:
+                pairs = tokenizer.raw_pairs()
+            if self.progress is not None:
+                pairs = self.Report_Pairs(pairs)
+            line_pairs.extend(pairs)
 
         except ValueError:
-            message = self.tr('Reading stopped at line %i.\n "%s" is not a valid code (number) - please, check/correct dxf file')\
-                      % (line + 1, string[line].strip())
+            self.read_failed = True
+            if binary:
+                message = self.tr('Reading stopped at byte %i (code %s) of the binary file - please, check/correct dxf file')\
+                          % (tokenizer.line_nr, tokenizer.bad_code)
+            else:
+                message = self.tr('Reading stopped at line %i.\n "%s" is not a valid code (number) - please, check/correct dxf file')\
+                          % (tokenizer.line_nr, tokenizer.bad_code)
             logger.warning(message)
-            QMessageBox.warning(g.window, self.tr("Warning reading linepairs"), message)
-
-        line_pairs.nrs = len(line_pairs.line_pair)
+            self.Show_Warning(self.tr("Warning reading linepairs"), message)
+        except Exception:
+            # E.g. the import was cancelled
+            line_pairs.close()
+            raise
+
+        # The encoding is known for sure once the whole file has been read
+        line_pairs.encoding = tokenizer.encoding
+        line_pairs.structure = tokenizer.structure
         logger.debug(self.tr('Did read %i of linepairs from DXF') % line_pairs.nrs)
         return line_pairs
 
+    def Report_Pairs(self, pairs):
+        """
+        Report_Pairs() - Pass the pairs of the tokenizer on, reporting the
+        number of pairs read every PROGRESS_PAIRS pairs
+        """
+        for nr, pair in enumerate(pairs):
+            if not nr % PROGRESS_PAIRS:
+                self.Report_Progress(None, nr)
+            yield pair
+
+    def Show_Warning(self, title, message):
+        """
+        Show_Warning() - Show a warning in a message box, or pass it on to the
+        warning callback
+        """
+        if self.warning is not None:
+            self.warning(title, message)
+        else:
+            QMessageBox.warning(g.window, title, message)
+
     # Search the sections in the DXF file to recognize Blocke.
     def Get_Sections_pos(self):
         """
@@ -210,27 +796,13 @@ class ReadDXF(QtCore.QObject):
         """
         sections = []
 
-        start = self.line_pairs.index_both(0, "SECTION", 0)
-
-        # Wenn eine Gefunden wurde diese anh�ngen
-        # If a has been found for this attach ???
-        while start is not None:
-            # Wenn eine Gefunden wurde diese anh�ngen
-            # If a has been found for this attach ???
+        # The sections were already found while reading the file
+        for begin, name_pos, end in self.line_pairs.structure.sections:
             sections.append(SectionClass(len(sections)))
-            sections[-1].begin = start
-            name_pos = self.line_pairs.index_code(2, start + 1)
-            sections[-1].name = self.line_pairs.line_pair[name_pos].value
-            end = self.line_pairs.index_both(0, "ENDSEC", start + 1)
-
-            # If section was not properly terminated
-            if end is None:
-                end = self.line_pairs.nrs - 1
-
+            sections[-1].begin = begin
+            sections[-1].name = self.Get_Name(name_pos)
             sections[-1].end = end
 
-            start = self.line_pairs.index_both(0, "SECTION", end)
-
         # g.logger.logger.info(("\n\nSections found:"), 1)
         # for sect in sections:
             # g.logger.logger.info(str(sect), 1)
@@ -250,15 +822,10 @@ class ReadDXF(QtCore.QObject):
         # If the DXF blocks has, read this???
         layers = []
         if 'tables_section' in vars():
-            tables_section = section[sect_nr]
-            start = tables_section.begin
-
-            while start is not None:
-                start = self.line_pairs.index_both(0, "LAYER", start + 1, tables_section.end)
-                if start is not None:
-                    start = self.line_pairs.index_code(2, start + 1)
-                    layers.append(LayerClass(len(layers)))
-                    layers[-1].name = self.line_pairs.line_pair[start].value
+            # The layer entries were already found while reading the file
+            for start, name_pos in self.line_pairs.structure.layers:
+                layers.append(LayerClass(len(layers)))
+                layers[-1].name = self.Get_Name(name_pos)
 
         # g.logger.logger.info(("Layers found:"), 1)
         # for lay in layers:
@@ -279,17 +846,15 @@ class ReadDXF(QtCore.QObject):
         # If the DXF blocks has, read this???
         blocks = []
         if 'blocks_section' in vars():
-            # start = blocks_section.begin
-            start = self.line_pairs.index_both(0, "BLOCK", blocks_section.begin, blocks_section.end)
-            while start is not None:
+            # The blocks were already found while reading the file
+            for begin, name_pos, end, block_sect_nr in self.line_pairs.structure.blocks:
+                if block_sect_nr != blocks_section.Nr:
+                    continue
                 blocks.append(SectionClass())
                 blocks[-1].Nr = len(blocks)
-                blocks[-1].begin = start
-                name_pos = self.line_pairs.index_code(2, start + 1, blocks_section.end)
-                blocks[-1].name = self.line_pairs.line_pair[name_pos].value
-                end = self.line_pairs.index_both(0, "ENDBLK", start + 1, blocks_section.end)
+                blocks[-1].begin = begin
+                blocks[-1].name = self.Get_Name(name_pos)
                 blocks[-1].end = end
-                start = self.line_pairs.index_both(0, "BLOCK", end + 1, blocks_section.end)
 
         # g.logger.logger.info(("Blocks found:"), 1)
         # for bl in blocks:
@@ -297,11 +862,40 @@ class ReadDXF(QtCore.QObject):
 
         return blocks
 
+    def Report_Skipped(self, sections):
+        """
+        Report_Skipped() - Log the skipped sections and entities, one line
+        per section and entity type
+        """
+        skip_sections = g.config.vars.Import_Parameters['skip_sections']
+        for section in sections:
+            if section.name in skip_sections:
+                logger.info(self.tr("Skipped section: %s") % section.name)
+
+        for name in sorted(self.skipped):
+            if name in self.skip_entities:
+                logger.info(self.tr("Skipped %i geometries of type: %s") % (self.skipped[name], name))
+            else:
+                logger.info(self.tr("Found %i geometries of unsupported type: %s") % (self.skipped[name], name))
+
+        if self.filtered:
+            logger.info(self.tr("Skipped %i geometries on filtered layers") % self.filtered)
+
+    def Get_Name(self, name_pos):
+        """
+        Get_Name() - Return the name stored at the given line pair
+        """
+        if name_pos is None:
+            return ''
+        return self.line_pairs.line_pair[name_pos].value
+
     def Read_Blocks(self, blocks_pos):
         """
         Read_Blocks() - Read the block geometries
         """
         blocks = BlocksClass([])
+        ranges = []
+        self.Report_Progress(self.tr("Reading Blocks"))
         for block_nr in range(len(blocks_pos)):
             logger.info("Reading Block %s; Nr: %i" % (blocks_pos[block_nr].name, block_nr))
 
@@ -328,11 +922,48 @@ class ReadDXF(QtCore.QObject):
             else:
                 blocks.Entities[-1].basep.y = float(lp.line_pair[s].value)
 
-            # Read the geometries
-            blocks.Entities[-1].geo = self.Get_Geo(s, e)
+            ranges.append((s, e))
+            # The last geometry ends at the ENDBLK behind e
+            blocks.Entities[-1].pair_range = (s, e + 1)
+
+        # Read the geometries; the ones of the blocks which are unchanged
+        # since the previous import are taken over
+        if self.previous is None:
+            geos = self.Get_Geos(ranges, blocks.Entities)
+        else:
+            previous_blocks = {}
+            for block in self.previous.blocks.Entities:
+                previous_blocks.setdefault(self.previous.Content_Digest(block), deque()).append(block)
+            geos = []
+            for block, (begin, end) in zip(blocks.Entities, ranges):
+                self.Report_Block(block, len(blocks.Entities), begin)
+                reusable = previous_blocks.get(self.Content_Digest(block))
+                if reusable:
+                    geos.append(self.Take_Over_Geos(reusable.popleft(), block))
+                else:
+                    geos.append(self.Get_Geo(begin, end, False))
+
+        for block, geo in zip(blocks.Entities, geos):
+            block.geo = geo
 
         return blocks
 
+    def Take_Over_Geos(self, previous_block, block):
+        """
+        Take_Over_Geos() - Take over the geometries of a block of the previous
+        import, which has the same content
+        """
+        offset = block.pair_range[0] - previous_block.pair_range[0]
+        layers = self.previous.layers
+        geos = []
+        for geo in previous_block.geo:
+            # The previous import keeps its own, see __init__
+            geo = copy(geo)
+            geo.Layer_Nr = self.Get_Layer_Nr(layers[geo.Layer_Nr].name)
+            geo.pair_nr += offset
+            geos.append(geo)
+        return geos
+
     def Read_Entities(self, sections):
         """
         Read_Entities() - Read the entities geometries
@@ -341,114 +972,189 @@ class ReadDXF(QtCore.QObject):
             if sections[section_nr - 1].name.startswith("ENTITIES"):
                 # g.logger.logger.info("Reading Entities", 1)
                 entities = EntitiesClass(0, 'Entities', [])
-                entities.geo = self.Get_Geo(sections[section_nr - 1].begin + 1,
-                                                    sections[section_nr - 1].end - 1)
+                begin = sections[section_nr - 1].begin + 1
+                end = sections[section_nr - 1].end - 1
+                entities.pair_range = (begin, end + 1)
+                self.Report_Progress(self.tr("Reading Entities"), begin, self.line_pairs.nrs)
+                if self.previous is not None and self.previous.geo_digests is not None:
+                    # Before its geometries are taken over
+                    self.previous_contours = self.Get_Previous_Contours()
+                    entities.geo = self.Get_Changed_Geos(begin, end, end + 1)
+                else:
+                    entities.geo = self.Get_Geos([(begin, end)])[0]
 
         return entities
 
-    def Get_Geo(self, begin, end):
+    def Get_Geos(self, ranges, blocks=None):
         """
-        Get_Geo() - Read the geometries of Blocks and Entities
+        Get_Geos() - Read the geometries of several ranges of line pairs, using
+        several processes if the parallel import is enabled
+        @param ranges: list of (begin, end) positions as used by Get_Geo
+        @param blocks: the blocks the ranges belong to, for the progress. The
+        layer filter is not applied to their content, see Get_Geo
+        @return: list with the geometries of each range
         """
-        geos = []
-        self.start = self.line_pairs.index_code(0, begin, end)
-        # old_start = self.start
-
-        while self.start is not None:
-            # Load the currently found geometry
-            name = self.line_pairs.line_pair[self.start].value
-            entitie_geo = self.get_geo_entitie(len(geos), name)
+        filter_layers = blocks is None
+        if self.parallel is not None:
+            geos = self.parallel.read(self, ranges, filter_layers)
+            if geos is not None:
+                return geos
 
-            # Append only if something was found
-            if entitie_geo is not None:
-                geos.append(entitie_geo)
+        geos = []
+        for begin, end in ranges:
+            if blocks is not None:
+                self.Report_Block(blocks[len(geos)], len(blocks), begin)
+            geos.append(self.Get_Geo(begin, end, filter_layers))
+        return geos
 
-            # Start the next search after one just found
-            self.start = self.line_pairs.index_code(0, self.start, end)
+    def Report_Block(self, block, blocks, begin):
+        """
+        Report_Block() - Report that a block is read
+        @param blocks: the number of blocks
+        @param begin: where its line pairs begin
+        """
+        self.Report_Progress(self.tr("Reading Block %i of %i: %s") % (block.Nr + 1, blocks, block.Name),
+                             begin, self.line_pairs.nrs)
 
-            # Show debugging information if desired
-            # if self.start is not None:
-            #     g.logger.logger.info("Found %s at Linepair %0.0f (Line %0.0f till %0.0f)" \
-            #                          % (name, old_start, old_start * 2 + 4, end * 2 + 4), 1)
-            # else:
-            #     g.logger.logger.info("Found %s at Linepair %0.0f (Line %0.0f till %0.0f)" \
-            #                          % (name, old_start, old_start * 2 + 4, self.start * 2 + 4), 1)
+    def Get_Changed_Geos(self, begin, end, stop):
+        """
+        Get_Changed_Geos() - Read the geometries as Get_Geo does, but take over
+        the ones of the records which are unchanged since the previous import.
+        The records are compared by the hash of their line pairs, the ones of
+        the previous import were stored by its Store_Digests.
+        @param stop: where the line pairs of the last record end
+        """
+        previous = self.previous
+        previous_geos = {}
+        for geo, digest in zip(previous.entities.geo, previous.geo_digests):
+            previous_geos.setdefault(digest, deque()).append(geo)
 
-            # if len(geos) > 0:
-            #     g.logger.logger.info(str(geos[-1]), 2)
+        lp = self.line_pairs
+        geos = []
+        self.geo_digests = []
+        record = lp.index_code(0, begin, end)
+        while record is not None:
+            if self.progress is not None:
+                self.Report_Progress(None, record, lp.nrs)
+            record_stop = lp.next_record(record, stop)
+            digest = lp.digest(record, record_stop)
+            reusable = previous_geos.get(digest)
+            if reusable:
+                geo = copy(reusable.popleft())
+                self.reused_geos[len(geos)] = geo.Nr
+                geo.Layer_Nr = self.Get_Layer_Nr(previous.layers[geo.Layer_Nr].name)
+                geo.pair_nr = record
+                new_geos = [geo]
+            else:
+                new_geos = self.Get_Geo(record, min(record_stop, end))
 
-            # old_start = self.start
+            for geo in new_geos:
+                geo.Nr = len(geos)
+                geos.append(geo)
+                self.geo_digests.append(digest)
+            record = lp.index_code(0, record_stop, end)
 
-        del self.start
+        logger.info(self.tr("Took over %i of %i geometries from the previous import")
+                    % (len(self.reused_geos), len(geos)))
         return geos
 
-    # Verteiler f�r die Geo-Instanzen
-    # wird in def Get_Geo aufgerufen
-    # f�r einen Release kann der ganze Code gerne wieder in einer Datei landen.
-    # Distributor for Geo instances ???
-    # is called in def Get_Geo
-    # For a release of the entire code can be happy again end up in a file. ???
-    def get_geo_entitie(self, geo_nr, name):
+    def Get_Block_Nr(self, Block_Name):
+        """
+        Get_Block_Nr() - Find the number of blocks
+        """
+        return self.block_nrs.get(Block_Name, -1)
+
+    def Make_Inserted_Contours(self):
         """
-        get_geo_entitie()
+        Make_Inserted_Contours() - Find the contours of all blocks which are
+        inserted, which is otherwise done when the shapes are made
         """
-        # Entities:
-        # 3DFACE, 3DSOLID, ACAD_PROXY_ENTITY, ARC, ATTDEF, ATTRIB, BODY
-        # CIRCLE, DIMENSTION, ELLIPSE, HATCH, IMAGE, INSERT, LEADER, LINE,
-        # LWPOLYLINE, MLINE, MTEXT, OLEFRAME, OLE2FRAME, POINT, POLYLINE,
-        # RAY, REGION, SEQEND, SHAPE, SOLID, SPLINE, XT, TOLERANCE, TRACE,
-        # VERTEX, VIEWPOINT, XLINE
+        inserted = set()
+        blocks = [self.entities]
+        while blocks:
+            block = blocks.pop()
+            for cont in block.cont:
+                geo = block.geo[cont.order[0][0]]
+                if geo.Typ == "Insert":
+                    new_block = self.blocks.Entities[self.Get_Block_Nr(geo.BlockName)]
+                    if new_block.Nr not in inserted:
+                        self.Report_Progress(self.tr("Creating Contours of Blocks"),
+                                             len(inserted), len(self.blocks.Entities))
+                        inserted.add(new_block.Nr)
+                        blocks.append(new_block)
+
+    def Get_Block_Contour(self, block):
+        """
+        Get_Block_Contour() - Find the contours of a block when it is first used
+        """
+        logger.info(self.tr("Creating Contours of Block Nr: %i") % block.Nr)
+        return self.Get_Cached_Contour(block)
 
-        # Instanz des neuen Objekts anlegen und gleichzeitig laden
-        # Create a new instance of the object and at the same load ???
-        if name == "POLYLINE":
-            geo = GeoentPolyline(geo_nr, self)
-        elif name == "SPLINE":
-            geo = GeoentSpline(geo_nr, self)
-        elif name == "ARC":
-            geo = GeoentArc(geo_nr, self)
-        elif name == "CIRCLE":
-            geo = GeoentCircle(geo_nr, self)
-        elif name == "LINE":
-            geo = GeoentLine(geo_nr, self)
-        elif name == "INSERT":
-            geo = GeoentInsert(geo_nr, self)
-        elif name == "ELLIPSE":
-            geo = GeoentEllipse(geo_nr, self)
-        elif name == "LWPOLYLINE":
-            geo = GeoentLwPolyline(geo_nr, self)
-        elif name == "POINT":
-            geo = GeoentPoint(geo_nr, self)
+    def Get_Cached_Contour(self, entities):
+        """
+        Get_Cached_Contour() - Take the contours from the contour cache if the
+        same content was read before with the same settings, otherwise find
+        them with Get_Contour and add them to the cache
+        """
+        key = self.Contour_Key(entities)
+        cont = contour_cache.get(key)
+        if cont is None:
+            cont = self.Get_Contour(entities)
+            contour_cache.put(key, cont)
         else:
-            logger.info(("Found unsupported geometry type: %s !" % name))
-            self.start += 1  # Eins hochz�hlen sonst gibts ne dauer Schleife
-            return None
-
-        return geo
+            logger.debug("Contours of %s taken from the cache" % entities.Name)
+            # The geometries are still prepared for the contours, e.g. closed
+            # polylines start at their optimal point
+            self.App_Cont_or_Calc_IntPts(entities.geo, [])
+        return cont
 
-    def Get_Layer_Nr(self, Layer_Name):
+    def Contour_Key(self, entities):
         """
-        Get_Layer_Nr() - Find the number of geometry layers
+        Contour_Key() - Key of the contours in the contour cache: the hash of
+        the line pairs the geometries were read from and all settings which
+        change the geometries or the contours
         """
-        for i in range(len(self.layers)):
-            if self.layers[i].name == Layer_Name:
-                layer_nr = i
-                return layer_nr
-        layer_nr = len(self.layers)
-        self.layers.append(LayerClass(layer_nr))
-        self.layers[-1].name = Layer_Name
-        return layer_nr
+        params = g.config.vars.Import_Parameters
+        # The points are sorted by their layer number, so the order of the
+        # used layers counts, not their numbers
+        layer_nrs = sorted(set(geo.Layer_Nr for geo in entities.geo))
+        return (self.Content_Digest(entities),
+                tuple(self.layers[layer_nr].name for layer_nr in layer_nrs),
+                g.config.point_tolerance,
+                g.config.fitting_tolerance,
+                params['spline_check'],
+                params['spline_fitting'],
+                params['contour_search'],
+                params['max_contour_paths'],
+                tuple(sorted(self.skip_entities)),
+                self.layer_filter.key() if self.layer_filter is not None else None)
+
+    def Store_Digests(self):
+        """
+        Store_Digests() - Hash the line pairs of the blocks, of the entities
+        and of each entity record as long as they are the ones which were
+        read. A later import of the file compares its content with these (see
+        Read_Blocks and Get_Changed_Geos), never with the line pairs of this
+        import, which may have changed in between.
+        """
+        for block in self.blocks.Entities:
+            self.Content_Digest(block)
+        self.Content_Digest(self.entities)
 
-    def Get_Block_Nr(self, Block_Name):
+        # Get_Changed_Geos already hashed the records
+        if self.geo_digests is None:
+            lp = self.line_pairs
+            stop = self.entities.pair_range[1]
+            self.geo_digests = [lp.digest(geo.pair_nr, lp.next_record(geo.pair_nr, stop))
+                                for geo in self.entities.geo]
+
+    def Content_Digest(self, entities):
         """
-        Get_Block_Nr() - Find the number of blocks
+        Content_Digest() - Hash of the line pairs the geometries were read from
         """
-        block_nr = -1
-        for i in range(len(self.blocks.Entities)):
-            if self.blocks.Entities[i].Name == Block_Name:
-                block_nr = i
-                break
-        return block_nr
+        if entities.digest is None:
+            entities.digest = self.line_pairs.digest(*entities.pair_range)
+        return entities.digest
 
     def Get_Contour(self, entities=None):
         """
@@ -457,10 +1163,13 @@ class ReadDXF(QtCore.QObject):
         cont = []
 
         points = self.App_Cont_or_Calc_IntPts(entities.geo, cont)
-        points = self.Find_Common_Points(points)
+        points = self.Find_Common_Points(points, g.config.point_tolerance)
         # points = self.Remove_Redundant_Geos(points)
 
-        found_cont = self.Search_Contours(entities.geo, points)
+        if entities is self.entities and self.reused_geos:
+            found_cont = self.Search_Changed_Contours(entities.geo, points)
+        else:
+            found_cont = self.Search_Contours(entities.geo, points)
 
 #         for check_cont in found_cont:
 #             logger.debug("Correcting Contour inaccuracies if found")
@@ -473,10 +1182,11 @@ class ReadDXF(QtCore.QObject):
 
         return cont
 
-    def App_Cont_or_Calc_IntPts(self, geo=None, cont=None):
+    def App_Cont_or_Calc_IntPts(self, geo=None, cont=None, warn=True):
         """
         App_Cont_or_Calc_IntPts()
         Calculate and assign the start and end points
+        @param warn: whether too short geometries are reported
         """
 
         tol = g.config.point_tolerance
@@ -486,86 +1196,77 @@ class ReadDXF(QtCore.QObject):
             # logger.debug("geo: %s" %geo[i])
             warning = geo[i].App_Cont_or_Calc_IntPts(cont, points, i, tol, warning)
 
-        if warning:
-            QMessageBox.warning(g.window, self.tr("Short Elements"),
-                                self.tr("Length of some Elements too short!"
-                                "\nLength must be greater than tolerance."
-                                "\nSkipped Geometries"))
+        if warning and warn:
+            self.Show_Warning(self.tr("Short Elements"),
+                              self.tr("Length of some Elements too short!"
+                              "\nLength must be greater than tolerance."
+                              "\nSkipped Geometries"))
 
         return points
 
-    def Find_Common_Points(self, points=None):
+    @staticmethod
+    def Find_Common_Points(points, tol):
         """
-        Find_Common_Points() - Find common points
+        Find_Common_Points() - Find common points, i.e. the start and end
+        points on the same layer which are within the tolerance of each
+        other. The points are put into a grid with cells as large as the
+        tolerance, so for each point only the neighbouring cells are searched.
+        @param tol: the tolerance, usually g.config.point_tolerance
         """
-        # tol = self.config.points_tolerance.get()
-        tol = g.config.point_tolerance
-
         p_list = []
 
         # Einen List aus allen Punkten generieren
         # Generate list of all points
         for p in points:
-            p_list.append([p.Layer_Nr, p.be.x, p.be.y, p.point_nr, 0])
-            p_list.append([p.Layer_Nr, p.en.x, p.en.y, p.point_nr, 1])
+            p_list.append((p.Layer_Nr, p.be.x, p.be.y, p.point_nr, 0))
+            p_list.append((p.Layer_Nr, p.en.x, p.en.y, p.point_nr, 1))
 
-        # Sort the list
+        # Sort the list, the common points are given in this order
         p_list.sort()
-        # print p_list
-
-        # Loop for number of list items
-        # Start = where to begin the search of the same elements
-        anf = []
 
-        for l_nr in range(len(p_list)):
-            inter = []
-            # print ("Suche Starten f�r Geometrie Nr: %i, Punkt %i" % (p_list[l_nr][3], l_nr))
-
-            if isinstance(anf, list):
-                c_nr = 0
+        # Cells of the grid with the numbers of the points within them; with
+        # no tolerance only points at exactly the same position are common
+        grid = {}
+        for l_nr, (layer, x, y, point_nr, end) in enumerate(p_list):
+            if tol > 0:
+                key = (layer, int(floor(x / tol)), int(floor(y / tol)))
             else:
-                c_nr = anf
-
-            anf = []
-
-            # Schleife bis n�chster X Wert Gr��er ist als selbst +tol und Layer Gr��er gleich
-            # Loop until the next X value is greater than yourself and layer Gr + tol he same ???
-            while p_list[c_nr][0] < p_list[l_nr][0] or \
-                  p_list[c_nr][1] <= (p_list[l_nr][1] + tol):
-                # print ("Suche Punkt %i" % (c_nr))
-
-                # Erstes das �bereinstimmt is der n�chste Anfang
-                # First, the match is the next start
-                if isinstance(anf, list) and\
-                   p_list[c_nr][0] == p_list[l_nr][0] and\
-                   abs(p_list[c_nr][1] - p_list[l_nr][1]) <= tol:
-                    anf = c_nr
-                    # print ("N�chste Suche starten bei" +str(anf))
-
-                # Falls gleich anh�ngen
-                # Attach if equal ???
-                if p_list[c_nr][0] == p_list[l_nr][0] and \
-                   abs(p_list[c_nr][1] - p_list[l_nr][1]) <= tol and\
-                   abs(p_list[c_nr][2] - p_list[l_nr][2]) <= tol and\
-                   c_nr != l_nr:
-                    inter.append(c_nr)
-                    # print ("Gefunden" +str(inter))
-                c_nr += 1
-
-                if c_nr == len(p_list):
-                    break
-
-            # Anh�ngen der gefundenen Punkte an points
-            # Append the found points
-            for int_p in inter:
-                # Common Anfangspunkt
-                # Common starting point
-                if p_list[l_nr][-1] == 0:
-                    points[p_list[l_nr][-2]].be_cp.append(p_list[int_p][3:5])
-                # Common Endpunkt
-                # Common end point
-                else:
-                    points[p_list[l_nr][-2]].en_cp.append(p_list[int_p][3:5])
+                key = (layer, x, y)
+            try:
+                grid[key].append(l_nr)
+            except KeyError:
+                grid[key] = [l_nr]
+
+        for (layer, cx, cy), members in grid.items():
+            # The points within the cell and the cells around it
+            if tol > 0:
+                inter = []
+                for dx in (-1, 0, 1):
+                    for dy in (-1, 0, 1):
+                        inter += grid.get((layer, cx + dx, cy + dy), [])
+                inter.sort()
+            else:
+                inter = members
+
+            for l_nr in members:
+                layer, x, y, point_nr, end = p_list[l_nr]
+
+                # Anhängen der gefundenen Punkte an points
+                # Append the found points
+                for int_p in inter:
+                    other = p_list[int_p]
+                    if int_p == l_nr or other[1] > x + tol or \
+                       abs(other[1] - x) > tol or abs(other[2] - y) > tol:
+                        continue
+
+                    # Common Anfangspunkt
+                    # Common starting point
+                    if end == 0:
+                        points[point_nr].be_cp.append([other[3], other[4]])
+                    # Common Endpunkt
+                    # Common end point
+                    else:
+                        points[point_nr].en_cp.append([other[3], other[4]])
 
         return points
 
@@ -594,224 +1295,258 @@ class ReadDXF(QtCore.QObject):
 
     def Search_Contours(self, geo = None, all_points = None):
         """
-        Search_Contours() - Find the best continuous contours
+        Search_Contours() - Find the best continuous contours; the layers
+        are searched in parallel if the parallel import is enabled
         """
+        found = None
+        if self.parallel is not None:
+            found = self.parallel.find_contours(geo, all_points)
+        if found is None:
+            found = self.Find_Contours(geo, all_points)
 
         found_contours = []
-        points = deepcopy(all_points)
-
-        while len(points) > 0:
-            # print '\n Neue Suche'
-            # Wenn nichts gefunden wird dann einfach die Kontur hochz�hlen
-            # If nothing found then count up the contour
-            if len(points[0].be_cp) == 0 and len(points[0].en_cp) == 0:
-                # print '\nGibt Nix'
-                found_contours.append(ContourClass(len(found_contours), 0, [[points[0].point_nr, 0]], 0))
-            elif len(points[0].be_cp) == 0 and len(points[0].en_cp) > 0:
-                # print '\nGibt was R�ckw�rts (Anfang in neg dir)'
-                new_cont_pos = self.Search_Paths(0, [], points[0].point_nr, 0, points)
-                found_contours.append(self.Get_Best_Contour(len(found_contours), new_cont_pos, geo, points))
-            elif len(points[0].be_cp) > 0 and len(points[0].en_cp) == 0:
-                # print '\nGibt was Vorw�rt (Ende in pos dir)'
-                new_cont_neg = self.Search_Paths(0, [], points[0].point_nr, 1, points)
-                found_contours.append(self.Get_Best_Contour(len(found_contours), new_cont_neg, geo, points))
-            elif len(points[0].be_cp) > 0 and len(points[0].en_cp) > 0:
-                # print '\nGibt was in beiden Richtungen'
-                # Suchen der m�glichen Pfade
-                # Search the possible paths
-                new_cont_pos = self.Search_Paths(0, [], points[0].point_nr, 1, points)
-                # Bestimmen des besten Pfades und �bergabe in cont
-                # Determine the best path and Xbergabe in cont ???
-                found_contours.append(self.Get_Best_Contour(len(found_contours), new_cont_pos, geo, points))
-                # points = self.Remove_Used_Points(cont[-1], points)
-
-                # Falls der Pfad nicht durch den ersten Punkt geschlossen ist
-                # If the path is not closed by the first point
-                if found_contours[-1].closed == 0:
-                    # print '\nPfad nicht durch den ersten Punkt geschlossen'
-                    found_contours[-1].reverse()
-                    # print ("Neue Kontur umgedrejt %s" % cont[-1])
-                    new_cont_neg = self.Search_Paths(0, [found_contours[-1]], points[0].point_nr, 0, points)
-                    found_contours[-1] = self.Get_Best_Contour(len(found_contours) - 1, new_cont_neg + new_cont_pos, geo, points)
-
-            else:
-                print('FEHLER !!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!')
-
-            points = self.Remove_Used_Points(found_contours[-1], points)
-
-            found_contours[-1] = self.Contours_Points2Geo(found_contours[-1], all_points)
+        for first, cont in found:
+            cont.cont_nr = len(found_contours)
+            found_contours.append(self.Contours_Points2Geo(cont, all_points))
         return found_contours
 
-    def Search_Paths(self, c_nr=None, c=None, p_nr=None, dir=None, points=None):
+    def Get_Previous_Contours(self):
         """
-        Search_Paths() - Search the paths through the Contour
+        Get_Previous_Contours() - Group the searched contours of the entities
+        of the previous import by the connected component of their points.
+        The contours of a component only depend on the points within it.
+        @return: dict with the component of each geometry by its number, the
+        number of points of each component, the contours of each component,
+        and the length which the search looked up for each geometry
         """
-
-        # Define the direction of the search (1 = positive, 0 = neg or reverse)
-
-        # If it is the first call a new contour is to be created
-        if len(c) == 0:
-            c.append(ContourClass(cont_nr=0, order=[[p_nr, dir]]))
-
-        # Suchen des Punktes innerhalb der points List (n�tig da verwendete Punkte gel�scht werden)
-        # Search for the item within the list of points (ntig used as points gelscht) ???
-        for new_p_nr in range(len(points)):
-            if points[new_p_nr].point_nr == p_nr:
-                break
-
-        # Next point depending on the direction
-        if dir == 0:
-            weiter = points[new_p_nr].en_cp
-        elif dir == 1:
-            weiter = points[new_p_nr].be_cp
-
-        # Schleife f�r die Anzahl der Abzweig M�glichkeiten
-        # Loop for the number of the branch can write ???
-        for i in range(len(weiter)):
-            # Wenn es die erste M�glichkeit ist Hinzuf�gen zur aktuellen Kontur
-            # If it is the first possibility to add to the current contour
-            if i == 0:
-                if not(c[c_nr].is_contour_closed()):
-                    c[c_nr].order.append(weiter[0])
-
-            # There is a branch.  It is copied to the current contour and the
-            # other branches follow
-            elif i > 0:
-                if not(c[c_nr].is_contour_closed()):
-                    # print 'Abzweig ist m�glich'
-                    c.append(deepcopy(c[c_nr]))
-                    del c[-1].order[-1]
-                    c[-1].order.append(weiter[i])
-
-        for i in range(len(weiter)):
-            # print 'I ist: ' +str(i)
-            if i == 0:
-                new_c_nr = c_nr
-            else:
-                new_c_nr = len(c) - len(weiter) + i
-
-            new_p_nr = c[new_c_nr].order[-1][0]
-            new_dir = c[new_c_nr].order[-1][1]
-            if not(c[new_c_nr].is_contour_closed()):
-                c = self.Search_Paths(copy(new_c_nr), c, copy(new_p_nr), copy(new_dir), points)
-        return c
-
-    def Get_Best_Contour(self, c_nr, c=None, geo=None, points=None):
+        entities = self.previous.entities
+        direct = []
+        points = self.Find_Common_Points(self.App_Cont_or_Calc_IntPts(entities.geo, direct, False),
+                                         g.config.point_tolerance)
+
+        previous = {'component': {}, 'size': [], 'contours': [], 'length': {}}
+        for comp_nr, component in enumerate(ContourGraph(entities.geo, points).components()):
+            for pos in component:
+                previous['component'][points[pos].geo_nr] = comp_nr
+                # Find_Contours takes the length of the geometry with the
+                # number of the point (see ContourClass.calc_length)
+                previous['length'][points[pos].geo_nr] = entities.geo[points[pos].point_nr].length
+            previous['size'].append(len(component))
+            previous['contours'].append([])
+
+        # The contours made by App_Cont_or_Calc_IntPts come first
+        for cont in entities.cont[len(direct):]:
+            previous['contours'][previous['component'][cont.order[0][0]]].append(cont)
+        return previous
+
+    def Search_Changed_Contours(self, geo=None, all_points=None):
         """
-        Get_Best_Contour() - Seek for the best (in my opinion) countour
+        Search_Changed_Contours() - Find the contours as Search_Contours does,
+        but take over the ones of the previous import for the connected
+        components of points which consist of the same unchanged geometries
         """
+        previous = self.previous_contours
+        reused_geos = self.reused_geos
+
+        # The point of each geometry
+        geo_points = dict((point.geo_nr, point.point_nr) for point in all_points)
+
+        search_points = []
+        taken = []
+        for component in ContourGraph(geo, all_points).components():
+            previous_nrs = [reused_geos.get(all_points[pos].geo_nr) for pos in component]
+            comp_nrs = set(previous['component'].get(geo_nr) for geo_nr in previous_nrs)
+            comp_nr = comp_nrs.pop()
+            if len(comp_nrs) or comp_nr is None or \
+               previous['size'][comp_nr] != len(component) or \
+               any(geo[all_points[pos].point_nr].length != previous['length'][geo_nr]
+                   for pos, geo_nr in zip(component, previous_nrs)):
+                search_points += [all_points[pos] for pos in component]
+                continue
+
+            new_nrs = dict((geo_nr, all_points[pos].geo_nr) for pos, geo_nr in zip(component, previous_nrs))
+            for cont in previous['contours'][comp_nr]:
+                cont = ContourClass(cont.cont_nr, cont.closed,
+                                    [[new_nrs[entry[0]], entry[1]] for entry in cont.order],
+                                    cont.length)
+                cont.visited = set(geo_points[entry[0]] for entry in cont.order[:-1])
+                # The search starts at the first point of a contour
+                taken.append((min(geo_points[entry[0]] for entry in cont.order), cont))
+
+        logger.debug("Searching the contours of %i of %i points"
+                     % (len(search_points), len(all_points)))
+        search_points.sort(key=lambda point: point.point_nr)
+
+        found = None
+        if self.parallel is not None:
+            found = self.parallel.find_contours(geo, search_points)
+        if found is None:
+            found = self.Find_Contours(geo, search_points)
+
+        found = [(first, self.Contours_Points2Geo(cont, all_points)) for first, cont in found]
+        found_contours = []
+        for first, cont in sorted(found + taken, key=lambda first_cont: first_cont[0]):
+            cont.cont_nr = len(found_contours)
+            found_contours.append(cont)
+        return found_contours
 
-        # Shortlist of the new contour
-        best = None
-        best_open = None
-        # print ("Es wurden %0.0f Konturen gefunden" %len(c))
-        for i in range(len(c)):
-            # if len(c)>1:
-            #     print ("Kontur Nr %0.0f" %i)
-            #     print c[i]
-
-            # Korrigieren der Kontur falls sie nicht in sich selbst geschlossen ist
-            # The correct contour if it is not closed in on itself
-            if c[i].closed == 2:
-                c[i].remove_other_closed_contour()
-                c[i].closed = 0
-                c[i].calc_length(geo)
-
-            # Search for the best geometry
-            if c[i].closed == 1:
-                c[i].calc_length(geo)
-                if best is None:
-                    best = i
-                else:
-                    if c[best].length < c[i].length:
-                        best = i
-            elif c[i].closed == 0:
-                c[i].calc_length(geo)
-                if best_open is None:
-                    best_open = i
-                else:
-                    if c[best_open].length < c[i].length:
-                        best_open = i
+class dxflinepairClass:
+    def __init__(self, code=None, value=None):
+        self.code = code
+        self.value = value
 
-            # Falls keine Geschschlossene dabei ist Beste = Offene
-            # If no Geschschlossene is best = Open ???
-        if best is None:
-            best = best_open
+    def __str__(self):
+        return 'Code ->' + str(self.code) + '\nvalue ->' + self.value
 
-        best_c = c[best]
-        best_c.cont_nr = c_nr
+class dxflinepairsClass:
+    """
+    Column store of the line pairs. The group codes are kept in an array, the
+    values as raw bytes in one buffer with an array of offsets into it; they
+    are only decoded when accessed. For each group code a sorted array of
+    its positions is kept, such that the next occurrence of a code is found
+    by bisection instead of scanning through all pairs in between.
+    """
+    def __init__(self, encoding='utf-8'):
+        self.encoding = encoding
+        self.codes = array('h')
+        self.offsets = array('L', [0])
+        self.buffer = bytearray()
+        self.code_pos = {}
 
-        # print "Beste Kontur Nr:%s" %best_c
+    def __str__(self):
+        return 'Number of Line Pairs: ' + str(self.nrs)
 
-        return best_c
+    @property
+    def nrs(self):
+        return len(self.codes)
 
-    # All the points in the path from Point Clear to accelerate nights Search ???
-    def Remove_Used_Points(self, cont=None, points=None):
+    def close(self):
         """
-        Remove_Used_Points()
+        close() - Release the file the values are read from, if they are not
+        kept in memory; the line pairs can't be used afterwards
         """
-        for p_nr in cont.order:
+        pass
 
-            # This has to be 2 separate loops, otherwise one element is missing
-            for Point in points:
-                if p_nr[0] == Point.point_nr:
-                    del points[points.index(Point)]
+    @property
+    def line_pair(self):
+        return dxflinepairsView(self)
 
-            for Point in points:
-                for be_cp in Point.be_cp:
-                    if p_nr[0] == be_cp[0]:
-                        del Point.be_cp[Point.be_cp.index(be_cp)]
-                        break
+    def extend(self, pairs):
+        """
+        extend() - Append (code, value) pairs, the values given as bytes
+        """
+        codes_append = self.codes.append
+        offsets_append = self.offsets.append
+        buffer = self.buffer
+        code_pos = self.code_pos
+        nr = len(self.codes)
+
+        for code, value in pairs:
+            codes_append(code)
+            buffer += value
+            offsets_append(len(buffer))
+            try:
+                code_pos[code].append(nr)
+            except KeyError:
+                code_pos[code] = array('L', [nr])
+            nr += 1
 
-                for en_cp in Point.en_cp:
-                    if p_nr[0] == en_cp[0]:
-                        del Point.en_cp[Point.en_cp.index(en_cp)]
-                        break
+    def index_codes(self):
+        """
+        index_codes() - (Re)build the positions of each group code
+        """
+        self.code_pos = {}
+        for nr, code in enumerate(self.codes):
+            try:
+                self.code_pos[code].append(nr)
+            except KeyError:
+                self.code_pos[code] = array('L', [nr])
 
-        # Return to the contour ???
-        return points
+    def slice(self, begin, stop):
+        """
+        slice() - Cut out the line pairs from begin up to stop, e.g. to send
+        them to another process. Nothing is copied pair by pair, the offsets
+        are rebased by from_slice() on the receiving side.
+        @return: a tuple which can be pickled
+        """
+        return (self.__class__, self.encoding, self.codes[begin:stop],
+                self.offsets[begin:stop + 1], self.buffer[self.offsets[begin]:self.offsets[stop]])
 
-    # All the points in the path from Point Clear to accelerate nights Search ???
-    def Contours_Points2Geo(self, cont=None, points=None):
+    @staticmethod
+    def from_slice(state):
         """
-        Contours_Points2Geo()
+        from_slice() - Create the line pairs out of a tuple made by slice()
         """
-        # print cont.order
-        for c_nr in range(len(cont.order)):
-            cont.order[c_nr][0] = points[cont.order[c_nr][0]].geo_nr
-        return cont
+        return state[0].from_state(*state[1:])
+
+    @classmethod
+    def from_state(cls, encoding, codes, offsets, buffer):
+        line_pairs = cls(encoding)
+        line_pairs.codes = codes
+        base = offsets[0]
+        line_pairs.offsets = array('L', [offset - base for offset in offsets])
+        line_pairs.buffer = buffer
+        line_pairs.index_codes()
+        return line_pairs
 
-class dxflinepairClass:
-    def __init__(self, code=None, value=None):
-        self.code = code
-        self.value = value
+    def code(self, nr):
+        return self.codes[nr]
 
-    def __str__(self):
-        return 'Code ->' + str(self.code) + '\nvalue ->' + self.value
+    def value(self, nr):
+        return self.buffer[self.offsets[nr]:self.offsets[nr + 1]].decode(self.encoding)
 
-class dxflinepairsClass:
-    def __init__(self, line_pair):
-        self.nrs = 0
-        self.line_pair = line_pair
+    def next_record(self, nr, stop):
+        """
+        next_record() - Position of the record behind the one at nr, or stop if
+        there is none before; the VERTEX and SEQEND records belong to their
+        POLYLINE
+        """
+        nr = self.index_code(0, nr + 1, stop)
+        while nr is not None and self.value(nr) in ('VERTEX', 'SEQEND'):
+            nr = self.index_code(0, nr + 1, stop)
+        return stop if nr is None else nr
 
-    def __str__(self):
-        return 'Number of Line Pairs: ' + str(self.nrs)
+    def digest(self, begin, stop):
+        """
+        digest() - Hash of the line pairs from begin up to stop, which is the
+        same for the same content at any position of any file
+        """
+        sha = hashlib.sha1()
+        stop = min(stop, self.nrs)
+        if stop > begin:
+            base = self.offsets[begin]
+            sha.update(self.codes[begin:stop].tobytes())
+            sha.update(array('L', [offset - base for offset in self.offsets[begin:stop + 1]]).tobytes())
+            sha.update(self.buffer[base:self.offsets[stop]])
+        return sha.hexdigest()
 
     # Search for information in the line pairs (both code & value)
     # Optional start and end values for the search
-    def index_both(self, code=0, value=0, start=0, stop= -1):
+    def index_both(self, code=0, value=0, start=0, stop=-1):
         """
         index_both()
         """
 
         # If stop==-1 then stop at the end of the pairs
         if stop == -1:
-            stop = len(self.line_pair)
+            stop = self.nrs
+
+        positions = self.code_pos.get(code)
+        if positions is None:
+            return None
+
+        # Compare the raw values, so nothing needs to be decoded
+        value = value.encode(self.encoding)
+        buffer = self.buffer
+        offsets = self.offsets
 
         # Start the search within the specified parameters
-        for i in range(start, stop):
-            if self.line_pair[i].code == code and self.line_pair[i].value == value:
-                return i
+        for i in range(bisect_left(positions, start), len(positions)):
+            nr = positions[i]
+            if nr >= stop:
+                break
+            if buffer[offsets[nr]:offsets[nr + 1]] == value:
+                return nr
 
         #If nothing found return "None"
         return None
@@ -820,23 +1555,157 @@ class dxflinepairsClass:
     # optional mit start und endwert f�r die Suche
     #Search for information in the Line Pairs (both code & value)
     #Optional start and end values for the search
-    def index_code(self, code=0, start=0, stop= -1):
+    def index_code(self, code=0, start=0, stop=-1):
         """
         index_code()
         """
 
         # If stop == -1 then stop at the end of the pairs
         if stop == -1:
-            stop = len(self.line_pair)
+            stop = self.nrs
 
-        # Start the search within the specified parameters
-        for i in range(start, stop):
-            if self.line_pair[i].code == code:
-                return i
+        positions = self.code_pos.get(code)
+        if positions is None:
+            return None
+
+        # Next position of the code behind start
+        i = bisect_left(positions, start)
+        if i < len(positions) and positions[i] < stop:
+            return positions[i]
 
         # If nothing found return "None"
         return None
 
+class dxfbinarypairsClass(dxflinepairsClass):
+    """
+    Line pairs of a binary DXF file. Doubles are kept as their 8 bytes and
+    returned as float, such that they don't have to pass through text.
+    """
+    double = struct.Struct('<d')
+
+    def value(self, nr):
+        value = self.buffer[self.offsets[nr]:self.offsets[nr + 1]]
+        if is_double(self.codes[nr]):
+            return self.double.unpack(value)[0]
+        return value.decode(self.encoding)
+
+class dxfmappedpairsClass(dxflinepairsClass):
+    """
+    Line pairs of a memory mapped file. Instead of a copy of the values the
+    start and end of each value within the mapping are kept, so only the
+    values which are asked for are ever copied out of the file.
+    """
+    def __init__(self, encoding='utf-8', mapped=None, filename=None):
+        dxflinepairsClass.__init__(self, encoding)
+        self.buffer = mapped
+        self.filename = filename
+        self.offsets = None
+        self.starts = array('L')
+        self.ends = array('L')
+
+    def extend(self, spans):
+        """
+        extend() - Append (code, start, end) spans of the mapping
+        """
+        codes_append = self.codes.append
+        starts_append = self.starts.append
+        ends_append = self.ends.append
+        code_pos = self.code_pos
+        nr = len(self.codes)
+
+        for code, start, end in spans:
+            codes_append(code)
+            starts_append(start)
+            ends_append(end)
+            try:
+                code_pos[code].append(nr)
+            except KeyError:
+                code_pos[code] = array('L', [nr])
+            nr += 1
+
+    def close(self):
+        if self.buffer is not None:
+            self.buffer.close()
+            self.buffer = None
+
+    def value(self, nr):
+        return self.buffer[self.starts[nr]:self.ends[nr]].decode(self.encoding)
+
+    def digest(self, begin, stop):
+        """
+        digest() - The text of the file from the first up to the last pair,
+        codes included, is hashed
+        """
+        sha = hashlib.sha1()
+        stop = min(stop, self.nrs)
+        if stop > begin:
+            sha.update(self.codes[begin:stop].tobytes())
+            sha.update(self.buffer[self.starts[begin]:self.ends[stop - 1]])
+        return sha.hexdigest()
+
+    def index_both(self, code=0, value=0, start=0, stop=-1):
+        """
+        index_both()
+        """
+        if stop == -1:
+            stop = self.nrs
+
+        positions = self.code_pos.get(code)
+        if positions is None:
+            return None
+
+        value = value.encode(self.encoding)
+        buffer = self.buffer
+        starts = self.starts
+        ends = self.ends
+
+        for i in range(bisect_left(positions, start), len(positions)):
+            nr = positions[i]
+            if nr >= stop:
+                break
+            if buffer[starts[nr]:ends[nr]] == value:
+                return nr
+
+        return None
+
+    def slice(self, begin, stop):
+        """
+        slice() - The positions within the file are passed on, the receiving
+        side maps the file itself
+        """
+        return (self.__class__, self.encoding, self.codes[begin:stop],
+                self.starts[begin:stop], self.ends[begin:stop], self.filename)
+
+    @classmethod
+    def from_state(cls, encoding, codes, starts, ends, filename):
+        with open(filename, 'rb') as file_:
+            mapped = mmap.mmap(file_.fileno(), 0, access=mmap.ACCESS_READ)
+        line_pairs = cls(encoding, mapped, filename)
+        line_pairs.codes = codes
+        line_pairs.starts = starts
+        line_pairs.ends = ends
+        line_pairs.index_codes()
+        return line_pairs
+
+class dxflinepairsView:
+    """
+    Gives access to the line pairs of a dxflinepairsClass as if they were
+    a list of dxflinepairClass objects.
+    """
+    def __init__(self, line_pairs):
+        self.line_pairs = line_pairs
+
+    def __len__(self):
+        return self.line_pairs.nrs
+
+    def __getitem__(self, nr):
+        lp = self.line_pairs
+        if nr < 0:
+            nr += lp.nrs
+        if not 0 <= nr < lp.nrs:
+            raise IndexError('line pair index out of range')
+        return dxflinepairClass(lp.codes[nr], lp.value(nr))
+
 class LayerClass:
     def __init__(self, Nr=0, name=''):
         self.Nr = Nr
@@ -863,13 +1732,43 @@ class SectionClass:
     def __len__(self):
         return self.__len__
 
-class EntitiesClass:
+class EntitiesClass(object):
     def __init__(self, Nr=0, Name='', geo=[], cont=[]):
         self.Nr = Nr
         self.Name = Name
         self.basep = Point(x=0.0, y=0.0)
         self.geo = geo
-        self.cont = cont
+        self._cont = cont
+
+        # Range (begin, stop) of the line pairs the geometries are read from
+        # and the hash of these line pairs, see ReadDXF.Content_Digest
+        self.pair_range = None
+        self.digest = None
+
+        # If set, it is called to find the contours when they are first used
+        self.make_cont = None
+
+    @property
+    def cont(self):
+        if self.make_cont is not None:
+            make_cont = self.make_cont
+            self.make_cont = None
+            self._cont = make_cont(self)
+        return self._cont
+
+    @cont.setter
+    def cont(self, cont):
+        self.make_cont = None
+        self._cont = cont
+
+    def __getstate__(self):
+        # Contours which were not made yet are stored as None, see
+        # ReadDXF.Restore_Import
+        state = self.__dict__.copy()
+        if state['make_cont'] is not None:
+            state['_cont'] = None
+        state['make_cont'] = None
+        return state
 
     def __str__(self):
         # how to print the object
@@ -0,0 +1,77 @@
+# -*- coding: utf-8 -*-
+from __future__ import absolute_import
+
+############################################################################
+#
+#   Copyright (C) 2008-2015
+#    Christian Kohlöffel
+#    Jean-Paul Schouwstra
+#
+#   This file is part of DXF2GCODE.
+#
+#   DXF2GCODE is free software: you can redistribute it and/or modify
+#   it under the terms of the GNU General Public License as published by
+#   the Free Software Foundation, either version 3 of the License, or
+#   (at your option) any later version.
+#
+#   DXF2GCODE is distributed in the hope that it will be useful,
+#   but WITHOUT ANY WARRANTY; without even the implied warranty of
+#   MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+#   GNU General Public License for more details.
+#
+#   You should have received a copy of the GNU General Public License
+#   along with DXF2GCODE.  If not, see <http://www.gnu.org/licenses/>.
+#
+############################################################################
+
+from fnmatch import translate
+import re
+
+
+class LayerFilter(object):
+    """
+    Decides by the name of its layer whether an entity is imported. A layer
+    is accepted if it matches one of the include patterns (or there are none)
+    and none of the exclude patterns. Patterns are globs like "MILL:*", or
+    regular expressions if regex is set (these may match anywhere in the
+    name). Layer names are compared case insensitive, as in CAD programs.
+    """
+    def __init__(self, include=None, exclude=None, regex=False):
+        self.patterns = (include or [], exclude or [])
+        self.regex = regex
+        self.include = [self.compile(pattern, regex) for pattern in include or []]
+        self.exclude = [self.compile(pattern, regex) for pattern in exclude or []]
+
+        # The decision for each layer name seen so far
+        self.accepted = {}
+
+    def __str__(self):
+        return 'include ->' + str(self.patterns[0]) + '\nexclude ->' + str(self.patterns[1])
+
+    def key(self):
+        """
+        @return: a hashable value which is equal for filters that accept the
+        same layers
+        """
+        return tuple(self.patterns[0]), tuple(self.patterns[1]), self.regex
+
+    @staticmethod
+    def compile(pattern, regex):
+        """
+        @return: a function which checks a name against the pattern
+        """
+        if regex:
+            return re.compile(pattern, re.IGNORECASE).search
+        return re.compile(translate(pattern), re.IGNORECASE).match
+
+    def accepts(self, name):
+        """
+        Check whether the entities of the layer named name are imported
+        """
+        try:
+            return self.accepted[name]
+        except KeyError:
+            accepted = (not self.include or any(matches(name) for matches in self.include)) and \
+                       not any(matches(name) for matches in self.exclude)
+            self.accepted[name] = accepted
+            return accepted
@@ -0,0 +1,312 @@
+# -*- coding: utf-8 -*-
+from __future__ import absolute_import
+from __future__ import division
+
+############################################################################
+#
+#   Copyright (C) 2008-2015
+#    Christian Kohlöffel
+#    Jean-Paul Schouwstra
+#
+#   This file is part of DXF2GCODE.
+#
+#   DXF2GCODE is free software: you can redistribute it and/or modify
+#   it under the terms of the GNU General Public License as published by
+#   the Free Software Foundation, either version 3 of the License, or
+#   (at your option) any later version.
+#
+#   DXF2GCODE is distributed in the hope that it will be useful,
+#   but WITHOUT ANY WARRANTY; without even the implied warranty of
+#   MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+#   GNU General Public License for more details.
+#
+#   You should have received a copy of the GNU General Public License
+#   along with DXF2GCODE.  If not, see <http://www.gnu.org/licenses/>.
+#
+############################################################################
+
+from collections import OrderedDict
+import logging
+import multiprocessing
+
+try:
+    from concurrent.futures import ProcessPoolExecutor
+except ImportError:
+    ProcessPoolExecutor = None
+
+import globals.globals as g
+
+logger = logging.getLogger("DxfImport.Parallel")
+
+# Fewer line pairs than this are read within the main process
+MIN_PAIRS = 200000
+
+# Smallest number of line pairs which is sent to a process at once
+MIN_CHUNK_PAIRS = 20000
+
+# The work is split into this many chunks per process, to balance the load
+CHUNKS_PER_PROCESS = 4
+
+# Records at which the line pairs must not be split
+CONTINUED_RECORDS = ('VERTEX', 'SEQEND')
+
+# Fewer points than this are joined to contours within the main process
+MIN_CONTOUR_POINTS = 2000
+
+
+class WorkerConfig(object):
+    """
+    Stand-in for g.config within the worker processes. It only holds the
+    settings which are needed to read the geometries.
+    """
+    def __init__(self, settings):
+        self.point_tolerance = settings['point_tolerance']
+        self.fitting_tolerance = settings['fitting_tolerance']
+        self.metric = settings['metric']
+        self.vars = WorkerVars(settings['Import_Parameters'])
+
+
+class WorkerVars(object):
+    def __init__(self, import_parameters):
+        self.Import_Parameters = import_parameters
+
+
+class GeoLength(object):
+    """
+    Stand-in for a geometry within the worker processes; the contour search
+    only needs its length.
+    """
+    def __init__(self, length):
+        self.length = length
+
+
+def read_geos(settings, state, ranges, filter_layers):
+    """
+    Read the geometries of some ranges of line pairs. Runs in a worker process.
+    @param settings: the import settings, see ParallelReader.settings
+    @param state: the line pairs as made by dxflinepairsClass.slice()
+    @param ranges: list of (begin, end) positions within these line pairs
+    @param filter_layers: see GeoReader.Get_Geo
+    @return: the geometries of each range, the names of the layers which the
+    Layer_Nr of the geometries refer to, the numbers of skipped entities per
+    type and the number of entities on filtered layers
+    """
+    from dxfimport.importer import GeoReader, dxflinepairsClass
+
+    g.config = WorkerConfig(settings)
+
+    line_pairs = dxflinepairsClass.from_slice(state)
+    try:
+        reader = GeoReader(line_pairs,
+                           settings['Import_Parameters']['skip_entities'],
+                           settings['layer_filter'])
+        geos = [reader.Get_Geo(begin, end, filter_layers) for begin, end in ranges]
+    finally:
+        line_pairs.close()
+    return geos, [layer.name for layer in reader.layers], reader.skipped, reader.filtered
+
+
+def find_contours(settings, lengths, points):
+    """
+    Join the points of one layer to contours. Runs in a worker process.
+    @param settings: the import settings, see ParallelReader.settings
+    @param lengths: dict with the lengths of the geometries by their number
+    @param points: the points of the layer, see ReadDXF.Find_Common_Points
+    @return: see ContourSearch.Find_Contours
+    """
+    from dxfimport.importer import ContourSearch
+
+    g.config = WorkerConfig(settings)
+
+    geo = dict((geo_nr, GeoLength(length)) for geo_nr, length in lengths.items())
+    return ContourSearch().Find_Contours(geo, points)
+
+
+class ParallelReader(object):
+    """
+    Reads the geometries of large files using a pool of processes. The line
+    pairs are split at the records into chunks, each chunk is read by one
+    process. Afterwards the layers are merged in the order of the chunks,
+    which gives the same layer numbers as reading the file in one go.
+
+    The contours of the layers are searched by the same pool, one layer per
+    process, since geometries on different layers are never joined.
+    """
+    def __init__(self, line_pairs, processes=0, layer_filter=None):
+        self.line_pairs = line_pairs
+        self.processes = processes or multiprocessing.cpu_count()
+        self.executor = None
+        self.failed = False
+
+        params = g.config.vars.Import_Parameters
+        self.settings = {'point_tolerance': g.config.point_tolerance,
+                         'fitting_tolerance': g.config.fitting_tolerance,
+                         'metric': g.config.metric,
+                         'layer_filter': layer_filter,
+                         'Import_Parameters': dict((key, params[key]) for key in params)}
+
+    def read(self, reader, ranges, filter_layers=True):
+        """
+        Read the geometries of the given ranges of line pairs
+        @param reader: the ReadDXF instance, which gets the layers
+        @param ranges: list of (begin, end) positions as used by Get_Geo
+        @param filter_layers: see GeoReader.Get_Geo
+        @return: list with the geometries of each range, or None if the
+        ranges should be read within this process
+        """
+        size = sum(max(end - begin, 0) for begin, end in ranges)
+        if ProcessPoolExecutor is None or self.failed or self.processes < 2 or size < MIN_PAIRS:
+            return None
+
+        chunk_size = max(size // (self.processes * CHUNKS_PER_PROCESS), MIN_CHUNK_PAIRS)
+        tasks = self.make_tasks(ranges, chunk_size)
+        logger.debug("Reading %i line pairs in %i chunks" % (size, len(tasks)))
+
+        try:
+            if self.executor is None:
+                self.executor = self.make_executor()
+            futures = [self.executor.submit(read_geos, self.settings,
+                                            self.line_pairs.slice(begin, stop),
+                                            [(b, e) for range_nr, b, e in parts], filter_layers)
+                       for begin, stop, parts in tasks]
+            results = [future.result() for future in futures]
+        except Exception as ex:
+            logger.warning("Parallel import failed, reading in one process: %s" % ex)
+            self.failed = True
+            self.shutdown()
+            return None
+
+        return self.merge(reader, ranges, tasks, results)
+
+    def make_executor(self):
+        """
+        Start the processes; they are spawned rather than forked, so they do
+        not inherit the state of the GUI
+        """
+        try:
+            context = multiprocessing.get_context('spawn')
+            return ProcessPoolExecutor(self.processes, mp_context=context)
+        except (AttributeError, TypeError):
+            return ProcessPoolExecutor(self.processes)
+
+    def make_tasks(self, ranges, chunk_size):
+        """
+        Split the ranges into chunks of about chunk_size line pairs; small
+        ranges (blocks) which follow each other are joined into one chunk.
+        @return: list of [begin, stop, parts] with parts being a list of
+        (range_nr, begin, end) relative to begin
+        """
+        tasks = []
+        for range_nr, (begin, end) in enumerate(ranges):
+            if end <= begin:
+                continue
+
+            for part_begin, part_end in self.split_range(begin, end, chunk_size):
+                stop = self.get_stop(part_end)
+                if tasks and tasks[-1][0] <= part_begin and stop - tasks[-1][0] <= chunk_size:
+                    task = tasks[-1]
+                    task[1] = max(task[1], stop)
+                else:
+                    task = [part_begin, stop, []]
+                    tasks.append(task)
+                task[2].append((range_nr, part_begin - task[0], part_end - task[0]))
+        return tasks
+
+    def split_range(self, begin, end, chunk_size):
+        """
+        Split a range at the records into parts of about chunk_size
+        """
+        lp = self.line_pairs
+        parts = []
+        while end - begin > chunk_size:
+            split = lp.index_code(0, begin + chunk_size, end)
+            while split is not None and lp.value(split) in CONTINUED_RECORDS:
+                split = lp.index_code(0, split + 1, end)
+            if split is None:
+                break
+            parts.append((begin, split))
+            begin = split
+        parts.append((begin, end))
+        return parts
+
+    def get_stop(self, end):
+        """
+        The chunk includes the record which starts at or behind end, since the
+        geometries search for it to find their own end
+        """
+        stop = self.line_pairs.index_code(0, end)
+        if stop is None:
+            return self.line_pairs.nrs
+        return stop + 1
+
+    def merge(self, reader, ranges, tasks, results):
+        """
+        Join the geometries of the chunks and number them (and their layers)
+        as if they had been read in one go
+        """
+        geos = [[] for i in range(len(ranges))]
+        for (begin, stop, parts), (part_geos, names, skipped, filtered) in zip(tasks, results):
+            layer_nrs = [reader.Get_Layer_Nr(name) for name in names]
+            for name in skipped:
+                reader.skipped[name] = reader.skipped.get(name, 0) + skipped[name]
+            reader.filtered += filtered
+            for (range_nr, b, e), new_geos in zip(parts, part_geos):
+                for geo in new_geos:
+                    geo.Nr = len(geos[range_nr])
+                    geo.pair_nr += begin
+                    geo.Layer_Nr = layer_nrs[geo.Layer_Nr]
+                    geos[range_nr].append(geo)
+        return geos
+
+    def find_contours(self, geo, points):
+        """
+        Search the contours of each layer in its own process
+        @param geo: the geometries the points belong to
+        @param points: the points, see ReadDXF.Find_Common_Points
+        @return: see ContourSearch.Find_Contours, or None if the contours
+        should be searched within this process
+        """
+        layers = OrderedDict()
+        for point in points:
+            try:
+                layers[point.Layer_Nr].append(point)
+            except KeyError:
+                layers[point.Layer_Nr] = [point]
+
+        if ProcessPoolExecutor is None or self.failed or self.processes < 2 or \
+           len(layers) < 2 or len(points) < MIN_CONTOUR_POINTS:
+            return None
+
+        logger.debug("Searching the contours of %i points on %i layers" % (len(points), len(layers)))
+
+        try:
+            if self.executor is None:
+                self.executor = self.make_executor()
+            futures = []
+            for layer_points in layers.values():
+                # The geometries are referred to by the number of the points
+                # as well as by their own number
+                lengths = {}
+                for point in layer_points:
+                    for geo_nr in (point.point_nr, point.geo_nr):
+                        lengths[geo_nr] = geo[geo_nr].length
+                futures.append(self.executor.submit(find_contours, self.settings,
+                                                    lengths, layer_points))
+            results = [future.result() for future in futures]
+        except Exception as ex:
+            logger.warning("Parallel contour search failed, searching in one process: %s" % ex)
+            self.failed = True
+            self.shutdown()
+            return None
+
+        # Ordered by the point each search started at, as if all layers had
+        # been searched at once
+        position = dict((point.point_nr, pos) for pos, point in enumerate(points))
+        found = [first_cont for result in results for first_cont in result]
+        found.sort(key=lambda first_cont: position[first_cont[0]])
+        return found
+
+    def shutdown(self):
+        if self.executor is not None:
+            self.executor.shutdown()
+            self.executor = None
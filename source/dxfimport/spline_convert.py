@@ -26,9 +26,14 @@
 from __future__ import absolute_import
 from __future__ import division
 
-from math import atan2
+from math import atan2, ceil
 import logging
 
+try:
+    import numpy as np
+except ImportError:
+    np = None
+
 from core.point import Point
 from core.arcgeo import ArcGeo
 from core.linegeo import LineGeo
@@ -38,12 +43,25 @@ logger = logging.getLogger("DxfImport.SplineConvert")
 
 debug_on = False
 
+# Fewer u's than this are not worth passing through NumPy
+MIN_NUMPY_PARAMETERS = 8
+
+# Number of samples between the ends of a biarc against which the sampled
+# fitting checks it at least; check_biarc_fitting_tolerance() uses as many
+CHECK_SAMPLES = 4
+
+# Where not even the shortest biarc fits, the samples are made denser for
+# as many shortest biarcs as this at once
+REFINE_BIARCS = 4
+
 class Spline2Arcs:
-    def __init__(self, degree=0, Knots=[], Weights=[], CPoints=[], tol=0.01, check=1):
+    def __init__(self, degree=0, Knots=[], Weights=[], CPoints=[], tol=0.01, check=1,
+                 fitting='stepwise'):
         # Max Abweichung f�r die Biarc Kurve
         self.epsilon = tol
         self.epsilon_high = self.epsilon * 0.1
         self.segments = 50
+        self.fitting = fitting
 
         # NURBS Klasse initialisieren
         self.NURBS = NURBSClass(degree=degree, Knots=Knots,
@@ -341,8 +359,11 @@ class Spline2Arcs:
                         Pts = [geo.Pe]
 
                 # Wenn es eines eine andere Geometrie als eine Linie ist
+                # The end point of geo lies within the next joint line
                 else:
-                    Pts = []
+                    Pts = [geo.Pe]
+            else:
+                Pts = [geo.Pe]
 
         return NewCurve
 
@@ -366,7 +387,10 @@ class Spline2Arcs:
         for u_sect in u_sections:
             if debug_on:
                 logger.debug("Calculation Biarc Section: %s" % u_sect)
-            BiarcCurve, PtsVec = self.calc_Biarc_section(u_sect, self.epsilon, self.epsilon_high)
+            if self.fitting == 'sampled':
+                BiarcCurve, PtsVec = self.calc_Biarc_section_sampled(u_sect, self.epsilon, self.epsilon_high)
+            else:
+                BiarcCurve, PtsVec = self.calc_Biarc_section(u_sect, self.epsilon, self.epsilon_high)
             BiarcCurves.append(BiarcCurve)
             PtsVecs.append(PtsVec)
         return BiarcCurves, PtsVecs
@@ -466,19 +490,103 @@ class Spline2Arcs:
 
         return BiarcCurve, PtsVec
 
+    def calc_Biarc_section_sampled(self, u_sect, nom_tol, max_tol):
+        """
+        calc_Biarc_section_sampled() - Same as calc_Biarc_section(), but the
+        biarcs run between samples of the NURBS, which is evaluated at one u
+        per max_step at first. Each biarc is checked against all the samples
+        it spans, at least CHECK_SAMPLES, so no further evaluations are needed
+        for the check. If the biarc over as many samples as the previous one
+        spanned does not fit, the number of samples is bisected. Where not
+        even the shortest biarc fits, the samples are made denser.
+        """
+        min_u = 1e-12
+        u_beg = u_sect[0] + min_u
+        u_end = u_sect[-1] - min_u
+        if u_end <= u_beg:
+            return [], [self.NURBS.NURBS_evaluate(n=1, u=u_beg)]
+
+        count = int(ceil((u_end - u_beg) / self.max_step))
+        samples = NURBSSamples(self.NURBS, [u_beg + (u_end - u_beg) * nr / count
+                                            for nr in range(count)] + [u_end])
+
+        BiarcCurve = []
+        PtsVec = [(samples.Pts[0], samples.tangents[0])]
+        nr = 0
+        span = CHECK_SAMPLES + 1
+        step = 0
+        while nr < len(samples.us) - 1:
+            step += 1
+            if step > 10000:
+                raise ValueError("Iterations above 10000 reduce tolerance")
+
+            last = len(samples.us) - 1
+            if nr + CHECK_SAMPLES + 1 > last:
+                samples.refine(nr, last)
+                continue
+
+            # Try as many samples as the previous biarc spanned and some more
+            # (like cur_step in calc_Biarc_section). If that biarc does not
+            # fit, bisect down to the shortest one.
+            end = max(min(nr + span, last), nr + CHECK_SAMPLES + 1)
+            Biarc = self.fit_sampled_biarc(samples, nr, end, nom_tol, max_tol)
+            if Biarc is None:
+                fail = end
+                end = nr + CHECK_SAMPLES + 1
+                Biarc = self.fit_sampled_biarc(samples, nr, end, nom_tol, max_tol)
+                if Biarc is None:
+                    samples.refine(nr, min(nr + REFINE_BIARCS * (CHECK_SAMPLES + 1), last))
+                    span = 2 * (CHECK_SAMPLES + 1)
+                    continue
+
+                while fail - end > 1:
+                    mid = (end + fail) // 2
+                    MidBiarc = self.fit_sampled_biarc(samples, nr, mid, nom_tol, max_tol)
+                    if MidBiarc is None:
+                        fail = mid
+                    else:
+                        end, Biarc = mid, MidBiarc
+                span = end - nr
+            else:
+                span = int(ceil((end - nr) / 0.7))
+
+            if Biarc.shape != "Zero":
+                BiarcCurve.append(Biarc)
+                PtsVec.append((samples.Pts[end], samples.tangents[end]))
+            nr = end
+
+        return BiarcCurve, PtsVec
+
+    def fit_sampled_biarc(self, samples, nr0, nr1, nom_tol, max_tol):
+        """
+        fit_sampled_biarc() - The biarc between the samples nr0 and nr1, if
+        the samples in between are within max_tol. A "Zero" biarc fits if
+        the samples in between are within max_tol of its start point.
+        @return: the biarc or None
+        """
+        Biarc = BiarcClass(samples.Pts[nr0], samples.tangents[nr0],
+                           samples.Pts[nr1], samples.tangents[nr1], nom_tol * 0.5)
+
+        if Biarc.shape == "Zero":
+            Ps = samples.Pts[nr0]
+            fit_error = max([Ps.distance(Pt) for Pt in samples.Pts[nr0 + 1:nr1]] or [0.0])
+        else:
+            fit_error = Biarc.get_max_biarc_fitting_error(samples.xs[nr0 + 1:nr1],
+                                                          samples.ys[nr0 + 1:nr1])
+
+        if fit_error >= max_tol:
+            return None
+        else:
+            return Biarc
+
     def check_biarc_fitting_tolerance(self, Biarc, epsilon, u0, u1):
         """
         check_biarc_fitting_tolerance()
         """
         check_step = (u1 - u0) / 5
-        check_u = []
-        check_Pts = []
-        fit_error = []
-
-        for i in range(1, 5):
-            check_u.append(u0 + check_step * i)
-            check_Pts.append(self.NURBS.NURBS_evaluate(n=0, u=check_u[-1]))
-            fit_error.append(Biarc.get_biarc_fitting_error(check_Pts[-1]))
+        check_u = [u0 + check_step * i for i in range(1, 5)]
+        check_Pts = self.NURBS.NURBS_evaluate_many(n=0, us=check_u)
+        fit_error = [Biarc.get_biarc_fitting_error(Pt) for Pt in check_Pts]
 
         # if debug_on:
         if 0:
@@ -495,6 +603,36 @@ class Spline2Arcs:
             return 1
 
 
+class NURBSSamples:
+    """
+    Points and tangents of a NURBS at increasing u's, which are evaluated
+    together with NURBS_evaluate_many(). Used for the sampled biarc fitting.
+    """
+    def __init__(self, NURBS, us):
+        self.NURBS = NURBS
+        self.us = list(us)
+        self.Pts, self.tangents = NURBS.NURBS_evaluate_many(n=1, us=self.us)
+        self.xs = [Pt.x for Pt in self.Pts]
+        self.ys = [Pt.y for Pt in self.Pts]
+
+    def refine(self, nr0, nr1):
+        """
+        Add a sample in the middle of each two of the samples nr0 to nr1
+        """
+        us = [(self.us[nr] + self.us[nr + 1]) / 2 for nr in range(nr0, nr1)]
+        if not all(self.us[nr] < u < self.us[nr + 1] for nr, u in enumerate(us, nr0)):
+            raise ValueError("Samples of the NURBS cannot be refined")
+        Pts, tangents = self.NURBS.NURBS_evaluate_many(n=1, us=us)
+
+        for values, new_values in ((self.us, us), (self.Pts, Pts), (self.tangents, tangents),
+                                   (self.xs, [Pt.x for Pt in Pts]),
+                                   (self.ys, [Pt.y for Pt in Pts])):
+            merged = []
+            for value, new_value in zip(values[nr0:nr1], new_values):
+                merged += [value, new_value]
+            values[nr0:nr1] = merged
+
+
 class NURBSClass:
     def __init__(self, degree=0, Knots=[], Weights=None, CPoints=None):
         self.degree = degree      # Spline degree
@@ -643,6 +781,32 @@ class NURBSClass:
         else:
             return Point
 
+    def NURBS_evaluate_many(self, n=0, us=()):
+        """
+        Same as NURBS_evaluate() for a vector of u's. Many u's are evaluated
+        at once with NumPy (if it is installed), which gives the same values.
+        @return: the list of the Points, for n > 0 also the list of the tangents
+        """
+        if np is None or len(us) < MIN_NUMPY_PARAMETERS:
+            values = [self.NURBS_evaluate(n=n, u=u) for u in us]
+            if n > 0:
+                return [value[0] for value in values], [value[1] for value in values]
+            return values
+
+        HPt = self.BSpline.bspline_ders_evaluate_many(n=n, us=us)
+
+        w = HPt[0][:, -1]
+        Points = [Point(x=x, y=y) for x, y in zip((HPt[0][:, 0] / w).tolist(),
+                                                  (HPt[0][:, 1] / w).tolist())]
+        if n > 0:
+            # Same as the first derivative in NURBS_evaluate()
+            w = w[:, np.newaxis]
+            dPt = (w * HPt[1][:, :-1] - HPt[1][:, -1:] * HPt[0][:, :-1]) / (w * w)
+            tangents = [atan2(dy, dx) for dx, dy in dPt.tolist()]
+            return Points, tangents
+        else:
+            return Points
+
     def CPts_2_HCPts(self):
         """
         Umwandeln der NURBS Kontrollpunkte und Weight in einen Homogenen Vektor
@@ -678,6 +842,10 @@ class BSplineClass:
             logger.error("is: %s" % self.Knots_len)
             raise ValueError("Knot/Control Point/degree number error.")
 
+        if np is not None:
+            self.Knots_array = np.array(self.Knots, dtype=float)
+            self.CPts_array = np.array(self.CPts, dtype=float)
+
     def calc_curve(self, n=0, cpts_nr=20):
         """
         Berechnen von eine Anzahl gleichm�ssig verteilter Punkte bis zur n-ten Ableitung
@@ -734,6 +902,34 @@ class BSplineClass:
 
         return CK
 
+    def bspline_ders_evaluate_many(self, n=0, us=()):
+        """
+        bspline_ders_evaluate() for a vector of u's, done with NumPy. The
+        basis functions are calculated by ders_basis_functions() on arrays.
+        @return: array of the derivatives [k][u nr][i]
+        """
+        us = np.asarray(us, dtype=float)
+        span = self.findspans(us)
+        dN = self.ders_basis_functions(span, us, n)
+
+        p = self.degree
+        du = min(n, p)
+
+        CK = np.zeros((n + 1, len(us), self.CPt_len))
+        for k in range(du + 1):
+            for j in range(p + 1):
+                CK[k] += np.reshape(dN[k][j], (-1, 1)) * self.CPts_array[span - p + j]
+
+        return CK
+
+    def findspans(self, us):
+        """
+        findspan() for an array of u's
+        """
+        span = np.searchsorted(self.Knots_array, us, side="right") - 1
+        span[us == self.Knots[-1]] = self.Knots_len - self.degree - 2
+        return span
+
     def findspan(self, u):
         """
         Algorithm A2.1 from "THE NURBS BOOK" pg.68
@@ -775,8 +971,14 @@ class BSplineClass:
     def ders_basis_functions(self, span, u, n):
         """
         Algorithm A2.3 from "THE NURBS BOOK" pg.72
+        span and u may also be arrays (see bspline_ders_evaluate_many), the
+        values are then arrays as well
         """
         d = self.degree
+        if np is not None and isinstance(span, np.ndarray):
+            Knots = self.Knots_array
+        else:
+            Knots = self.Knots
 
         # initialisation of the a Matrix
         a = []
@@ -807,8 +1009,8 @@ class BSplineClass:
 
         for j in range(1, d + 1):
             # print('komisch span:%s, j:%s, u:%s, gesamt: %s' %(span,j,u,span+1-j))
-            left.append(u - self.Knots[span + 1 - j])
-            right.append(self.Knots[span + j] - u)
+            left.append(u - Knots[span + 1 - j])
+            right.append(Knots[span + j] - u)
             saved = 0.0
             for r in range(j):
                 # Lower Triangle
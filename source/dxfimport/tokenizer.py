@@ -0,0 +1,411 @@
+# -*- coding: utf-8 -*-
+from __future__ import absolute_import
+
+############################################################################
+#
+#   Copyright (C) 2008-2015
+#    Christian Kohlöffel
+#    Jean-Paul Schouwstra
+#
+#   This file is part of DXF2GCODE.
+#
+#   DXF2GCODE is free software: you can redistribute it and/or modify
+#   it under the terms of the GNU General Public License as published by
+#   the Free Software Foundation, either version 3 of the License, or
+#   (at your option) any later version.
+#
+#   DXF2GCODE is distributed in the hope that it will be useful,
+#   but WITHOUT ANY WARRANTY; without even the implied warranty of
+#   MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+#   GNU General Public License for more details.
+#
+#   You should have received a copy of the GNU General Public License
+#   along with DXF2GCODE.  If not, see <http://www.gnu.org/licenses/>.
+#
+############################################################################
+
+import codecs
+import logging
+import mmap
+import re
+
+logger = logging.getLogger("DxfImport.Tokenizer")
+
+# Encodings which are tried in this order; the last one accepts every byte
+ENCODINGS = ['utf-8', 'cp1252', 'cp850']
+
+# Number of bytes which are read from the file at once
+CHUNK_SIZE = 4 * 1024 * 1024
+
+NON_ASCII = re.compile(b'[\x80-\xff]')
+MAC_NEWLINE = re.compile(b'\r[^\n]')
+
+# A line pair within a mapped file; the value is matched without the blanks
+# around it, as they are stripped otherwise
+MAPPED_PAIR = re.compile(b'([^\n]*)\n[ \t\r\f\v]*(\S*(?:[ \t\r\f\v]+\S+)*)[ \t\r\f\v]*(?:\n|(?<!\n)\Z)')
+FIRST_SECTION = re.compile(b'^SECTION', re.MULTILINE)
+SECTION_END = re.compile(b'^[ \t]*0[ \t\r]*\n[ \t]*(?:ENDSEC|EOF)[ \t\r\f\v]*$', re.MULTILINE)
+
+
+class DxfTokenizer(object):
+    """
+    Streaming reader for ASCII DXF files. The file is read in large binary
+    chunks and split into (group code, value) pairs while reading, so the
+    whole file never has to be held in memory as a list of lines.
+
+    The encoding is detected once while the chunks pass by: as long as every
+    chunk is valid utf-8 the file is treated as utf-8, otherwise the next
+    encoding of ENCODINGS which is able to decode the data is used.
+
+    The content of the sections named in skip_sections is dropped; only
+    their SECTION, name and ENDSEC pairs are passed on.
+    """
+    def __init__(self, filename, chunk_size=CHUNK_SIZE, skip_sections=()):
+        self.filename = filename
+        self.chunk_size = chunk_size
+        self.skip_sections = set(name.encode('ascii') for name in skip_sections)
+        self.encoding = ENCODINGS[0]
+
+        # Line number and content of an invalid group code
+        self.line_nr = 0
+        self.bad_code = None
+
+        # Sections, tables, layers and blocks found while reading
+        self.structure = None
+
+        self._enc_nr = 0
+        self._decoder = codecs.getincrementaldecoder(self.encoding)()
+
+    def __iter__(self):
+        """
+        Yield the line pairs as (code, value) with the value decoded to a string
+        """
+        for code, value in self.raw_pairs():
+            yield code, value.decode(self.encoding)
+
+    def decode(self, value):
+        """
+        Decode a raw value which was returned by raw_pairs()
+        @param value: the value as bytes
+        @return: the value as string
+        """
+        return value.decode(self.encoding)
+
+    def raw_pairs(self):
+        """
+        Yield the line pairs as (code, value) tuples, the values are stripped
+        but not decoded. Everything in front of the first SECTION is skipped.
+        A ValueError is raised if a code is not a valid number; self.line_nr
+        and self.bad_code then describe the offending line.
+
+        While the pairs are read self.structure is filled; it is complete once
+        the generator is exhausted (or stopped by an error).
+        """
+        structure = self.structure = DxfStructure()
+        skip_sections = self.skip_sections
+
+        # Number of lines in front of the current list of lines
+        consumed = 0
+        pair_nr = 0
+        code_line = None
+        started = False
+        skipping = False
+
+        for lines in self._chunk_lines():
+            if not lines:
+                continue
+
+            if code_line is not None:
+                lines.insert(0, code_line)
+
+            if not started:
+                # Start at the first SECTION
+                for nr, line in enumerate(lines):
+                    if line.startswith(b'SECTION'):
+                        break
+                else:
+                    consumed += len(lines) - 1
+                    code_line = lines[-1]
+                    continue
+
+                started = True
+                if nr > 0:
+                    del lines[:nr - 1]
+                    consumed += nr - 1
+
+            if len(lines) % 2:
+                code_line = lines.pop()
+            else:
+                code_line = None
+
+            try:
+                for line_nr, (code, value) in enumerate(zip(lines[0::2], lines[1::2])):
+                    code = int(code)
+                    if skipping:
+                        if code != 0:
+                            continue
+                        value = value.strip()
+                        if value != b'ENDSEC' and value != b'EOF':
+                            continue
+                        skipping = False
+                    else:
+                        value = value.strip()
+
+                    # Collect the structure of the file on the fly
+                    if code == 0:
+                        structure.record(pair_nr, value)
+                    elif code == 2 and structure.pending is not None:
+                        skipping = structure.naming_section() and value in skip_sections
+                        structure.name(pair_nr, value)
+
+                    yield code, value
+                    pair_nr += 1
+            except ValueError:
+                self.line_nr = consumed + 2 * line_nr + 1
+                self.bad_code = code.strip().decode(self.encoding)
+                structure.finish(pair_nr)
+                raise
+
+            consumed += len(lines)
+
+        structure.finish(pair_nr)
+
+    def map_file(self):
+        """
+        Map the file into memory for mapped_pairs(). The caller closes the
+        mapping once it is done with the file, as long as it is open the
+        content may change under it when the file is written.
+        @return: the mapping, or None if the file can't be mapped (it is
+        empty or uses \r as line separator)
+        """
+        with open(self.filename, 'rb') as file_:
+            try:
+                mapped = mmap.mmap(file_.fileno(), 0, access=mmap.ACCESS_READ)
+            except (ValueError, EnvironmentError) as ex:
+                logger.debug("map_file: {0}".format(ex))
+                return None
+
+        if mapped.find(b'\n') == -1:
+            mapped.close()
+            return None
+        return mapped
+
+    def mapped_pairs(self, mapped):
+        """
+        Yield the line pairs of a mapped file as (code, start, end), with start
+        and end being the position of the stripped value within the mapping.
+        Nothing but the group codes is copied out of the mapping. Otherwise
+        the same as raw_pairs().
+        """
+        structure = self.structure = DxfStructure()
+
+        # Start at the first SECTION
+        match = FIRST_SECTION.search(mapped)
+        if match is None:
+            return
+        pos = mapped.rfind(b'\n', 0, max(match.start() - 1, 0)) + 1
+
+        pair_nr = 0
+        while pos is not None:
+            skip_pos = None
+            for match in MAPPED_PAIR.finditer(mapped, pos):
+                try:
+                    code = int(match.group(1))
+                except ValueError:
+                    self.line_nr = mapped[:match.start()].count(b'\n') + 1
+                    self.bad_code = match.group(1).strip().decode(self.encoding)
+                    structure.finish(pair_nr)
+                    raise
+                start, end = match.span(2)
+
+                # Collect the structure of the file on the fly
+                if code == 0:
+                    structure.record(pair_nr, mapped[start:end])
+                elif code == 2 and structure.pending is not None:
+                    value = mapped[start:end]
+                    if structure.naming_section() and value in self.skip_sections:
+                        skip_pos = match.end()
+                    structure.name(pair_nr, value)
+
+                yield code, start, end
+                pair_nr += 1
+
+                if skip_pos is not None:
+                    break
+
+            # Jump over the content of a skipped section
+            pos = None
+            if skip_pos is not None:
+                match = SECTION_END.search(mapped, skip_pos)
+                if match is not None:
+                    pos = match.start()
+
+        structure.finish(pair_nr)
+
+        if NON_ASCII.search(mapped) is not None:
+            for pos in range(0, len(mapped), self.chunk_size):
+                self._detect_encoding(mapped[pos:pos + self.chunk_size])
+        self._detect_encoding(b'', True)
+
+    def _chunk_lines(self):
+        """
+        Read the file in chunks and yield the complete lines of each chunk as
+        a list. A line which is cut by the end of a chunk is kept until the
+        next chunk arrives.
+        """
+        newline = None
+        tail = b''
+
+        with open(self.filename, 'rb') as file_:
+            while True:
+                chunk = file_.read(self.chunk_size)
+                if not chunk:
+                    break
+                self._detect_encoding(chunk)
+
+                if newline is None:
+                    # Old Mac files only use \r as line separator
+                    chunk = tail + chunk
+                    tail = b''
+                    if b'\n' in chunk:
+                        newline = b'\n'
+                    elif MAC_NEWLINE.search(chunk) is not None:
+                        newline = b'\r'
+                    else:
+                        tail = chunk
+                        continue
+
+                lines = (tail + chunk).split(newline)
+                tail = lines.pop()
+                yield lines
+
+        self._detect_encoding(b'', True)
+        if tail.strip():
+            yield tail.split(newline or b'\n')
+
+    def _detect_encoding(self, chunk, final=False):
+        """
+        Check whether the chunk can be decoded with the current encoding,
+        otherwise switch over to the next encoding which is able to.
+        """
+        if not final and not self._decoder.getstate()[0] and NON_ASCII.search(chunk) is None:
+            return
+
+        while True:
+            try:
+                self._decoder.decode(chunk, final)
+                return
+            except UnicodeDecodeError as ex:
+                logger.debug("Read_File: UnicodeDecodeError: {0}".format(ex))
+                if self._enc_nr + 1 == len(ENCODINGS):
+                    # If that happens, please consider to extend the list of supported encodings.
+                    raise
+                self._enc_nr += 1
+                self.encoding = ENCODINGS[self._enc_nr]
+                self._decoder = codecs.getincrementaldecoder(self.encoding)()
+
+
+class DxfStructure(object):
+    """
+    Index of the structure of a DXF file, which is collected by the tokenizer
+    while reading. All positions are numbers of line pairs; names are given
+    as the position of the pair holding the name (group code 2), so they can
+    be decoded together with the other values. The start of every record
+    (group code 0) is found in the code index of the line pairs.
+
+    sections: [begin, name, end] of each SECTION up to its ENDSEC
+    tables:   [begin, name, end] of each TABLE in the TABLES section
+    layers:   [begin, name] of each LAYER entry in the TABLES section
+    blocks:   [begin, name, end, section] of each BLOCK up to its ENDBLK, with
+              the index of the section it belongs to
+    """
+    def __init__(self):
+        self.sections = []
+        self.tables = []
+        self.layers = []
+        self.blocks = []
+
+        # The entry which gets the next name (group code 2)
+        self.pending = None
+
+        self._section = None
+        self._section_name = b''
+        self._table = None
+        self._block = None
+
+    def record(self, nr, value):
+        """
+        Called for each pair with group code 0
+        """
+        section = self._section
+        if section is None:
+            if value == b'SECTION':
+                self._section = [nr, None, None]
+                self._section_name = b''
+                self.sections.append(self._section)
+                self.pending = self._section
+            return
+
+        if value == b'ENDSEC':
+            self.close(nr)
+
+        elif self._section_name.startswith(b'BLOCKS'):
+            if value == b'BLOCK':
+                if self._block is None:
+                    self._block = [nr, None, None, len(self.sections) - 1]
+                    self.blocks.append(self._block)
+                    self.pending = self._block
+            elif value == b'ENDBLK':
+                if self._block is not None:
+                    self._block[2] = nr
+                    self._block = None
+
+        elif self._section_name.startswith(b'TABLES'):
+            if value == b'TABLE':
+                self._table = [nr, None, None]
+                self.tables.append(self._table)
+                self.pending = self._table
+            elif value == b'ENDTAB':
+                if self._table is not None:
+                    self._table[2] = nr
+                    self._table = None
+            elif value == b'LAYER':
+                self.layers.append([nr, None])
+                self.pending = self.layers[-1]
+
+    def naming_section(self):
+        """
+        True if the next name (group code 2) is the name of a section
+        """
+        return self.pending is not None and self.pending is self._section
+
+    def name(self, nr, value):
+        """
+        Called for a pair with group code 2 if an entry waits for its name
+        """
+        self.pending[1] = nr
+        if self.pending is self._section:
+            self._section_name = value
+        self.pending = None
+
+    def close(self, nr):
+        """
+        Close the open section (and whatever is still open within) at nr
+        """
+        if self._block is not None:
+            self._block[2] = nr
+            self._block = None
+        if self._table is not None:
+            self._table[2] = nr
+            self._table = None
+        self._section[2] = nr
+        self._section = None
+
+    def finish(self, nrs):
+        """
+        Called at the end of the file with the number of line pairs read
+        """
+        # If section was not properly terminated
+        if self._section is not None:
+            self.close(nrs - 1)
+        self.pending = None
@@ -51,7 +51,7 @@ except ImportError:
 
 logger = logging.getLogger("Core.Config")
 
-CONFIG_VERSION = "9.10"
+CONFIG_VERSION = "9.17"
 """
 version tag - increment this each time you edit CONFIG_SPEC
 
@@ -217,8 +217,30 @@ CONFIG_SPEC = str('''
     spline_check = integer(min = 1, max = 3, default = 3)
     # This is the tolerance which is used to fit the converted lines and arc segments to the converted NURBS.
     fitting_tolerance = float(min = 0, max = 1, default = 0.001)
+    # Method to fit the arcs to the splines: stepwise walks along the spline and checks each arc at 4 points; sampled evaluates the spline at once, checks each arc against all the samples it spans and adds samples only where needed (much fewer evaluations of the spline)
+    spline_fitting = option('stepwise', 'sampled', default = 'stepwise')
     # If checked, the elements (shape, ...) which are part of a block will be inserted on the layer that belongs to the block (even though the elements might be defined on a different layers)
     insert_at_block_layer = boolean(default = False)
+    # If checked, the geometries of large DXF files are read by several processes in parallel
+    parallel_import = boolean(default = False)
+    # Number of processes used for the parallel import; 0 means one process per CPU core
+    import_processes = integer(min = 0, max = 256, default = 0)
+    # If checked, ASCII DXF files are mapped into memory and the values are only read out of the file when needed (saves memory for very large files)
+    memory_map = boolean(default = False)
+    # Sections of the DXF file which are jumped over while reading, since no geometries are imported from them
+    skip_sections = list(default = list('CLASSES', 'OBJECTS', 'THUMBNAILIMAGE'))
+    # Entities which are skipped although they could be imported (e.g. POINT); unsupported entities are always skipped
+    skip_entities = list(default = list())
+    # Method to join the geometries to contours: recursive follows every path; graph searches the connected geometries one group after the other and stops after max_contour_paths paths per contour (faster for drawings with many branches)
+    contour_search = option('recursive', 'graph', default = 'recursive')
+    # Maximum number of paths which the graph contour search follows to find one contour
+    max_contour_paths = integer(min = 1, max = 1000000, default = 1000)
+    # If checked, the result of an import is stored in the cache folder, so the same file is loaded at once the next time it is opened with the same settings
+    import_cache = boolean(default = False)
+    # Size of the import cache in megabytes; the least recently used files are removed from the cache when it gets larger
+    import_cache_size = integer(min = 1, max = 100000, default = 500)
+    # If checked, the arcs fitted to splines and ellipses are also stored in the cache folder, so identical curves are not fitted again after a restart of the program
+    fit_cache = boolean(default = False)
 
     # These settings are intented to be used in the DXF file:
     # - By using MILL: as a prefix to your layer name, you can define milling parameters by using one of the following identifiers.
@@ -548,7 +570,18 @@ class MyConfig(object):
                 ('point_tolerance', CfgDoubleSpinBox(self.tr('DXF default import point tolerance:'), '', None, None, 5)),
                 ('spline_check', CfgSpinBox(self.tr('DXF import spline check:'))),
                 ('fitting_tolerance', CfgDoubleSpinBox(self.tr('DXF default import fit tolerance:'), '', None, None, 5)),
-                ('insert_at_block_layer', CfgCheckBox(self.tr('insert elements which are part of a block to layer where the block is inserted')))
+                ('spline_fitting', CfgComboBox(self.tr('DXF import spline fitting:'))),
+                ('insert_at_block_layer', CfgCheckBox(self.tr('insert elements which are part of a block to layer where the block is inserted'))),
+                ('parallel_import', CfgCheckBox(self.tr('Read large DXF files using several processes'))),
+                ('import_processes', CfgSpinBox(self.tr('Number of import processes (0 = one per CPU core):'))),
+                ('memory_map', CfgCheckBox(self.tr('Map DXF files into memory instead of reading them'))),
+                ('skip_sections', CfgListEdit(self.tr('DXF sections to skip:'), ',')),
+                ('skip_entities', CfgListEdit(self.tr('DXF entities to skip:'), ',')),
+                ('contour_search', CfgComboBox(self.tr('Contour search:'))),
+                ('max_contour_paths', CfgSpinBox(self.tr('Maximum number of paths per contour (graph search):'))),
+                ('import_cache', CfgCheckBox(self.tr('Keep imported DXF files in a cache'))),
+                ('import_cache_size', CfgSpinBox(self.tr('Size of the import cache:'), 'MB')),
+                ('fit_cache', CfgCheckBox(self.tr('Keep the arcs fitted to splines and ellipses in a cache')))
             ])),
             ('Layer_Options', OrderedDict([
                 ('__section_title__', self.tr("Automatic tool config")),
@@ -0,0 +1,121 @@
+# -*- coding: utf-8 -*-
+from __future__ import absolute_import
+
+############################################################################
+#
+#   Copyright (C) 2008-2015
+#    Christian Kohlöffel
+#    Jean-Paul Schouwstra
+#
+#   This file is part of DXF2GCODE.
+#
+#   DXF2GCODE is free software: you can redistribute it and/or modify
+#   it under the terms of the GNU General Public License as published by
+#   the Free Software Foundation, either version 3 of the License, or
+#   (at your option) any later version.
+#
+#   DXF2GCODE is distributed in the hope that it will be useful,
+#   but WITHOUT ANY WARRANTY; without even the implied warranty of
+#   MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+#   GNU General Public License for more details.
+#
+#   You should have received a copy of the GNU General Public License
+#   along with DXF2GCODE.  If not, see <http://www.gnu.org/licenses/>.
+#
+############################################################################
+
+
+import logging
+import sys
+import time
+
+from dxfimport.importer import ReadDXF, ImportCancelled
+
+from globals.six import reraise
+import globals.constants as c
+if c.PYQT5notPYQT4:
+    from PyQt5 import QtCore
+else:
+    from PyQt4 import QtCore
+
+logger = logging.getLogger("Gui.ImportThread")
+
+# Seconds between two progress signals within the same phase
+REPORT_INTERVAL = 0.1
+
+
+class ImportThread(QtCore.QThread):
+    """
+    Imports a DXF file (ReadDXF) in a thread of its own, so the window stays
+    responsive meanwhile. The progress and the warnings of the import are
+    passed on by signals; cancel() stops the import at its next progress
+    report. The contours of the inserted blocks are found as well, which
+    would otherwise be done when the shapes are made.
+    """
+
+    # Phase of the import, value and maximum (0 if unknown)
+    progress = QtCore.pyqtSignal(str, int, int)
+
+    # Title and text of a warning
+    warning = QtCore.pyqtSignal(str, str)
+
+    def __init__(self, filename, layer_filter=None, previous=None):
+        """
+        @param filename, layer_filter, previous: see ReadDXF
+        """
+        QtCore.QThread.__init__(self)
+
+        self.filename = filename
+        self.layer_filter = layer_filter
+        self.previous = previous
+
+        self.cancelled = False
+        self.phase = None
+        self.reported = 0
+        self.result = None
+        self.exc_info = None
+
+    def run(self):
+        try:
+            reader = ReadDXF(self.filename, self.layer_filter, self.previous,
+                             self.report, self.warning.emit)
+            reader.Make_Inserted_Contours()
+
+            # From now on the import is used by the thread of the window
+            reader.progress = None
+            reader.warning = None
+            reader.moveToThread(QtCore.QCoreApplication.instance().thread())
+            self.result = reader
+        except ImportCancelled:
+            logger.debug("Import of %s cancelled" % self.filename)
+        except Exception:
+            self.exc_info = sys.exc_info()
+        finally:
+            self.previous = None
+
+    def report(self, phase, value, maximum):
+        """
+        The progress callback of ReadDXF. It is called for each record, so
+        the signals are limited to one per REPORT_INTERVAL and phase.
+        """
+        if self.cancelled:
+            raise ImportCancelled()
+
+        now = time.time()
+        if phase != self.phase or now - self.reported >= REPORT_INTERVAL:
+            self.phase = phase
+            self.reported = now
+            self.progress.emit(phase, value, maximum)
+
+    def cancel(self):
+        self.cancelled = True
+
+    def get_result(self):
+        """
+        Get the import once the thread is finished. An exception raised by
+        the import is raised again here.
+        @return: the ReadDXF, or None if the import was cancelled
+        """
+        if self.exc_info is not None:
+            reraise(*self.exc_info)
+        return self.result
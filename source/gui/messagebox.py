@@ -42,6 +42,10 @@ class MessageBox(QTextBrowser):
     @sideeffect: None
     """
 
+    # Emitted by write; messages logged by other threads (e.g. the import)
+    # are thereby shown by the thread of the window
+    written = QtCore.pyqtSignal(str)
+
     def __init__(self, origobj):
         """
         Initialization of the MessageBox class.
@@ -50,6 +54,7 @@ class MessageBox(QTextBrowser):
         """
         super(MessageBox, self).__init__()
         self.setOpenExternalLinks(True)
+        self.written.connect(self.append_message)
 
         self.append(self.tr("You are using DXF2GCODE"))
         self.append(self.tr("Version %s (%s)") % (c.VERSION, c.DATE))
@@ -73,5 +78,8 @@ class MessageBox(QTextBrowser):
         """
         stripped_string = string.strip()
         if stripped_string:
-            self.append(stripped_string)
-            self.verticalScrollBar().setValue(1e9)
+            self.written.emit(stripped_string)
+
+    def append_message(self, string):
+        self.append(string)
+        self.verticalScrollBar().setValue(1e9)
@@ -113,6 +113,10 @@ class Breaks(object):
         Try to break lineGeo with the given breakShape. Will return the intersection points of lineGeo with breakShape.
         """
         # TODO geos should be abs
+        geo_arrays = breakShape.get_geo_arrays()
+        if geo_arrays is not None:
+            return geo_arrays.line_intersections(lineGeo.Ps, lineGeo.Pe)
+
         intersections = []
         line = QLineF(lineGeo.Ps.x, lineGeo.Ps.y, lineGeo.Pe.x, lineGeo.Pe.y)
         for breakGeo in breakShape.geos.abs_iter():